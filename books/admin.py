@@ -10,7 +10,7 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'publisher', 'publication_year')
     
     # 2. 검색 기능을 추가합니다.
-    search_fields = ('title', 'author', 'ISBN')
+    search_fields = ('title', 'author', 'isbn13')
     
     # 3. 상세 정보/수정 페이지(Detail View)에 보여줄 필드를 설정합니다.
     # [수정] Description과 Cover image url을 제외하고 필요한 필드만 나열합니다.
@@ -21,15 +21,22 @@ class BookAdmin(admin.ModelAdmin):
         'publication_year', 
         'genres', 
         'keywords', 
-        'ISBN', 
+        'isbn13', 
         'summary', 
         'kdc_code',
-        'embedding_vector'
     )
     
     # ManyToMany 필드(genres)를 더 편하게 선택할 수 있도록 필터 UI를 추가합니다.
     filter_horizontal = ('genres',)
 
+    # 4. 목록 페이지는 큰 텍스트 컬럼을 읽지 않고(Book 기본 매니저), 수정 페이지에서만 모두 읽습니다.
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match is not None and match.url_name and match.url_name.endswith('_changelist'):
+            return queryset
+        return queryset.with_details()
+
 # 다른 모델들도 필요하다면 여기에 등록할 수 있습니다.
 admin.site.register(Genre)
 admin.site.register(ReadingEntry)
\ No newline at end of file
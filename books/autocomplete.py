@@ -0,0 +1,229 @@
+# books/autocomplete.py
+"""
+책 자동 완성 색인입니다. (books:autocomplete_api, 플랜 만들기 책 선택 입력 중 검색)
+
+키는 정규화한(korean_index.normalize) 제목, 제목의 각 단어부터 시작하는 뒷부분
+('해리포터와 마법사의 돌' → '마법사의돌', '돌'), 저자입니다. 키를 정렬된 배열에 담아 두면 접두사에 해당하는 키는
+이진 검색으로 찾은 연속 구간이 됩니다. 책 행 번호는 인기 순위(BookPopularity 전체 순위 점수 내림차순 → 제목 길이 → ID)로
+매기므로, 구간 안에서 행 번호가 가장 작은 k권이 곧 인기 가중 상위 k권입니다.
+초성 자모가 섞인 검색어('ㅎㄹㅍ', '해리ㅍ')는 키를 초성으로 바꾼 두 번째 정렬 배열에서 찾고 음절로 입력한 글자를 확인합니다.
+
+키 문자열은 하나의 긴 문자열과 시작 위치 배열로 저장해 책이 많아도 키마다 파이썬 문자열 객체를 만들지 않고,
+응답에 필요한 제목/저자도 함께 들고 있어 요청마다 DB를 조회하지 않습니다.
+자주 들어오는 접두사의 응답은 색인마다 두는 LRU(settings.BOOK_AUTOCOMPLETE_LRU_SIZE)에 보관하며,
+카탈로그 버전이나 인기 버전(books/catalog.py)이 바뀌어 색인을 다시 만들면 LRU도 새로 시작합니다.
+"""
+
+import bisect
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from . import catalog, hangul
+from .korean_index import normalize
+from .models import Book, BookPopularity
+
+FIELD_SEPARATOR = '\x1f'
+MAX_CHAR = '\U0010ffff'  # 접두사 구간의 끝 (prefix + MAX_CHAR보다 작은 키가 prefix로 시작합니다)
+CANDIDATE_FACTOR = 4  # 구간이 크면 행 번호가 작은 k × 이 배수개만 골라 중복을 지웁니다.
+
+_stats_lock = threading.Lock()
+STATS = {'hit': 0, 'miss': 0}
+
+
+class _Strings:
+    """문자열 목록을 하나의 문자열 + 시작 위치 배열로 들고 있는 읽기 전용 시퀀스 (bisect에 그대로 씁니다)"""
+
+    def __init__(self, strings):
+        self.text = ''.join(strings)
+        lengths = np.fromiter((len(string) for string in strings), dtype=np.int64, count=len(strings))
+        self.offsets = np.r_[0, np.cumsum(lengths)].astype(np.int64)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def prefix_range(self, prefix):
+        return bisect.bisect_left(self, prefix), bisect.bisect_left(self, prefix + MAX_CHAR)
+
+    @property
+    def nbytes(self):
+        return len(self.text) * 4 + self.offsets.nbytes
+
+
+class _LRU:
+    """정규화한 검색어 → 응답 목록. 가장 오래 쓰지 않은 항목부터 버립니다."""
+
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _keys(title, author):
+    """책 하나의 자동 완성 키: 제목 전체, 둘째 단어부터의 제목 뒷부분들, 저자 (normalize와 같은 정규화)"""
+    words = unicodedata.normalize('NFC', title).casefold().split()
+    keys = {''.join(words[i:]) for i in range(len(words))}
+    keys.add(normalize(author))
+    keys.discard('')
+    return keys
+
+
+def _popularity():
+    return dict(BookPopularity.objects.filter(genre__isnull=True).values_list('book_id', 'score'))
+
+
+class AutocompleteIndex:
+    """인기 순으로 번호를 매긴 책, 정렬된 키 배열, 초성 키 배열. 만든 뒤에는 변경하지 않습니다."""
+
+    def __init__(self, version, book_ids, display, keys, key_rows, chosung_keys, chosung_sources):
+        self.version = version
+        self.book_ids = book_ids
+        self.display = display
+        self.keys = keys
+        self.key_rows = key_rows
+        self.chosung_keys = chosung_keys
+        self.chosung_sources = chosung_sources
+        self.cache = _LRU(settings.BOOK_AUTOCOMPLETE_LRU_SIZE)
+
+    @classmethod
+    def build(cls, version=None, rows=None, scores=None):
+        """(책 ID, 제목, 저자) 목록과 책 ID → 인기 점수로 색인을 만듭니다. 주지 않으면 DB에서 읽습니다."""
+        if rows is None:
+            rows = Book.objects.values_list('id', 'title', 'author')
+        if scores is None:
+            scores = _popularity()
+        books = sorted(
+            (-scores.get(book_id, 0.0), len(title or ''), book_id, title or '', author or '')
+            for book_id, title, author in rows
+        )
+
+        key_list, key_rows = [], []
+        for row, (_, _, _, title, author) in enumerate(books):
+            for key in _keys(title, author):
+                key_list.append(key)
+                key_rows.append(row)
+        order = sorted(range(len(key_list)), key=key_list.__getitem__)
+        keys = _Strings([key_list[i] for i in order])
+        # 초성 키는 같은 길이의 문자열이므로 원래 키 위치(chosung_sources)만 있으면 입력한 음절을 확인할 수 있습니다.
+        chosung_text = keys.text.translate(hangul.CHOSUNG_TABLE)
+        bounds = keys.offsets.tolist()
+        chosung_list = [chosung_text[start:end] for start, end in zip(bounds, bounds[1:])]
+        chosung_order = sorted(range(len(chosung_list)), key=chosung_list.__getitem__)
+        return cls(
+            version,
+            np.fromiter((book_id for _, _, book_id, _, _ in books), dtype=np.int64, count=len(books)),
+            _Strings([title + FIELD_SEPARATOR + author for _, _, _, title, author in books]),
+            keys,
+            np.array(key_rows, dtype=np.int32)[order],
+            _Strings([chosung_list[i] for i in chosung_order]),
+            np.array(chosung_order, dtype=np.int32),
+        )
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    @property
+    def nbytes(self):
+        """색인이 차지하는 대략의 메모리 (문자열은 최악의 경우인 4바이트/글자로 셉니다)"""
+        return (self.book_ids.nbytes + self.display.nbytes + self.keys.nbytes + self.key_rows.nbytes
+                + self.chosung_keys.nbytes + self.chosung_sources.nbytes)
+
+    def book(self, row):
+        title, author = self.display[row].split(FIELD_SEPARATOR)
+        return {'id': int(self.book_ids[row]), 'title': title, 'author': author}
+
+    def complete(self, query, k=10):
+        """접두사 query로 시작하는 키가 있는 책을 인기 순으로 최대 k권 {id, title, author}로 반환합니다."""
+        q = normalize(query)
+        if not q or k <= 0:
+            return []
+        cache_key = (q, k)
+        cached = self.cache.get(cache_key)
+        _count('hit' if cached is not None else 'miss')
+        if cached is None:
+            cached = [self.book(row) for row in self.top_rows(q, k)]
+            self.cache.put(cache_key, cached)
+        return cached
+
+    def top_rows(self, q, k):
+        if not any(hangul.is_chosung(char) for char in q):
+            lo, hi = self.keys.prefix_range(q)
+            return _smallest_unique(self.key_rows[lo:hi], k)
+
+        lo, hi = self.chosung_keys.prefix_range(hangul.to_chosung(q))
+        sources = self.chosung_sources[lo:hi]
+        fixed = [(i, char) for i, char in enumerate(q) if not hangul.is_chosung(char)]
+        if not fixed:
+            return _smallest_unique(self.key_rows[sources], k)
+        # 음절로 입력한 글자가 원래 키와 같은지 인기 순으로 확인합니다.
+        rows = self.key_rows[sources]
+        picked = []
+        for i in np.argsort(rows, kind='stable').tolist():
+            row = int(rows[i])
+            if picked and picked[-1] == row:
+                continue
+            key = self.keys[sources[i]]
+            if all(key[j] == char for j, char in fixed):
+                picked.append(row)
+                if len(picked) >= k:
+                    break
+        return picked
+
+
+def _smallest_unique(rows, k):
+    """행 번호 배열에서 서로 다른 가장 작은 k개를 오름차순으로 반환합니다."""
+    limit = k * CANDIDATE_FACTOR
+    if len(rows) > limit:
+        candidates = np.unique(np.partition(rows, limit)[:limit])
+        if len(candidates) >= k:
+            return candidates[:k].tolist()
+    return np.unique(rows)[:k].tolist()
+
+
+def _count(name):
+    with _stats_lock:
+        STATS[name] += 1
+
+
+def stats():
+    """이 워커의 LRU 적중/실패 수와 적중률"""
+    with _stats_lock:
+        hit, miss = STATS['hit'], STATS['miss']
+    return {'hit': hit, 'miss': miss, 'hit_rate': hit / (hit + miss) if hit + miss else 0.0}
+
+
+_index = catalog.Reloadable(lambda version: AutocompleteIndex.build(version), names=(catalog.CATALOG, catalog.POPULARITY))
+
+
+def get_autocomplete_index():
+    """현재 색인을 반환합니다. 처음 호출되면 만들고, 카탈로그/인기 버전이 바뀌었으면 백그라운드에서 다시 만듭니다."""
+    return _index.get()
+
+
+def complete(query, k=None):
+    return get_autocomplete_index().complete(query, k or settings.BOOK_AUTOCOMPLETE_LIMIT)
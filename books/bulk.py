@@ -0,0 +1,34 @@
+# books/bulk.py
+"""
+DB 종류와 관계없이 동작하는 bulk upsert입니다. (책 임베딩, 사용자 취향 벡터 저장에 씁니다)
+
+PostgreSQL/SQLite는 bulk_create(update_conflicts=True, unique_fields=[...])로 충돌한 행을 갱신합니다.
+MySQL/MariaDB는 충돌 대상 필드를 지정할 수 없어(unique_fields를 주면 NotSupportedError) 같은 기본 키의
+기존 행을 지우고 다시 넣되, 한 트랜잭션 안에서 처리해 다른 연결이 행이 빠진 상태를 보지 않게 합니다.
+"""
+
+from django.db import connections, router, transaction
+
+
+def bulk_upsert(model, objects, update_fields, batch_size=1000):
+    """objects를 기본 키 기준으로 추가하거나 update_fields를 갱신합니다. 저장한 객체 수를 반환합니다."""
+    if not objects:
+        return 0
+    using = router.db_for_write(model)
+    if connections[using].features.supports_update_conflicts_with_target:
+        model.objects.using(using).bulk_create(
+            objects,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=update_fields,
+        )
+        return len(objects)
+
+    with transaction.atomic(using=using):
+        for start in range(0, len(objects), batch_size):
+            pks = [obj.pk for obj in objects[start:start + batch_size]]
+            # 삭제 시그널(임베딩 저널 등)을 보내지 않고 지웁니다. 다시 넣는 행이므로 삭제로 기록되면 안 됩니다.
+            model.objects.using(using).filter(pk__in=pks)._raw_delete(using)
+        model.objects.using(using).bulk_create(objects, batch_size=batch_size)
+    return len(objects)
@@ -0,0 +1,126 @@
+# books/catalog.py
+"""
+책 카탈로그 버전 번호입니다.
+
+책이 추가/수정/삭제되면(books/signals.py) DB의 카탈로그 버전 번호(CatalogVersion 행)를 1 올립니다.
+인기 순위표를 다시 계산하면(books/popularity.py) 책 목록은 그대로이므로 따로 둔 인기 버전(POPULARITY)만 올려,
+인기 순서를 쓰는 자동 완성만 다시 만들고 한글 검색 색인과 검색 결과 캐시는 그대로 둡니다.
+precompute_recommendations가 새 추천 세대를 공개하면 추천 버전(RECOMMENDATIONS)을 올려 rec_cache의 이전 결과를 버리게 합니다.
+
+웹 워커, 관리 명령, 다른 서버가 모두 같은 행을 보므로 캐시 백엔드(개발 기본값 locmem은 프로세스마다 따로입니다)와
+관계없이 어느 프로세스에서 올린 버전이든 모두에게 보입니다.
+워커마다 메모리에 들고 있는 검색 색인(books/korean_index.py, books/autocomplete.py)은 Reloadable로 필요한 버전이
+바뀌었는지 보고 다시 만들고, 검색 결과 캐시(books/search_cache.py)는 키에 이 번호를 넣어 이전 결과를 읽지 않습니다.
+시그널이 발생하지 않는 대량 적재(bulk_create, 직접 SQL) 뒤에는 bump()를 직접 호출하세요.
+
+요청 하나 안에서는(CatalogVersionMiddleware, cached_versions) 이름마다 한 번만 DB에서 읽고 그 값을 다시 씁니다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from .models import CatalogVersion
+
+CATALOG = 'catalog'
+POPULARITY = 'popularity'
+RECOMMENDATIONS = 'recommendations'
+
+_local = threading.local()
+
+
+@contextmanager
+def cached_versions():
+    """이 블록(요청 하나) 안에서는 버전을 이름마다 한 번만 DB에서 읽습니다. 같은 스레드에서 bump()하면 다시 읽습니다."""
+    _local.versions = {}
+    try:
+        yield
+    finally:
+        _local.versions = None
+
+
+def version(name=CATALOG):
+    """현재 버전 번호 (기본 키 조회 한 번, 행이 없으면 0)"""
+    memo = getattr(_local, 'versions', None)
+    if memo is not None and name in memo:
+        return memo[name]
+    value = CatalogVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+    if memo is not None:
+        memo[name] = value
+    return value
+
+
+def bump(name=CATALOG):
+    """버전을 1 올립니다. (UPDATE ... SET version = version + 1이므로 여러 프로세스가 동시에 올려도 빠지지 않습니다)"""
+    memo = getattr(_local, 'versions', None)
+    if memo is not None:
+        memo.pop(name, None)
+    if CatalogVersion.objects.filter(name=name).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            CatalogVersion.objects.create(name=name, version=1)
+    except IntegrityError:
+        CatalogVersion.objects.filter(name=name).update(version=F('version') + 1)  # 다른 프로세스가 먼저 행을 만든 경우
+
+
+class Reloadable:
+    """build(버전 튜플)로 만든 워커별 객체를 들고 있다가 names의 버전 중 하나라도 바뀌면 다시 만듭니다.
+
+    버전 확인은 settings.BOOK_SEARCH_RELOAD_INTERVAL초에 한 번만 합니다. 처음 한 번만 요청 안에서 만들고,
+    그 뒤로는 백그라운드 스레드(한 번에 하나)가 새 객체를 만드는 동안 이전 객체를 계속 반환하다가
+    다 만들어지면 한 번의 참조 대입으로 교체합니다. (책이 많으면 빌드에 수십 초가 걸리므로 요청을 붙잡지 않습니다)
+    """
+
+    def __init__(self, build, names=(CATALOG,)):
+        self._build = build
+        self.names = tuple(names)
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._thread = None
+        self.current = None
+
+    def versions(self):
+        return tuple(version(name) for name in self.names)
+
+    def refresh(self, versions=None):
+        """지금 이 스레드에서 다시 만듭니다."""
+        with self._lock:
+            self.current = self._build(versions if versions is not None else self.versions())
+        return self.current
+
+    def get(self):
+        loaded = self.current
+        if loaded is None:
+            with self._lock:
+                if self.current is None:
+                    self.current = self._build(self.versions())
+                return self.current
+
+        now = time.monotonic()
+        if now - self._last_check >= settings.BOOK_SEARCH_RELOAD_INTERVAL:
+            self._last_check = now
+            current_versions = self.versions()
+            if current_versions != loaded.version:
+                self._rebuild_in_background(current_versions)
+        return loaded
+
+    def _rebuild_in_background(self, versions):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return  # 이미 만들고 있습니다. 끝난 뒤 다음 확인에서 버전이 또 바뀌었으면 다시 만듭니다.
+            self._thread = threading.Thread(target=self._rebuild, args=(versions,), name='catalog-reload', daemon=True)
+            self._thread.start()
+
+    def _rebuild(self, versions):
+        # 빌드가 실패하면 이전 객체를 그대로 쓰고, 다음 확인 때 다시 시도합니다.
+        try:
+            built = self._build(versions)
+            with self._lock:
+                self.current = built
+        finally:
+            connection.close()  # 이 스레드가 연 DB 연결
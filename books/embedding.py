@@ -0,0 +1,260 @@
+# books/embedding.py
+"""
+책 임베딩 생성(인코더) 모듈입니다.
+
+SentenceTransformer와 torch는 이 모듈에서만, 그리고 get_encoder()가 호출될 때만
+import 됩니다. 웹 서버(gunicorn 워커)는 이 모듈을 사용하지 않으므로
+임베딩 모델을 메모리에 올리지 않습니다.
+임베딩 생성 스크립트와 관리 명령어에서만 명시적으로 사용하세요.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+import time
+from collections import deque
+
+from django.conf import settings
+
+_ENCODER = None
+
+
+def get_encoder(model_name=None):
+    """임베딩 모델을 처음 호출될 때 한 번만 로드하여 반환합니다."""
+    global _ENCODER
+    if _ENCODER is None:
+        from sentence_transformers import SentenceTransformer
+        _ENCODER = SentenceTransformer(model_name or settings.EMBEDDING_MODEL_NAME)
+    return _ENCODER
+
+
+def build_book_text(book, genre_names=None):
+    """임베딩에 사용할 "제목. 줄거리. 장르들. 키워드들." 형태의 텍스트를 만듭니다."""
+    if genre_names is None:
+        genre_names = [genre.name for genre in book.genres.all()]
+    genre_text = " ".join(genre_names)
+
+    # "[{'word': '파이썬', 'weight': 10.0}, ...]" 형태로 저장된 키워드에서 단어만 추출합니다.
+    keyword_text = " ".join(keyword_words(book.keywords)) if book.keywords else ""
+
+    return f"{book.title}. {book.summary or ''}. {genre_text}. {keyword_text}"
+
+
+_KEYWORD_WORD_RE = re.compile(r"""['"]word['"]\s*:\s*(['"])(.*?)\1""")
+
+
+def keyword_words(keywords):
+    """저장된 키워드에서 단어 목록만 추출합니다.
+
+    import_new_data는 JSON으로, 예전 데이터는 파이썬 repr 형식으로 저장되어 있습니다.
+    repr 형식은 ast.literal_eval로 전체를 파싱하는 대신 정규식으로 'word' 값만 뽑습니다. (수십 배 빠릅니다)
+    """
+    if isinstance(keywords, str):
+        try:
+            keywords = json.loads(keywords)
+        except ValueError:
+            words = [match[1] for match in _KEYWORD_WORD_RE.findall(keywords)]
+            if words:
+                return words
+            try:
+                keywords = ast.literal_eval(keywords)
+            except (ValueError, SyntaxError):
+                return []
+    if not isinstance(keywords, list):
+        return []
+    return [item.get('word', '') for item in keywords if isinstance(item, dict)]
+
+
+def encode_texts(texts, batch_size=32, show_progress_bar=False):
+    """텍스트 목록을 float32 numpy 배열(문서 수 x 차원)로 인코딩합니다."""
+    model = get_encoder()
+    vectors = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=show_progress_bar,
+    )
+    return vectors.astype('float32', copy=False)
+
+
+# --- 배치 임베딩 생성 파이프라인 ----------------------------------------------------
+
+def _init_pool_worker(model_name, threads):
+    """프로세스 풀 워커 초기화: torch 스레드 수를 고정하고 모델을 한 번 로드합니다."""
+    # torch를 import 하기 전에 설정해야 OpenMP/MKL 스레드 풀 크기에 반영됩니다.
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    get_encoder(model_name)
+
+
+def _encode_in_worker(texts, batch_size):
+    return encode_texts(texts, batch_size=batch_size)
+
+
+def iter_book_chunks(queryset, chunk_size, after_id=0):
+    """책을 ID 순서로 chunk_size개씩 읽어 옵니다. 장르는 청크마다 한 번의 쿼리로 prefetch 합니다.
+
+    OFFSET 대신 마지막 ID 이후를 읽으므로(keyset) 처리 중에 행이 빠져도 건너뛰는 책이 없습니다.
+    """
+    queryset = queryset.for_embedding().order_by('id')
+    while True:
+        chunk = list(queryset.filter(id__gt=after_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1].id
+
+
+def read_checkpoint(path, scope):
+    """같은 작업(scope)의 체크포인트가 있으면 (마지막으로 저장한 책 ID, 작업을 시작할 때의 저널 위치)를,
+    없으면 (0, None)을 반환합니다."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0, None
+    if checkpoint.get('scope') != scope:
+        return 0, None
+    return checkpoint.get('last_id', 0), checkpoint.get('journal_start')
+
+
+def write_checkpoint(path, scope, last_id, done, journal_start=None):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'scope': scope, 'last_id': last_id, 'done': done, 'journal_start': journal_start}, f)
+    os.replace(tmp_path, path)
+
+
+def text_hash(text):
+    """임베딩 입력 텍스트의 SHA-256 해시입니다. 텍스트가 같으면 다시 인코딩할 필요가 없습니다."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def generate_embeddings(queryset, chunk_size=512, batch_size=64, workers=0, threads=None,
+                        checkpoint_path=None, scope='', only_changed=False, log=print):
+    """queryset의 책들을 청크 단위로 인코딩하고 book_embedding에 bulk upsert 합니다.
+
+    only_changed=True이면 입력 텍스트 해시와 모델 이름/버전이 저장된 값과 같은 책은 건너뛰므로
+    인덱스 저널에도 실제로 바뀐 책만 기록됩니다.
+    workers > 0이면 CPU 프로세스 풀에서 청크를 병렬로 인코딩합니다. (워커당 torch 스레드 threads개)
+    청크를 저장할 때마다 checkpoint_path에 마지막 책 ID를 기록하므로, 중단 후 다시 실행하면
+    같은 scope의 작업을 그 다음 책부터 이어서 처리합니다. 인코딩한 책 수를 반환합니다.
+
+    끝나면 임베딩이 바뀐 책(작업을 시작한 뒤의 인덱스 저널)을 읽은 사용자의 취향 벡터를 다시 계산합니다.
+    (예전 벡터로 더해 둔 기여분이 남지 않도록, books/taste.py) 중단 후 이어서 처리해도 처음 시작한 저널 위치부터 봅니다.
+    """
+    from . import index_store, taste
+    from .models import BookEmbedding, IndexJournal
+
+    model_name = settings.EMBEDDING_MODEL_NAME
+    model_version = settings.EMBEDDING_MODEL_VERSION
+    scope = f"{scope}|{model_name}|{model_version}"
+    after_id, journal_start = read_checkpoint(checkpoint_path, scope) if checkpoint_path else (0, None)
+    if after_id:
+        log(f"Resuming from checkpoint: books after id {after_id}")
+    if journal_start is None:
+        journal_start = index_store.journal_head()
+
+    pool = None
+    if workers > 0:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        # fork 후 torch 스레드 풀이 멈추는 문제를 피하기 위해 spawn을 사용합니다.
+        # 워커 프로세스와 모델 로드는 처음 인코딩할 청크가 생길 때 시작됩니다.
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_pool_worker,
+            initargs=(model_name, threads),
+        )
+    elif threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    started = time.perf_counter()
+    done = skipped = 0
+
+    def save(books, hashes, vectors, last_id):
+        nonlocal done
+        if books:
+            index_store.save_embeddings([book.id for book in books], vectors, source_hashes=hashes)
+        done += len(books)
+        if checkpoint_path:
+            write_checkpoint(checkpoint_path, scope, last_id, done, journal_start)
+        elapsed = time.perf_counter() - started
+        log(f"  {done} books embedded, {skipped} unchanged (last id {last_id}, {(done + skipped) / elapsed:.1f} books/sec)")
+
+    try:
+        # 저장은 항상 청크 순서대로 하므로 체크포인트 이전의 책은 모두 저장된 상태입니다.
+        pending = deque()
+        for chunk in iter_book_chunks(queryset, chunk_size, after_id):
+            # 장르 순서가 바뀌어도 같은 텍스트(같은 해시)가 되도록 이름순으로 정렬합니다.
+            texts = [build_book_text(book, sorted(genre.name for genre in book.genres.all())) for book in chunk]
+            hashes = [text_hash(text) for text in texts]
+            rows = list(range(len(chunk)))
+            if only_changed:
+                stored = dict(BookEmbedding.objects.filter(
+                    book_id__in=[book.id for book in chunk], model_name=model_name, model_version=model_version,
+                ).values_list('book_id', 'source_hash'))
+                rows = [i for i in rows if stored.get(chunk[i].id) != hashes[i]]
+                skipped += len(chunk) - len(rows)
+
+            books = [chunk[i] for i in rows]
+            hashes = [hashes[i] for i in rows]
+            texts = [texts[i] for i in rows]
+            last_id = chunk[-1].id
+            if pool is None:
+                save(books, hashes, encode_texts(texts, batch_size=batch_size) if books else [], last_id)
+                continue
+            future = pool.submit(_encode_in_worker, texts, batch_size) if books else None
+            pending.append((books, hashes, last_id, future))
+            if len(pending) >= workers * 2:
+                books, hashes, last_id, future = pending.popleft()
+                save(books, hashes, future.result() if future else [], last_id)
+        while pending:
+            books, hashes, last_id, future = pending.popleft()
+            save(books, hashes, future.result() if future else [], last_id)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    log(f"Embedded {done} books, skipped {skipped} unchanged in {elapsed:.1f}s ({(done + skipped) / max(elapsed, 1e-9):.1f} books/sec)")
+    changed_ids = IndexJournal.objects.filter(id__gt=journal_start).values_list('book_id', flat=True)
+    rebuilt = taste.rebuild_readers(changed_ids)
+    if rebuilt:
+        log(f"Rebuilt taste vectors for {rebuilt} readers of re-encoded books.")
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)  # 끝까지 처리했으므로 다음 실행은 처음부터 시작합니다.
+    return done
+
+
+def stamp_source_hashes(queryset, chunk_size=1000, log=print):
+    """해시가 없는 기존 임베딩에 현재 입력 텍스트 해시와 모델 이름/버전을 기록합니다. (인코딩하지 않습니다)
+
+    해시 필드가 생기기 전에 만든 벡터가 현재 모델과 텍스트로 만든 것이 확실할 때 한 번 실행하면
+    다음 갱신에서 전체 카탈로그를 다시 인코딩하지 않아도 됩니다.
+    """
+    from .models import BookEmbedding
+
+    stamped = 0
+    for chunk in iter_book_chunks(queryset.filter(embedding__source_hash=''), chunk_size):
+        embeddings = []
+        for book in chunk:
+            text = build_book_text(book, sorted(genre.name for genre in book.genres.all()))
+            embeddings.append(BookEmbedding(
+                book_id=book.id,
+                source_hash=text_hash(text),
+                model_name=settings.EMBEDDING_MODEL_NAME,
+                model_version=settings.EMBEDDING_MODEL_VERSION,
+            ))
+        BookEmbedding.objects.bulk_update(embeddings, ['source_hash', 'model_name', 'model_version'])
+        stamped += len(embeddings)
+        log(f"  {stamped} embeddings stamped (last id {chunk[-1].id})")
+    return stamped
@@ -1,6 +1,7 @@
 # books/forms.py
 
 from django import forms
+from . import hangul
 from .models import ReadingEntry
 import unicodedata
 
@@ -36,37 +37,27 @@ class ReadingEntryForm(forms.ModelForm):
         review_text = self.cleaned_data.get('review', '')
 
         # 한글이 아닌 문자는 필터링에서 제외
-        korean_text = "".join(filter(lambda char: '가' <= char <= '힣', review_text))
+        korean_text = "".join(filter(hangul.is_syllable, review_text))
         if not korean_text:
             return review_text # 검사할 한글이 없으면 통과
 
-        # 각 받침을 구성 자음으로 분해하기 위한 맵
-        JONG_DECOMPOSITION_MAP = {
-            '': 0, 'ㄱ': 1, 'ㄲ': 1, 'ㄳ': 2, 'ㄴ': 1, 'ㄵ': 2, 'ㄶ': 2, 'ㄷ': 1, 'ㄹ': 1, 
-            'ㄺ': 2, 'ㄻ': 2, 'ㄼ': 2, 'ㄽ': 2, 'ㄾ': 2, 'ㄿ': 2, 'ㅀ': 2, 'ㅁ': 1, 'ㅂ': 1, 
-            'ㅄ': 2, 'ㅅ': 1, 'ㅆ': 1, 'ㅇ': 1, 'ㅈ': 1, 'ㅊ': 1, 'ㅋ': 1, 'ㅌ': 1, 'ㅍ': 1, 'ㅎ': 1
-        }
-        JONGSUNG_LIST = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-
         consonant_count = 0
         vowel_count = 0
 
         for char in korean_text:
-            char_code = ord(char) - ord('가')
+            chosung_index, _, jongsung_index = hangul.decompose(char)
             
             # 1. 초성 계산 (소리 없는 'ㅇ'은 제외)
-            chosung_index = char_code // (21 * 28)
-            if chosung_index != 11:  # 초성 'ㅇ'의 인덱스는 11
+            if chosung_index != hangul.SILENT_CHOSUNG_INDEX:
                 consonant_count += 1
             
             # 2. 중성 계산 (모두 모음)
             vowel_count += 1
             
             # 3. 종성 계산 (복잡한 받침도 정확히 카운트)
-            jongsung_index = char_code % 28
             if jongsung_index > 0:
-                jongsung_char = JONGSUNG_LIST[jongsung_index]
-                consonant_count += JONG_DECOMPOSITION_MAP.get(jongsung_char, 0)
+                jongsung_char = hangul.JONGSUNG_LIST[jongsung_index]
+                consonant_count += hangul.JONG_DECOMPOSITION_MAP.get(jongsung_char, 0)
         
         total_count = consonant_count + vowel_count
 
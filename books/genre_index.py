@@ -0,0 +1,140 @@
+# books/genre_index.py
+"""
+장르별 책 ID를 메모리에 들고 있는 역색인입니다.
+
+Book.genres의 M2M 중간 테이블을 한 번 읽어 장르마다 정렬된 int64 책 ID 배열을 만들어 두고,
+합집합/교집합/차집합과 무작위 추출을 numpy로 처리합니다. 콜드 스타트 목록, 아동 도서 제외 같은
+추천 필터가 Book→genres 조인 없이 동작합니다.
+
+추천 인덱스(LoadedIndex)가 새 버전을 로드하거나 저널 델타를 갱신할 때 함께 다시 만들어지며,
+인덱스를 로드하지 않는 프로세스는 get_genre_index()가 CURRENT 버전이 바뀌었는지 확인해 갱신합니다.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from . import index_store
+from .models import Book, Genre
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+class GenreIndex:
+    """장르 이름 → 정렬된 책 ID 배열. 만든 뒤에는 변경하지 않습니다."""
+
+    def __init__(self, version, ids_by_name):
+        self.version = version
+        self.ids_by_name = ids_by_name
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, version=None):
+        """중간 테이블을 (genre_id, book_id) 순서로 한 번 읽어 장르별 배열로 나눕니다."""
+        through = Book.genres.through
+        rows = np.array(
+            list(through.objects.order_by('genre_id', 'book_id').values_list('genre_id', 'book_id')),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        names = dict(Genre.objects.values_list('id', 'name'))
+
+        ids_by_name = {}
+        genre_ids, starts = np.unique(rows[:, 0], return_index=True)
+        for genre_id, book_ids in zip(genre_ids, np.split(rows[:, 1], starts[1:])):
+            name = names.get(int(genre_id))
+            if name is not None:
+                ids_by_name[name] = np.unique(book_ids)
+        return cls(version, ids_by_name)
+
+    def books(self, *names):
+        """주어진 장르 중 하나라도 속한 책 ID (합집합). 없는 장르 이름은 무시합니다."""
+        return self.union(*(self.ids_by_name.get(name, EMPTY) for name in names))
+
+    def books_in_all(self, *names):
+        """주어진 장르에 모두 속한 책 ID (교집합)."""
+        return self.intersection(*(self.ids_by_name.get(name, EMPTY) for name in names))
+
+    def has_any(self, book_ids, *names):
+        """book_ids 중 주어진 장르에 속한 책이 하나라도 있는지 확인합니다. (아동 도서 게이트키퍼)"""
+        return len(self.intersection(np.unique(np.fromiter(book_ids, dtype=np.int64)), self.books(*names))) > 0
+
+    def genre_counts(self):
+        """{장르 이름: 책 수}"""
+        return {name: len(ids) for name, ids in self.ids_by_name.items()}
+
+    @property
+    def nbytes(self):
+        return sum(ids.nbytes for ids in self.ids_by_name.values())
+
+    # --- 집합 연산 (모두 정렬된 int64 배열을 반환합니다) ---------------------------
+
+    @staticmethod
+    def union(*arrays):
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return EMPTY
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    @staticmethod
+    def intersection(*arrays):
+        """모든 배열에 있는 ID. (각 배열은 정렬되고 중복이 없어야 합니다)"""
+        if not arrays:
+            return EMPTY
+        result = arrays[0]
+        for array in arrays[1:]:
+            result = np.intersect1d(result, array, assume_unique=True)
+        return result
+
+    @staticmethod
+    def difference(array, *excluded):
+        """array에서 excluded 배열들(또는 ID 목록/집합)에 있는 ID를 뺍니다."""
+        for other in excluded:
+            if not isinstance(other, np.ndarray):
+                other = np.fromiter(other, dtype=np.int64)
+            if len(other):
+                array = np.setdiff1d(array, other)
+        return array
+
+    @staticmethod
+    def sample(array, k, rng=None):
+        """array에서 최대 k개를 중복 없이 무작위로 뽑습니다."""
+        if len(array) <= k:
+            return np.random.default_rng(rng).permutation(array)
+        rows = np.random.default_rng(rng).choice(len(array), k, replace=False)
+        return array[rows]
+
+
+GENRE_INDEX = None
+_build_lock = threading.Lock()
+_last_check = 0.0
+
+
+def refresh(version=None):
+    """장르 역색인을 다시 만들어 한 번의 참조 대입으로 교체합니다."""
+    global GENRE_INDEX
+    with _build_lock:
+        GENRE_INDEX = GenreIndex.build(version if version is not None else index_store.current_version())
+    return GENRE_INDEX
+
+
+def get_genre_index():
+    """현재 장르 역색인을 반환합니다. 처음 호출되거나 추천 인덱스 버전이 바뀌었으면 다시 만듭니다.
+
+    CURRENT 파일 확인은 settings.REC_INDEX_RELOAD_INTERVAL초에 한 번만 합니다.
+    """
+    global _last_check
+    loaded = GENRE_INDEX
+    if loaded is None:
+        return refresh()
+
+    now = time.monotonic()
+    if now - _last_check >= settings.REC_INDEX_RELOAD_INTERVAL:
+        _last_check = now
+        version = index_store.current_version()
+        if version != loaded.version:
+            return refresh(version)
+    return loaded
@@ -0,0 +1,56 @@
+# books/hangul.py
+"""
+한글 음절 계산 모듈입니다.
+
+완성형 한글 음절(가~힣, 11172자)은 '가' + (초성 × 21 + 중성) × 28 + 종성 순서로 배치되어 있으므로
+코드 포인트 산술만으로 초성/중성/종성을 나눌 수 있습니다.
+리뷰 자음/모음 비율 검사(ReadingEntryForm.clean_review)와 초성 검색(books/korean_index.py)이 함께 사용합니다.
+"""
+
+SYLLABLE_FIRST = '가'
+SYLLABLE_LAST = '힣'
+JUNGSUNG_COUNT = 21
+JONGSUNG_COUNT = 28
+
+# 초성 19자 (호환용 자모). 사용자가 입력하는 'ㅎㄹㅍㅌ' 같은 초성 검색어도 이 문자들입니다.
+CHOSUNG_LIST = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+CHOSUNG_SET = frozenset(CHOSUNG_LIST)
+SILENT_CHOSUNG_INDEX = 11  # 소리 없는 초성 'ㅇ'
+JONGSUNG_LIST = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 각 받침을 구성하는 자음 수 (ㄺ, ㅄ 같은 겹받침은 2)
+JONG_DECOMPOSITION_MAP = {
+    '': 0, 'ㄱ': 1, 'ㄲ': 1, 'ㄳ': 2, 'ㄴ': 1, 'ㄵ': 2, 'ㄶ': 2, 'ㄷ': 1, 'ㄹ': 1,
+    'ㄺ': 2, 'ㄻ': 2, 'ㄼ': 2, 'ㄽ': 2, 'ㄾ': 2, 'ㄿ': 2, 'ㅀ': 2, 'ㅁ': 1, 'ㅂ': 1,
+    'ㅄ': 2, 'ㅅ': 1, 'ㅆ': 1, 'ㅇ': 1, 'ㅈ': 1, 'ㅊ': 1, 'ㅋ': 1, 'ㅌ': 1, 'ㅍ': 1, 'ㅎ': 1
+}
+
+
+def is_syllable(char):
+    return SYLLABLE_FIRST <= char <= SYLLABLE_LAST
+
+
+def decompose(char):
+    """완성형 음절 하나를 (초성, 중성, 종성) 인덱스로 나눕니다. 종성이 없으면 종성 인덱스는 0입니다."""
+    char_code = ord(char) - ord(SYLLABLE_FIRST)
+    return char_code // (JUNGSUNG_COUNT * JONGSUNG_COUNT), (char_code // JONGSUNG_COUNT) % JUNGSUNG_COUNT, char_code % JONGSUNG_COUNT
+
+
+def chosung(char):
+    """음절이면 초성 자모를, 아니면 문자를 그대로 반환합니다. 예: '해' -> 'ㅎ'"""
+    if is_syllable(char):
+        return CHOSUNG_LIST[(ord(char) - ord(SYLLABLE_FIRST)) // (JUNGSUNG_COUNT * JONGSUNG_COUNT)]
+    return char
+
+
+# 음절 11172자 → 초성 자모 (str.translate용)
+CHOSUNG_TABLE = {code: CHOSUNG_LIST[(code - ord(SYLLABLE_FIRST)) // (JUNGSUNG_COUNT * JONGSUNG_COUNT)]
+                 for code in range(ord(SYLLABLE_FIRST), ord(SYLLABLE_LAST) + 1)}
+
+
+def to_chosung(text):
+    """문자열의 음절을 모두 초성으로 바꿉니다. 길이는 그대로입니다. 예: '해리포터' -> 'ㅎㄹㅍㅌ'"""
+    return text.translate(CHOSUNG_TABLE)
+
+
+def is_chosung(char):
+    return char in CHOSUNG_SET
@@ -0,0 +1,593 @@
+# books/index_store.py
+"""
+추천 인덱스 파일을 버전별로 저장하고 읽는 모듈입니다.
+
+REC_INDEX_DIR/
+    CURRENT                 현재 서빙 중인 버전 이름
+    20251101T030000-ab12/   버전 디렉터리
+        index.faiss         FAISS 인덱스
+        ids.npy             책 ID (오름차순)
+        vectors.npy         ids.npy와 같은 순서의 float32 벡터 행렬
+        manifest.json       책 수, 차원, 빌드 시각 등
+
+새 버전은 임시 디렉터리에 쓰고 fsync 한 뒤 rename으로 한 번에 공개하며,
+CURRENT 파일도 같은 방식으로 교체합니다. 따라서 워커는 절반만 쓰인 파일을 읽지 않습니다.
+버전을 사용하는 프로세스는 manifest.json에 공유 잠금(flock)을 잡고 있으며,
+아무도 잠금을 잡지 않은 이전 버전만 가비지 컬렉션으로 삭제됩니다.
+
+버전 이후의 책 추가/변경/삭제는 IndexJournal 테이블에 쌓이고, 워커는 이를 작은 델타 인덱스로
+기본 인덱스 위에 겹쳐서 검색합니다. compact_rec_index 명령이 저널을 기본 인덱스에 합쳐 새 버전을 만듭니다.
+"""
+
+import json
+import os
+import secrets
+import shutil
+import time
+from collections import namedtuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .bulk import bulk_upsert
+from .models import BookEmbedding, IndexJournal
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경에서는 잠금 없이 동작합니다.
+    fcntl = None
+
+CURRENT_FILE = 'CURRENT'
+INDEX_FILE = 'index.faiss'
+IDS_FILE = 'ids.npy'
+VECTORS_FILE = 'vectors.npy'
+MANIFEST_FILE = 'manifest.json'
+TMP_PREFIX = '.tmp-'
+
+
+def index_dir():
+    return str(settings.REC_INDEX_DIR)
+
+
+def version_path(version, filename=''):
+    return os.path.join(index_dir(), version, filename)
+
+
+def current_file_path():
+    return os.path.join(index_dir(), CURRENT_FILE)
+
+
+def current_version():
+    """CURRENT 파일에 기록된 버전 이름을 반환합니다. 없으면 None입니다."""
+    try:
+        with open(current_file_path()) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions():
+    """공개된 버전 이름을 오래된 순서로 반환합니다."""
+    if not os.path.isdir(index_dir()):
+        return []
+    return sorted(
+        name for name in os.listdir(index_dir())
+        if not name.startswith('.') and os.path.isfile(version_path(name, MANIFEST_FILE))
+    )
+
+
+def read_manifest(version=None):
+    version = version or current_version()
+    with open(version_path(version, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+# --- 빌드 ---------------------------------------------------------------------
+
+def load_embeddings_from_db():
+    """임베딩이 있는 책의 (ID 배열, float32 벡터 행렬)을 ID 오름차순으로 반환합니다."""
+    rows = BookEmbedding.objects.order_by('book_id').values_list('book_id', 'vector', 'dtype')
+    count = rows.count()
+    if count == 0:
+        return np.empty(0, dtype=np.int64), None
+
+    # 전체 행렬을 한 번에 할당하고 바이트를 그대로 복사해 넣습니다. (파이썬 리스트를 거치지 않습니다)
+    book_ids = np.empty(count, dtype=np.int64)
+    vectors = None
+    filled = 0
+    for book_id, data, dtype in rows.iterator(chunk_size=2000):
+        vector = BookEmbedding.decode(data, dtype)
+        if vectors is None:
+            vectors = np.empty((count, len(vector)), dtype=np.float32)
+        if filled == count:
+            break  # count() 이후에 추가된 책은 다음 빌드나 저널에서 반영됩니다.
+        book_ids[filled] = book_id
+        vectors[filled] = vector
+        filled += 1
+    return book_ids[:filled], vectors[:filled]
+
+
+def fetch_embeddings(book_ids):
+    """책 ID 목록의 임베딩을 {book_id: float32 벡터}로 반환합니다. 임베딩이 없는 책은 빠집니다."""
+    rows = BookEmbedding.objects.filter(book_id__in=list(book_ids)).values_list('book_id', 'vector', 'dtype')
+    return {book_id: BookEmbedding.decode(data, dtype) for book_id, data, dtype in rows}
+
+
+def save_embeddings(book_ids, vectors, source_hashes=None, dtype=None, batch_size=1000):
+    """임베딩을 bulk upsert(books/bulk.py)로 저장하고 추천 인덱스 저널에 기록합니다.
+
+    bulk_create는 post_save 시그널을 보내지 않으므로 저널은 여기서 직접 남깁니다.
+    source_hashes는 각 벡터를 만든 입력 텍스트의 해시(embedding.text_hash)이고,
+    모델 이름/버전은 settings.EMBEDDING_MODEL_NAME/EMBEDDING_MODEL_VERSION으로 기록됩니다.
+    dtype을 생략하면 settings.EMBEDDING_STORAGE_DTYPE을 사용합니다.
+    """
+    dtype = dtype or settings.EMBEDDING_STORAGE_DTYPE
+    book_ids = [int(book_id) for book_id in book_ids]
+    source_hashes = source_hashes or [''] * len(book_ids)
+    objects = []
+    for book_id, vector, source_hash in zip(book_ids, vectors, source_hashes):
+        embedding = BookEmbedding(
+            book_id=book_id,
+            source_hash=source_hash,
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            model_version=settings.EMBEDDING_MODEL_VERSION,
+        )
+        embedding.set_array(vector, dtype)
+        objects.append(embedding)
+    bulk_upsert(
+        BookEmbedding, objects,
+        update_fields=['vector', 'dtype', 'dimension', 'source_hash', 'model_name', 'model_version', 'updated_at'],
+        batch_size=batch_size,
+    )
+    record_changes(upsert_ids=book_ids)
+
+
+INDEX_TYPES = ('flat', 'ivfflat', 'hnsw', 'ivfpq')
+
+
+def build_flat_index(book_ids, vectors, like=None):
+    """정확한 L2 검색을 하는 IndexIDMap(IndexFlatL2)을 만듭니다.
+
+    like가 차원 축소(IndexPreTransform) 인덱스이면 같은 변환을 앞에 붙여, 저널 델타의 거리가
+    기본 인덱스의 거리와 같은 공간에서 계산되도록 합니다.
+    """
+    import faiss
+
+    transform = _transform_of(like)
+    if transform is None:
+        index = faiss.IndexIDMap(faiss.IndexFlatL2(vectors.shape[1]))
+    else:
+        index = faiss.IndexPreTransform(transform, faiss.IndexIDMap(faiss.IndexFlatL2(transform.d_out)))
+    index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), book_ids)
+    return index
+
+
+def index_params(**overrides):
+    """settings의 REC_INDEX_* 값에 overrides를 덮어쓴 인덱스 파라미터를 반환합니다."""
+    params = {
+        'index_type': settings.REC_INDEX_TYPE,
+        'nlist': settings.REC_INDEX_NLIST,
+        'nprobe': settings.REC_INDEX_NPROBE,
+        'hnsw_m': settings.REC_INDEX_HNSW_M,
+        'ef_construction': settings.REC_INDEX_EF_CONSTRUCTION,
+        'ef_search': settings.REC_INDEX_EF_SEARCH,
+        'pq_m': settings.REC_INDEX_PQ_M,
+        'train_sample': settings.REC_INDEX_TRAIN_SAMPLE,
+        'reduce_dim': settings.REC_INDEX_REDUCE_DIM,
+        'reduce_method': settings.REC_INDEX_REDUCE_METHOD,
+        'quantizer': settings.REC_INDEX_QUANTIZER,
+    }
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _train_sample(vectors, size):
+    if len(vectors) <= size:
+        return np.ascontiguousarray(vectors)
+    rows = np.random.default_rng(0).choice(len(vectors), size, replace=False)
+    return np.ascontiguousarray(vectors[np.sort(rows)])
+
+
+REDUCE_METHODS = ('pca', 'opq')
+QUANTIZERS = ('none', 'sq8', 'fp16')
+
+
+def _build_reduction(params, dimension, sample):
+    """reduce_dim이 0이 아니면 학습 샘플로 PCA(또는 OPQ) 변환을 학습해 반환합니다."""
+    import faiss
+
+    reduce_dim = params['reduce_dim']
+    if not reduce_dim or reduce_dim >= dimension:
+        return None
+    if params['reduce_method'] == 'pca':
+        transform = faiss.PCAMatrix(dimension, reduce_dim)
+    elif params['reduce_method'] == 'opq':
+        if reduce_dim % params['pq_m']:
+            raise ValueError(f"REC_INDEX_PQ_M ({params['pq_m']}) must divide REC_INDEX_REDUCE_DIM ({reduce_dim}) for OPQ.")
+        transform = faiss.OPQMatrix(dimension, params['pq_m'], reduce_dim)
+    else:
+        raise ValueError(f"Unknown REC_INDEX_REDUCE_METHOD '{params['reduce_method']}'. Choose one of {', '.join(REDUCE_METHODS)}.")
+    transform.train(sample)
+    return transform
+
+
+def _sq_type(params):
+    import faiss
+
+    quantizer = params['quantizer']
+    if quantizer not in QUANTIZERS:
+        raise ValueError(f"Unknown REC_INDEX_QUANTIZER '{quantizer}'. Choose one of {', '.join(QUANTIZERS)}.")
+    return {'sq8': faiss.ScalarQuantizer.QT_8bit, 'fp16': faiss.ScalarQuantizer.QT_fp16}.get(quantizer)
+
+
+def build_index(book_ids, vectors, **overrides):
+    """settings.REC_INDEX_TYPE(또는 overrides)에 맞는 인덱스를 만들고 (인덱스, 사용한 파라미터)를 반환합니다.
+
+    flat    정확한 전수 검색 (IndexFlatL2)
+    ivfflat nlist개 클러스터 중 nprobe개만 검색 (IndexIVFFlat)
+    hnsw    그래프 기반 검색, efSearch로 정확도 조절 (IndexHNSWFlat)
+    ivfpq   IVF + 곱 양자화로 벡터를 pq_m 바이트로 압축 (IndexIVFPQ)
+    IVF 계열은 임베딩 중 train_sample개를 뽑아 학습합니다.
+
+    reduce_dim을 주면 PCA/OPQ로 차원을 줄이는 변환을 학습해 IndexPreTransform으로 앞에 붙입니다.
+    질의도 인덱스 안에서 같은 변환을 거치므로, 취향 벡터나 책 벡터는 원래 차원 그대로 검색하면 됩니다.
+    quantizer(sq8/fp16)는 flat/ivfflat/hnsw가 인덱스 안에 저장하는 벡터를 스칼라 양자화합니다. (ivfpq는 이미 압축됩니다)
+    """
+    import faiss
+
+    params = index_params(**overrides)
+    index_type = params['index_type']
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    sample = _train_sample(vectors, params['train_sample'])
+    transform = _build_reduction(params, vectors.shape[1], sample)
+    if transform is not None:
+        sample = transform.apply(sample)
+    dimension = sample.shape[1]
+    sq_type = _sq_type(params)
+
+    if index_type == 'flat':
+        storage = faiss.IndexFlatL2(dimension) if sq_type is None else faiss.IndexScalarQuantizer(dimension, sq_type)
+        index = faiss.IndexIDMap(storage)
+    elif index_type == 'hnsw':
+        if sq_type is None:
+            hnsw = faiss.IndexHNSWFlat(dimension, params['hnsw_m'])
+        else:
+            hnsw = faiss.IndexHNSWSQ(dimension, sq_type, params['hnsw_m'])
+        hnsw.hnsw.efConstruction = params['ef_construction']
+        index = faiss.IndexIDMap(hnsw)
+    elif index_type in ('ivfflat', 'ivfpq'):
+        # 클러스터당 학습 벡터가 최소 39개는 되도록 nlist를 제한합니다. (0이면 4*sqrt(N))
+        nlist = params['nlist'] or int(4 * np.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors) // 39))
+        params['nlist'] = nlist
+        quantizer = faiss.IndexFlatL2(dimension)
+        if index_type == 'ivfflat' and sq_type is None:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+        elif index_type == 'ivfflat':
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, sq_type, faiss.METRIC_L2)
+        else:
+            if sq_type is not None:
+                raise ValueError("REC_INDEX_QUANTIZER applies to flat/ivfflat/hnsw; ivfpq is already compressed.")
+            if dimension % params['pq_m']:
+                raise ValueError(f"REC_INDEX_PQ_M ({params['pq_m']}) must divide the vector dimension ({dimension}).")
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, params['pq_m'], 8)
+    else:
+        raise ValueError(f"Unknown REC_INDEX_TYPE '{index_type}'. Choose one of {', '.join(INDEX_TYPES)}.")
+
+    if not index.is_trained:
+        index.train(sample)
+    if transform is not None:
+        index = faiss.IndexPreTransform(transform, index)
+    index.add_with_ids(vectors, book_ids)
+    configure_search(index, params)
+    return index, params
+
+
+def _transform_of(index):
+    """IndexPreTransform이면 첫 번째 VectorTransform을, 아니면 None을 반환합니다."""
+    import faiss
+
+    if index is None:
+        return None
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexPreTransform):
+        return faiss.downcast_VectorTransform(index.chain.at(0))
+    return None
+
+
+def transform_vectors(index, vectors):
+    """인덱스가 차원 축소를 쓰면 vectors를 같은 공간으로 변환합니다. (거리를 직접 계산할 때 사용)"""
+    transform = _transform_of(index)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return transform.apply(vectors) if transform is not None else vectors
+
+
+def configure_search(index, params=None):
+    """IVF의 nprobe, HNSW의 efSearch 같은 검색 시점 파라미터를 적용합니다."""
+    import faiss
+
+    params = params or index_params()
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(params['nprobe'], ivf.nlist)
+    inner = _unwrap_id_map(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = params['ef_search']
+    return index
+
+
+def _unwrap_id_map(index):
+    """IndexPreTransform/IndexIDMap 껍데기를 벗긴 실제 검색 인덱스"""
+    import faiss
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def search_parameters(index, exclude_ids, scale=1):
+    """exclude_ids를 검색 단계에서 건너뛰는 SearchParameters를 만듭니다.
+
+    인덱스 종류에 맞는 파라미터 객체를 써야 nprobe/efSearch가 기본값(1 등)으로 덮이지 않으므로,
+    인덱스에 설정된 값에 scale을 곱해 함께 넘깁니다. (IVF: nprobe, HNSW: efSearch)
+    """
+    import faiss
+
+    excluded = np.ascontiguousarray(exclude_ids, dtype=np.int64)
+    batch = faiss.IDSelectorBatch(len(excluded), faiss.swig_ptr(excluded))
+    selector = faiss.IDSelectorNot(batch)
+
+    ivf = faiss.try_extract_index_ivf(index)
+    inner = _unwrap_id_map(index)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=min(ivf.nprobe * scale, ivf.nlist))
+    elif isinstance(inner, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch * scale)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    # SWIG 객체는 참조만 들고 있으므로 검색이 끝날 때까지 선택자와 ID 배열이 살아 있어야 합니다.
+    params._keep = (excluded, batch, selector)
+    return params
+
+
+def search_filtered(index, query, k, exclude_ids=None, max_rounds=3):
+    """exclude_ids를 제외하고 거리순 상위 k개의 (거리, ID)를 검색합니다.
+
+    근사 인덱스(IVF, HNSW)는 제외된 책이 많으면 k개를 채우지 못할 수 있으므로,
+    결과가 모자란 질의만 nprobe/efSearch를 2배씩 늘려 최대 max_rounds번 다시 검색합니다.
+    정확 검색(flat)에서 모자라면 남은 책이 k개보다 적은 것이므로 다시 검색하지 않습니다.
+    """
+    import faiss
+
+    k = min(k, index.ntotal)
+    if exclude_ids is None or not len(exclude_ids):
+        return index.search(query, k)
+
+    distances, ids = index.search(query, k, params=search_parameters(index, exclude_ids))
+    if faiss.try_extract_index_ivf(index) is None and not isinstance(_unwrap_id_map(index), faiss.IndexHNSW):
+        return distances, ids
+
+    scale = 1
+    for _ in range(max_rounds):
+        short = np.flatnonzero((ids == -1).any(axis=1))
+        if not len(short):
+            break
+        scale *= 2
+        distances[short], ids[short] = index.search(query[short], k, params=search_parameters(index, exclude_ids, scale))
+    return distances, ids
+
+
+def _fsync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path):
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _new_version_name():
+    return f"{timezone.now().strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(2)}"
+
+
+def publish(index, book_ids, vectors, journal_position, extra_manifest=None):
+    """인덱스와 ID/벡터 행렬을 새 버전으로 저장하고 CURRENT를 원자적으로 교체합니다.
+
+    journal_position은 이 인덱스에 이미 반영된 마지막 저널 ID입니다.
+    (DB에서 벡터를 읽기 전에 journal_head()로 구해 두면 됩니다.)
+    새 버전 이름을 반환합니다.
+    """
+    import faiss
+
+    os.makedirs(index_dir(), exist_ok=True)
+    version = _new_version_name()
+    tmp_dir = os.path.join(index_dir(), TMP_PREFIX + version)
+    os.makedirs(tmp_dir)
+
+    order = np.argsort(book_ids, kind='stable')
+    faiss.write_index(index, os.path.join(tmp_dir, INDEX_FILE))
+    # np.save는 데이터 시작 위치를 64바이트 경계에 맞추므로 mmap으로 바로 읽을 수 있습니다.
+    np.save(os.path.join(tmp_dir, IDS_FILE), np.ascontiguousarray(book_ids[order], dtype=np.int64))
+    np.save(os.path.join(tmp_dir, VECTORS_FILE), np.ascontiguousarray(vectors[order], dtype=np.float32))
+
+    manifest = {
+        'version': version,
+        'book_count': int(index.ntotal),
+        'dimension': int(vectors.shape[1]),
+        'built_at': timezone.now().isoformat(),
+        'journal_position': int(journal_position),
+    }
+    manifest.update(extra_manifest or {})
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    for filename in (INDEX_FILE, IDS_FILE, VECTORS_FILE, MANIFEST_FILE):
+        _fsync_file(os.path.join(tmp_dir, filename))
+    _fsync_dir(tmp_dir)
+
+    previous = current_version()
+    os.rename(tmp_dir, version_path(version))
+    _set_current(version)
+
+    # 이전 버전을 쓰는 워커는 그 버전의 journal_position 이후 기록만 읽으므로, 그 앞부분은 지워도 됩니다.
+    if previous is not None:
+        IndexJournal.objects.filter(id__lte=read_manifest(previous).get('journal_position', 0)).delete()
+    collect_garbage()
+    return version
+
+
+def _set_current(version):
+    tmp_path = current_file_path() + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, current_file_path())
+    _fsync_dir(index_dir())
+
+
+# --- 저널 ---------------------------------------------------------------------
+
+# position: 반영된 마지막 저널 ID, upserts: {book_id: 벡터}, deletes: 인덱스에서 뺄 book_id 집합
+JournalChanges = namedtuple('JournalChanges', ['position', 'upserts', 'deletes'])
+
+
+def record_changes(upsert_ids=(), delete_ids=()):
+    """책 임베딩 변경을 저널에 기록합니다."""
+    IndexJournal.objects.bulk_create(
+        [IndexJournal(book_id=book_id, op=IndexJournal.OP_UPSERT) for book_id in upsert_ids]
+        + [IndexJournal(book_id=book_id, op=IndexJournal.OP_DELETE) for book_id in delete_ids]
+    )
+
+
+def journal_head():
+    """가장 최근 저널 ID를 반환합니다. 저널이 비어 있으면 0입니다."""
+    return IndexJournal.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def journal_changes(after):
+    """after 이후의 저널을 책별 마지막 상태로 합쳐 JournalChanges로 반환합니다."""
+    last_op = {}
+    position = after
+    for entry_id, book_id, op in IndexJournal.objects.filter(id__gt=after).order_by('id').values_list('id', 'book_id', 'op'):
+        last_op[book_id] = op
+        position = entry_id
+
+    upsert_ids = [book_id for book_id, op in last_op.items() if op == IndexJournal.OP_UPSERT]
+    upserts = fetch_embeddings(upsert_ids)
+    # 저널 기록 이후 벡터가 지워진 책도 인덱스에서 뺍니다.
+    deletes = set(last_op) - set(upserts)
+    return JournalChanges(position, upserts, deletes)
+
+
+def apply_changes(index, book_ids, vectors, changes, **params):
+    """힙에 로드한 인덱스에 저널 변경을 remove_ids/add_with_ids로 반영하고 (인덱스, ID 배열, 벡터 행렬)을 반환합니다."""
+    changed = np.array(sorted(set(changes.upserts) | changes.deletes), dtype=np.int64)
+    keep = ~np.isin(book_ids, changed)
+    new_ids = np.fromiter(changes.upserts, dtype=np.int64, count=len(changes.upserts))
+    new_vectors = np.vstack(list(changes.upserts.values())).astype(np.float32) if changes.upserts else None
+
+    removable = index_supports_remove(index)
+    if removable and len(changed):
+        index.remove_ids(changed)
+    book_ids, vectors = book_ids[keep], vectors[keep]
+    if new_vectors is not None:
+        book_ids = np.concatenate([book_ids, new_ids])
+        vectors = np.vstack([vectors, new_vectors])
+
+    if not removable:
+        # HNSW는 remove_ids를 지원하지 않으므로 갱신된 벡터 행렬로 다시 만듭니다.
+        return build_index(book_ids, vectors, **params)[0], book_ids, vectors
+    if new_vectors is not None:
+        index.add_with_ids(new_vectors, new_ids)
+    return index, book_ids, vectors
+
+
+def index_supports_remove(index):
+    import faiss
+
+    return not isinstance(_unwrap_id_map(index), faiss.IndexHNSW)
+
+
+# --- 서빙 ---------------------------------------------------------------------
+
+def read_index(version=None, mmap=False):
+    """FAISS 인덱스를 읽고 검색 파라미터를 적용합니다. mmap=True이면 벡터 데이터를 힙에 복사하지 않고 매핑합니다."""
+    import faiss
+
+    version = version or current_version()
+    path = version_path(version, INDEX_FILE)
+    if not mmap:
+        return configure_search(faiss.read_index(path))
+    if read_manifest(version).get('index_type', 'flat').startswith('ivf'):
+        # IVF 계열은 inverted list를 IO_FLAG_MMAP으로 매핑합니다.
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    else:
+        # Flat/HNSW는 IO_FLAG_MMAP_IFC로 벡터(코드) 배열을 그대로 매핑합니다.
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+    return configure_search(faiss.read_index(path, flags))
+
+
+def read_vectors(version=None, mmap=False):
+    """(ID 배열, 벡터 행렬)을 읽습니다. 파일이 없으면 (None, None)을 반환합니다."""
+    version = version or current_version()
+    id_file, vector_file = version_path(version, IDS_FILE), version_path(version, VECTORS_FILE)
+    if not (os.path.exists(id_file) and os.path.exists(vector_file)):
+        return None, None
+    mmap_mode = 'r' if mmap else None
+    return np.load(id_file, mmap_mode=mmap_mode), np.load(vector_file, mmap_mode=mmap_mode)
+
+
+def acquire_lease(version):
+    """이 프로세스가 버전을 사용 중임을 표시하는 공유 잠금을 잡고 파일 디스크립터를 반환합니다."""
+    fd = os.open(version_path(version, MANIFEST_FILE), os.O_RDONLY)
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+    return fd
+
+
+def release_lease(fd):
+    try:
+        os.close(fd)
+    except OSError:
+        pass
+
+
+def collect_garbage(stale_tmp_seconds=3600):
+    """CURRENT가 아니고 어떤 프로세스도 사용하지 않는 버전을 삭제합니다. 삭제한 버전 목록을 반환합니다."""
+    if fcntl is None or not os.path.isdir(index_dir()):
+        return []
+
+    current = current_version()
+    removed = []
+    for version in list_versions():
+        if version == current:
+            continue
+        fd = os.open(version_path(version, MANIFEST_FILE), os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            continue  # 아직 사용 중인 워커가 있습니다.
+        else:
+            shutil.rmtree(version_path(version), ignore_errors=True)
+            removed.append(version)
+        finally:
+            os.close(fd)
+
+    # 빌드 도중 중단되어 남은 임시 디렉터리 정리
+    now = time.time()
+    for name in os.listdir(index_dir()):
+        path = os.path.join(index_dir(), name)
+        if name.startswith(TMP_PREFIX) and now - os.path.getmtime(path) > stale_tmp_seconds:
+            shutil.rmtree(path, ignore_errors=True)
+    return removed
@@ -0,0 +1,138 @@
+# books/interests.py
+"""
+다중 관심사 사용자 프로필 모듈입니다. (선택 기능)
+
+평균 취향 벡터 하나는 추리 소설과 요리책을 함께 읽는 사용자를 어느 쪽에도 가깝지 않은 곳에 놓습니다.
+settings.REC_INTEREST_CLUSTERS가 2 이상이면 최근에 읽은 책 벡터를 평점 가중 k-means로 최대 그 수만큼의
+관심사 중심 벡터로 나누고, 중심 벡터들을 한 번의 다중 질의 검색(LoadedIndex.search)으로 찾은 뒤
+라운드 로빈(관심사 비중만큼 번갈아) 또는 점수(가장 가까운 중심까지의 거리) 방식으로 합칩니다.
+
+k-means는 가장 가중치가 큰 책에서 시작하는 최원점 초기화를 쓰므로 같은 입력이면 항상 같은 결과가 나옵니다.
+(실시간 추천과 precompute_recommendations의 결과가 같아야 합니다)
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+
+from .models import ReadingEntry
+from .recommendation import RATING_MULTIPLIERS, get_book_vectors
+
+FUSION_METHODS = ('round_robin', 'score')
+MAX_BOOKS = 200  # 관심사를 나눌 때 볼 최근 독서 기록 수
+ITERATIONS = 10
+
+
+def enabled():
+    return settings.REC_INTEREST_CLUSTERS > 1
+
+
+def recent_entries(user_ids):
+    """사용자별 최근 독서 기록 [(book_id, 평점)]을 최대 MAX_BOOKS개씩 한 번의 쿼리로 읽습니다."""
+    entries = defaultdict(list)
+    rows = ReadingEntry.objects.filter(user_id__in=user_ids).order_by('user_id', '-read_date', '-id')
+    for user_id, book_id, rating in rows.values_list('user_id', 'book_id', 'rating'):
+        if len(entries[user_id]) < MAX_BOOKS:
+            entries[user_id].append((book_id, rating))
+    return entries
+
+
+def kmeans(vectors, weights, m, iterations=ITERATIONS):
+    """가중 k-means로 최대 m개의 중심 벡터 (m', 차원) float32와 각 군집의 가중치 비중 (m',)을 반환합니다."""
+    x = np.asarray(vectors, dtype=np.float32)
+    w = np.asarray(weights, dtype=np.float32)
+
+    # 최원점 초기화: 가장 무거운 책에서 시작해, 이미 고른 중심에서 (가중치를 곱해) 가장 먼 책을 차례로 고릅니다.
+    chosen = [int(np.argmax(w))]
+    nearest = ((x - x[chosen[0]]) ** 2).sum(axis=1)
+    while len(chosen) < min(m, len(x)):
+        candidate = int(np.argmax(nearest * w))
+        if nearest[candidate] <= 1e-12:
+            break  # 남은 책이 모두 이미 고른 중심과 같습니다.
+        chosen.append(candidate)
+        nearest = np.minimum(nearest, ((x - x[candidate]) ** 2).sum(axis=1))
+
+    centroids = x[chosen]
+    norms = (x ** 2).sum(axis=1)
+    for _ in range(iterations):
+        distances = norms[:, None] - 2 * x @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+        labels = distances.argmin(axis=1)
+        members = (labels[:, None] == np.arange(len(centroids))[None, :]) * w[:, None]
+        totals = members.sum(axis=0)
+        keep = totals > 0
+        updated = (members.T @ x)[keep] / totals[keep, None]
+        converged = keep.all() and np.allclose(updated, centroids, atol=1e-6)
+        centroids, totals = updated.astype(np.float32), totals[keep]
+        if converged:
+            break
+    return centroids, totals / totals.sum()
+
+
+def interest_vectors(entries, m=None):
+    """독서 기록 [(book_id, 평점)]으로 (중심 벡터 행렬, 비중)을 만듭니다.
+
+    관심사를 2개 이상으로 나눌 만큼 책이 없으면 None이며, 이때는 평균 취향 벡터를 그대로 씁니다.
+    """
+    m = settings.REC_INTEREST_CLUSTERS if m is None else m
+    clusters = min(m, len(entries) // max(settings.REC_INTEREST_MIN_BOOKS, 1))
+    if clusters < 2:
+        return None
+    book_vectors = get_book_vectors([book_id for book_id, _ in entries])
+    found = [(book_vectors[book_id], RATING_MULTIPLIERS.get(rating, 1.0)) for book_id, rating in entries if book_id in book_vectors]
+    if len(found) < 2:
+        return None
+    centroids, shares = kmeans(np.vstack([vector for vector, _ in found]), [weight for _, weight in found], clusters)
+    return (centroids, shares) if len(centroids) > 1 else None
+
+
+def for_user(user_id):
+    """기능이 꺼져 있거나 관심사를 나눌 수 없으면 None, 아니면 (중심 벡터 행렬, 비중)"""
+    if not enabled():
+        return None
+    return interest_vectors(recent_entries([user_id]).get(user_id, []))
+
+
+def fuse(distances, ids, shares, k, excluded_ids=frozenset(), method=None):
+    """중심 벡터별 검색 결과(행마다 거리순)를 합쳐 상위 k개의 [(book_id, 거리)]를 반환합니다.
+
+    - round_robin: 관심사 비중에 비례하도록 (비중 / (뽑은 수 + 1))이 가장 큰 관심사에서 차례로 하나씩 뽑습니다.
+      비중이 작은 관심사도 자리를 보장받습니다.
+    - score: 책마다 가장 가까운 중심까지의 거리로 한 번에 정렬합니다.
+    거리는 그 책을 찾은 중심 벡터까지의 거리이며, -1(빈 자리)과 excluded_ids, 중복은 빠집니다.
+    """
+    method = method or settings.REC_INTEREST_FUSION
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown interest fusion method '{method}'. Choose one of {FUSION_METHODS}.")
+    ids = np.asarray(ids)
+    distances = np.asarray(distances)
+
+    if method == 'score':
+        flat_ids, flat_distances = ids.ravel(), distances.ravel()
+        keep = flat_ids != -1
+        if excluded_ids:
+            keep &= ~np.isin(flat_ids, np.fromiter(excluded_ids, dtype=np.int64, count=len(excluded_ids)))
+        flat_ids, flat_distances = flat_ids[keep], flat_distances[keep]
+        order = np.lexsort((flat_ids, flat_distances))
+        _, first = np.unique(flat_ids[order], return_index=True)
+        order = order[np.sort(first)][:k]
+        return list(zip(flat_ids[order].tolist(), flat_distances[order].tolist()))
+
+    rows = [list(zip(ids[row].tolist(), distances[row].tolist())) for row in range(len(ids))]
+    positions = [0] * len(rows)
+    taken = [0] * len(rows)
+    selected, seen = [], set(excluded_ids)
+    while len(selected) < k:
+        active = [row for row in range(len(rows)) if positions[row] < len(rows[row])]
+        if not active:
+            break
+        row = max(active, key=lambda r: (shares[r] / (taken[r] + 1), -r))
+        while positions[row] < len(rows[row]):
+            book_id, distance = rows[row][positions[row]]
+            positions[row] += 1
+            if book_id != -1 and book_id not in seen:
+                seen.add(book_id)
+                selected.append((book_id, distance))
+                taken[row] += 1
+                break
+    return selected
@@ -0,0 +1,191 @@
+# books/item_cf.py
+"""
+독서 기록 공동 출현 기반의 아이템-아이템 협업 필터링 모듈입니다.
+
+사용자×책 희소 행렬 X(값: 독서 기록은 평점 가중치, 위시리스트는 WISHLIST_VALUE)를 만들고,
+책 열을 L2 정규화한 뒤 XᵀX를 책 chunk_size개 열씩 나누어 곱해 코사인 유사도를 구합니다.
+곱의 결과도 희소 행렬이고 한 번에 chunk_size개 열만 메모리에 있으므로, 기록이 수백만 건이어도
+밀집 행렬 없이 일정한 메모리로 계산됩니다. 책마다 상위 K개만 ItemSimilarity 테이블에 저장합니다.
+
+추천 시에는 사용자가 읽은 책들의 이웃 점수를 평점 가중치로 합산하고(cf_scores),
+FAISS 거리 점수와 settings.REC_CF_WEIGHT 비율로 섞습니다(blend).
+"""
+
+from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ItemSimilarity, ReadingEntry, Wishlist
+from .recommendation import RATING_MULTIPLIERS
+
+WISHLIST_VALUE = 0.5
+
+
+def _id_array(ids):
+    """ID 목록을 int32 배열로 (int32 범위를 넘는 ID가 있으면 int64)"""
+    array = np.fromiter(ids, dtype=np.int64, count=len(ids))
+    return array.astype(np.int32) if not len(array) or array.max() <= np.iinfo(np.int32).max else array
+
+
+def _chunks(queryset, fields, chunk_size):
+    """values_list 행을 chunk_size개씩 목록으로 읽습니다. (파이썬 객체는 한 청크만큼만 살아 있습니다)"""
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _interaction_arrays(chunk_size=100000):
+    """(user 배열, book 배열, 값 배열). 같은 (사용자, 책)은 큰 값 하나만 남깁니다.
+
+    기록을 청크 단위로 int32/float32 배열로 바꿔 이어 붙이므로, 기록 수만큼의 파이썬 객체를 한꺼번에 만들지 않습니다.
+    """
+    # 평점 → 가중치 조회 배열. 평점이 없거나 범위 밖이면 마지막 칸(-1)의 1.0을 씁니다.
+    weight_table = np.ones(7, dtype=np.float32)
+    for rating, multiplier in RATING_MULTIPLIERS.items():
+        weight_table[rating] = multiplier
+
+    users, books, values = [], [], []
+    for chunk in _chunks(ReadingEntry.objects.all(), ('user_id', 'book_id', 'rating'), chunk_size):
+        users.append(_id_array([row[0] for row in chunk]))
+        books.append(_id_array([row[1] for row in chunk]))
+        ratings = np.fromiter((-1 if row[2] is None else row[2] for row in chunk), dtype=np.int64, count=len(chunk))
+        values.append(weight_table[np.where((ratings >= 0) & (ratings <= 5), ratings, -1)])
+    for chunk in _chunks(Wishlist.objects.all(), ('user_id', 'book_id'), chunk_size):
+        users.append(_id_array([row[0] for row in chunk]))
+        books.append(_id_array([row[1] for row in chunk]))
+        values.append(np.full(len(chunk), WISHLIST_VALUE, dtype=np.float32))
+    if not users:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    users, books, values = np.concatenate(users), np.concatenate(books), np.concatenate(values)
+    order = np.lexsort((-values, books, users))
+    users, books, values = users[order], books[order], values[order]
+    first = np.ones(len(users), dtype=bool)
+    first[1:] = (users[1:] != users[:-1]) | (books[1:] != books[:-1])
+    return users[first], books[first], values[first]
+
+
+def build_item_similarity(top_k=None, chunk_size=2000, log=print):
+    """코사인 유사도 상위 top_k를 계산해 ItemSimilarity를 교체합니다. 저장한 행 수를 반환합니다.
+
+    청크마다 해당 책들의 행만 한 트랜잭션에서 바꾸므로 계산 중에도 다른 책의 이웃은 그대로 읽힙니다.
+    마지막에 이번 실행에서 다시 쓰이지 않은 (더 이상 기록이 없는 책의) 행을 지웁니다.
+    """
+    from scipy import sparse
+
+    top_k = top_k or settings.REC_CF_TOP_K
+    started = timezone.now()
+    users, books, values = _interaction_arrays()
+    if not len(users):
+        ItemSimilarity.objects.all().delete()
+        return 0
+
+    user_ids, user_rows = np.unique(users, return_inverse=True)
+    book_ids, book_cols = np.unique(books, return_inverse=True)
+    matrix = sparse.csr_matrix((values, (user_rows, book_cols)), shape=(len(user_ids), len(book_ids)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    normalized = (matrix @ sparse.diags(1.0 / np.maximum(norms, 1e-12))).tocsc()
+    transposed = normalized.T.tocsr()
+    log(f"  matrix: {len(user_ids)} users × {len(book_ids)} books, {matrix.nnz} interactions")
+
+    written = 0
+    for start in range(0, len(book_ids), chunk_size):
+        end = min(start + chunk_size, len(book_ids))
+        # (전체 책 × 청크) 유사도 블록. 희소 곱이므로 함께 읽힌 적 있는 책 쌍만 값이 생깁니다.
+        block = (transposed @ normalized[:, start:end]).tocsc()
+        objects = []
+        for col in range(end - start):
+            rows = block.indices[block.indptr[col]:block.indptr[col + 1]]
+            scores = block.data[block.indptr[col]:block.indptr[col + 1]]
+            keep = rows != start + col
+            rows, scores = rows[keep], scores[keep]
+            if len(rows) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                rows, scores = rows[best], scores[best]
+            book_id = int(book_ids[start + col])
+            objects.extend(
+                ItemSimilarity(book_id=book_id, similar_id=int(book_ids[row]), score=float(score), computed_at=started)
+                for row, score in zip(rows, scores) if score > 0
+            )
+        with transaction.atomic():
+            ItemSimilarity.objects.filter(book_id__in=book_ids[start:end].tolist()).delete()
+            ItemSimilarity.objects.bulk_create(objects, batch_size=2000)
+        written += len(objects)
+        log(f"  {end}/{len(book_ids)} books, {written} pairs")
+
+    ItemSimilarity.objects.filter(computed_at__lt=started).delete()
+    return written
+
+
+def load_neighbours(book_ids):
+    """{book_id: [(이웃 ID, 유사도), ...]}를 한 번의 쿼리로 읽습니다."""
+    neighbours = defaultdict(list)
+    rows = ItemSimilarity.objects.filter(book_id__in=list(book_ids)).values_list('book_id', 'similar_id', 'score')
+    for book_id, other, score in rows:
+        neighbours[book_id].append((other, score))
+    return neighbours
+
+
+def cf_scores(read_weights, neighbours, excluded_ids):
+    """읽은 책들의 이웃 유사도를 평점 가중치로 합산한 {후보 ID: 점수}. excluded_ids(집합)는 빠집니다."""
+    scores = defaultdict(float)
+    for book_id, weight in read_weights.items():
+        for other, similarity in neighbours.get(book_id, ()):
+            if other not in excluded_ids:
+                scores[other] += weight * similarity
+    return scores
+
+
+def content_scores(distances):
+    """{ID: 거리}를 후보 풀 안에서 min-max 정규화한 {ID: 0~1 점수} (가장 가까운 후보가 1, 가장 먼 후보가 0)
+
+    정규화하지 않은 임베딩의 제곱 L2 거리는 크기가 커서 1/(1+거리)로는 후보끼리 차이가 거의 나지 않으므로,
+    CF 점수와 같은 0~1 범위로 맞춘 뒤 섞습니다. 거리가 모두 같으면 모두 1입니다.
+    """
+    if not distances:
+        return {}
+    values = np.fromiter(distances.values(), dtype=np.float64, count=len(distances))
+    farthest, spread = values.max(), values.max() - values.min()
+    if spread <= 0:
+        return dict.fromkeys(distances, 1.0)
+    return {book_id: float((farthest - distance) / spread) for book_id, distance in distances.items()}
+
+
+def blend(index, user_vector, candidates, scores, k, weight=None):
+    """FAISS 후보 [(ID, 거리)]와 CF 점수를 섞어 상위 k개의 [(ID, 점수)]를 반환합니다.
+
+    콘텐츠 점수는 후보 풀 안에서 거리를 min-max 정규화한 0~1 값(content_scores), CF 점수는 사용자 후보 중
+    최댓값으로 나눈 0~1 값이고 최종 점수는 (1-weight)·콘텐츠 + weight·CF입니다. CF 점수가 없으면 FAISS 순서 그대로입니다.
+    CF로만 나온 후보는 index(LoadedIndex)로 검색과 같은 공간의 거리를 계산하며, 벡터가 없는 책은 빠집니다.
+    user_vector가 여러 행(다중 관심사 중심 벡터)이면 가장 가까운 중심까지의 거리를 씁니다.
+    """
+    weight = settings.REC_CF_WEIGHT if weight is None else weight
+    if not scores or weight <= 0:
+        content = content_scores(dict(candidates))
+        return [(book_id, content[book_id]) for book_id, _ in candidates[:k]]
+
+    distances = dict(candidates)
+    # CF 후보는 점수가 높은 순으로 후보 풀 크기만큼만 봅니다.
+    cf_only = [book_id for book_id in sorted(scores, key=scores.get, reverse=True) if book_id not in distances][:len(candidates) or k]
+    distances.update(index.distances(user_vector, cf_only))
+
+    content = content_scores(distances)
+    best_cf = max(scores.values())
+    blended = [
+        (book_id, (1.0 - weight) * content[book_id] + weight * scores.get(book_id, 0.0) / best_cf)
+        for book_id in distances
+    ]
+    blended.sort(key=lambda item: (-item[1], item[0]))
+    return blended[:k]
+
+
+def candidate_pool(k):
+    """CF와 섞을 때 FAISS에서 가져올 후보 수"""
+    return k * settings.REC_CF_POOL_FACTOR if settings.REC_CF_WEIGHT > 0 else k
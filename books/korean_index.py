@@ -0,0 +1,257 @@
+# books/korean_index.py
+"""
+책 제목/저자를 워커 메모리에 들고 있는 한글 bigram + 초성 검색 색인입니다. (플랜 만들기 책 검색 자동 완성용)
+
+한글 제목은 띄어쓰기로 잘 나뉘지 않고('해리포터와마법사의돌'), 사용자는 초성만('ㅎㄹㅍㅌ') 입력하기도 합니다.
+책마다 '정규화한 제목 \\x1f 정규화한 저자'를 하나의 긴 문자열에 이어 붙이고, 연속한 두 글자(bigram)를
+(앞 글자 코드 << 21 | 뒤 글자 코드) 정수 키로 만들어 정렬된 배열(CSR: 키, 시작 위치, 책 행 번호)로 저장합니다.
+같은 문자열의 음절을 초성으로 바꿔(books/hangul.py) 초성 bigram 색인도 따로 만듭니다.
+
+책 행 번호는 (정규화한 제목 길이, 책 ID) 순서로 매기므로 모든 책 목록이 이미 제목이 짧은 순입니다.
+검색은 가장 짧은 bigram 책 목록을 앞에서부터 조금씩 잘라 나머지 목록에 이진 검색으로 있는지 확인하고,
+실제 문자열과 대조해(bigram이 모두 있어도 연속해서 나오지 않을 수 있으므로) k × VERIFY_FACTOR개가 모이면 멈춘 뒤
+제목 시작 → 제목 포함 → 저자 포함, 제목 길이 순으로 정렬합니다.
+한 글자 검색어는 제목 첫 글자(초성) 순으로 정렬한 배열에서 제목이 그 글자로 시작하는 책만 찾습니다.
+정규화: NFC(맥의 NFD 입력 대응), casefold, 모든 공백 제거 ('해리 포터'와 '해리포터'가 같은 검색어)
+
+책이 추가/수정/삭제되면 카탈로그 버전(books/catalog.py)이 올라가고, get_korean_index()가
+settings.BOOK_SEARCH_RELOAD_INTERVAL초마다 버전을 확인해 백그라운드에서 다시 만듭니다. (catalog.Reloadable)
+"""
+
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+from . import catalog, hangul
+from .models import Book
+
+FIELD_SEPARATOR = '\x1f'  # 제목과 저자 사이 (검색어에 나올 수 없으므로 경계를 넘는 bigram은 버립니다)
+DOC_SEPARATOR = '\x1e'  # 책과 책 사이
+CODE_BITS = 21  # 유니코드 코드 포인트는 21비트 안에 들어갑니다.
+VERIFY_FACTOR = 4  # 후보를 k의 이 배수만큼 확인한 뒤 순위를 매깁니다.
+FIRST_CHUNK = 256  # 교집합을 확인할 첫 후보 묶음 크기 (모자라면 두 배씩 늘립니다)
+
+_SEPARATOR_CODES = np.array([ord(FIELD_SEPARATOR), ord(DOC_SEPARATOR)], dtype=np.int64)
+_CHOSUNG_CODES = np.array([ord(char) for char in hangul.CHOSUNG_LIST], dtype=np.int64)
+_SYLLABLE_FIRST = ord(hangul.SYLLABLE_FIRST)
+_SYLLABLE_LAST = ord(hangul.SYLLABLE_LAST)
+_SYLLABLES_PER_CHOSUNG = hangul.JUNGSUNG_COUNT * hangul.JONGSUNG_COUNT
+
+
+def normalize(text):
+    """NFC 정규화, casefold, 모든 공백과 구분 문자 제거"""
+    text = ''.join(unicodedata.normalize('NFC', text or '').casefold().split())
+    return text.replace(FIELD_SEPARATOR, '').replace(DOC_SEPARATOR, '')
+
+
+def _codes(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+
+def _to_chosung_codes(codes):
+    """hangul.to_chosung과 같은 계산을 코드 배열에 한 번에 적용합니다."""
+    codes = codes.copy()
+    syllable = (codes >= _SYLLABLE_FIRST) & (codes <= _SYLLABLE_LAST)
+    codes[syllable] = _CHOSUNG_CODES[(codes[syllable] - _SYLLABLE_FIRST) // _SYLLABLES_PER_CHOSUNG]
+    return codes
+
+
+def _pair_keys(codes):
+    return (codes[:-1] << CODE_BITS) | codes[1:]
+
+
+class _Postings:
+    """bigram 키 → 그 bigram이 들어 있는 책 행 번호(정렬, 중복 없음)"""
+
+    def __init__(self, keys, starts, rows):
+        self.keys = keys
+        self.starts = starts
+        self.rows = rows
+
+    @classmethod
+    def build(cls, codes, doc_rows, keep):
+        """codes[i], codes[i+1] 쌍 중 keep인 것만 (키, 책 행) 순으로 정렬해 중복을 지우고 CSR로 묶습니다."""
+        keys, rows = _pair_keys(codes)[keep], doc_rows[:-1][keep]
+        order = np.lexsort((rows, keys))
+        keys, rows = keys[order], rows[order]
+        if len(keys):
+            new = np.ones(len(keys), dtype=bool)
+            new[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+            keys, rows = keys[new], rows[new]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        return cls(keys[starts], np.r_[starts, len(keys)].astype(np.int32), rows.astype(np.int32))
+
+    def get(self, key):
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.rows[self.starts[i]:self.starts[i + 1]]
+        return self.rows[:0]
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.starts.nbytes + self.rows.nbytes
+
+
+class _FirstChars:
+    """제목 첫 글자 코드 → 그 글자로 시작하는 책 행 (행 번호 순 = 제목이 짧은 순)"""
+
+    def __init__(self, first_codes):
+        order = np.lexsort((np.arange(len(first_codes)), first_codes))
+        self.codes = first_codes[order]
+        self.rows = order.astype(np.int32)
+
+    def rows_for(self, code, k):
+        lo, hi = np.searchsorted(self.codes, [code, code + 1])
+        return self.rows[lo:min(hi, lo + k)]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.rows.nbytes
+
+
+class KoreanIndex:
+    """정규화한 책 문자열, bigram 색인, 초성 bigram 색인. 만든 뒤에는 변경하지 않습니다."""
+
+    def __init__(self, version, book_ids, text, offsets, title_lengths, grams, chosung_grams, first_chars, first_chosungs):
+        self.version = version
+        self.book_ids = book_ids
+        self.text = text
+        self.offsets = offsets
+        self.title_lengths = title_lengths
+        self.grams = grams
+        self.chosung_grams = chosung_grams
+        self.first_chars = first_chars
+        self.first_chosungs = first_chosungs
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, version=None, rows=None):
+        """(책 ID, 제목, 저자) 목록으로 색인을 만듭니다. rows를 주지 않으면 DB에서 읽습니다."""
+        if rows is None:
+            rows = Book.objects.values_list('id', 'title', 'author')
+        docs = sorted((len(title), book_id, title + FIELD_SEPARATOR + normalize(author))
+                      for book_id, title, author in ((book_id, normalize(title), author) for book_id, title, author in rows))
+
+        text = DOC_SEPARATOR.join(doc for _, _, doc in docs) + DOC_SEPARATOR
+        lengths = np.fromiter((len(doc) + 1 for _, _, doc in docs), dtype=np.int64, count=len(docs))
+        offsets = np.r_[0, np.cumsum(lengths)].astype(np.int64)
+        codes = _codes(text)
+        doc_rows = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)
+
+        separator = np.isin(codes, _SEPARATOR_CODES)
+        grams = _Postings.build(codes, doc_rows, ~separator[:-1] & ~separator[1:])
+        # 초성 색인은 초성-초성 쌍만 저장합니다. (음절이 섞인 검색어는 일반 bigram 색인과 함께 씁니다)
+        chosung_codes = _to_chosung_codes(codes)
+        jamo = np.isin(chosung_codes, _CHOSUNG_CODES)
+        chosung_grams = _Postings.build(chosung_codes, doc_rows, jamo[:-1] & jamo[1:])
+        return cls(
+            version,
+            np.fromiter((book_id for _, book_id, _ in docs), dtype=np.int64, count=len(docs)),
+            text, offsets,
+            np.fromiter((length for length, _, _ in docs), dtype=np.int32, count=len(docs)),
+            grams, chosung_grams,
+            _FirstChars(codes[offsets[:-1]]), _FirstChars(chosung_codes[offsets[:-1]]),
+        )
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    @property
+    def nbytes(self):
+        """색인이 차지하는 대략의 메모리 (문자열 포함)"""
+        arrays = self.book_ids.nbytes + self.offsets.nbytes + self.title_lengths.nbytes
+        arrays += self.first_chars.nbytes + self.first_chosungs.nbytes
+        return arrays + self.grams.nbytes + self.chosung_grams.nbytes + sys.getsizeof(self.text)
+
+    def _doc(self, row):
+        return self.text[self.offsets[row]:self.offsets[row + 1] - 1]
+
+    def search(self, query, k=10):
+        """검색어와 일치하는 책 ID를 최대 k개 반환합니다. 초성 자모가 섞여 있으면 초성 검색입니다. (예: 'ㅎㄹㅍㅌ', '해리ㅍ')"""
+        q = normalize(query)
+        if not q or k <= 0:
+            return []
+        chosung = any(hangul.is_chosung(char) for char in q)
+        if len(q) == 1:
+            first = self.first_chosungs if chosung else self.first_chars
+            return [int(book_id) for book_id in self.book_ids[first.rows_for(ord(q), k)]]
+        if chosung:
+            return self._search_chosung(q, k)
+        lists = [self.grams.get(key) for key in np.unique(_pair_keys(_codes(q)))]
+        return self._collect(lists, k, len(q), lambda row: self._doc(row).find(q))
+
+    def _search_chosung(self, q, k):
+        projected = hangul.to_chosung(q)
+        codes, projected_codes = _codes(q), _codes(projected)
+        jamo = np.isin(projected_codes, _CHOSUNG_CODES)
+        typed_jamo = np.isin(codes, _CHOSUNG_CODES)
+        lists = [self.chosung_grams.get(key) for key in np.unique(_pair_keys(projected_codes)[jamo[:-1] & jamo[1:]])]
+        # 음절로 입력한 부분은 일반 bigram 색인으로도 좁힙니다.
+        lists += [self.grams.get(key) for key in np.unique(_pair_keys(codes)[~typed_jamo[:-1] & ~typed_jamo[1:]])]
+        if not lists:
+            # 인접한 초성이 없는 검색어(예: 'aㅎ')는 첫 초성으로 시작하는 제목만 봅니다.
+            lists = [np.sort(self.first_chosungs.rows_for(int(projected_codes[np.argmax(jamo)]), len(self)))]
+        fixed = [(i, char) for i, char in enumerate(q) if not hangul.is_chosung(char)]
+
+        def match(row):
+            # 초성 문자열에서 위치를 찾고, 음절로 입력한 글자는 원래 문자열과 같은지 확인합니다.
+            doc = self._doc(row)
+            chosung_doc = hangul.to_chosung(doc)
+            start = chosung_doc.find(projected)
+            while start >= 0:
+                if all(doc[start + i] == char for i, char in fixed):
+                    return start
+                start = chosung_doc.find(projected, start + 1)
+            return -1
+
+        return self._collect(lists, k, len(q), match)
+
+    def _candidates(self, lists):
+        """가장 짧은 목록을 앞에서부터 묶음으로 잘라 나머지 목록 모두에 있는 행만 차례로 내보냅니다. (행 번호 순)"""
+        lists = sorted(lists, key=len)
+        base, others = lists[0], lists[1:]
+        start, size = 0, FIRST_CHUNK
+        while start < len(base):
+            chunk = base[start:start + size]
+            for rows in others:
+                if not len(chunk):
+                    break
+                positions = np.minimum(np.searchsorted(rows, chunk), len(rows) - 1)
+                chunk = chunk[rows[positions] == chunk] if len(rows) else chunk[:0]
+            yield from chunk.tolist()
+            start += size
+            size *= 2
+
+    def _collect(self, lists, k, length, match):
+        """후보를 제목이 짧은 순으로 확인해 k × VERIFY_FACTOR개를 모은 뒤 (제목 시작, 제목 포함, 저자 포함), 제목 길이 순으로 자릅니다."""
+        found = []
+        for row in self._candidates(lists):
+            position = match(row)
+            if position < 0:
+                continue
+            title_length = int(self.title_lengths[row])
+            place = 0 if position == 0 else 1 if position + length <= title_length else 2
+            found.append((place, title_length, row))
+            if len(found) >= k * VERIFY_FACTOR:
+                break
+        found.sort()
+        return [int(self.book_ids[row]) for _, _, row in found[:k]]
+
+
+_index = catalog.Reloadable(lambda version: KoreanIndex.build(version))
+
+
+def refresh(version=None):
+    """색인을 지금 다시 만듭니다."""
+    return _index.refresh(version)
+
+
+def get_korean_index():
+    """현재 색인을 반환합니다. 처음 호출되면 만들고, 카탈로그 버전이 바뀌었으면 백그라운드에서 다시 만듭니다."""
+    return _index.get()
+
+
+def search_ids(query, k=10):
+    return get_korean_index().search(query, k)
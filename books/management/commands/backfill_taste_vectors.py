@@ -0,0 +1,30 @@
+# books/management/commands/backfill_taste_vectors.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from books import taste
+from books.models import UserTasteVector
+
+
+class Command(BaseCommand):
+    help = '모든 사용자의 취향 벡터(평점 가중 합)를 독서 기록 전체로 다시 계산합니다. (임베딩 생성은 바뀐 책을 읽은 사용자만 자동으로 다시 계산합니다)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200000, help='한 번에 행렬 연산할 독서 기록 수')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        computed = taste.compute_taste_vectors(chunk_size=options['chunk_size'])
+        users = computed[0]
+        compute_seconds = time.perf_counter() - started
+
+        saved = taste.save_taste_vectors(computed)
+        # 벡터가 있는 책을 하나도 읽지 않은 사용자의 예전 취향 벡터는 지웁니다.
+        stale, _ = UserTasteVector.objects.exclude(user_id__in=users.tolist()).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved taste vectors for {saved} users ({int(computed[3].sum())} reading entries) "
+            f"in {time.perf_counter() - started:.1f}s (numpy {compute_seconds:.2f}s), removed {stale} stale."
+        ))
@@ -0,0 +1,105 @@
+# books/management/commands/benchmark_book_search.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from books import text_search
+from books.models import Book
+
+MARKER = '__search_benchmark__'  # 벤치마크가 만든 책의 publisher 값 (끝나면 이 값으로 지웁니다)
+
+
+class Command(BaseCommand):
+    help = (
+        '책 검색(book_search, book_search_api)의 전문 검색 인덱스와 예전 icontains 검색의 p50/p95 지연 시간을 '
+        '카탈로그 크기별로 비교합니다. 크기를 채우려고 가짜 책을 추가하고 끝나면 지웁니다. (운영 DB에서 실행하지 마세요)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='10000,100000,1000000', help='쉼표로 구분한 카탈로그 크기')
+        parser.add_argument('--queries', type=int, default=200, help='크기마다 실행할 검색어 수')
+        parser.add_argument('--limit', type=int, default=50, help='검색어마다 가져올 결과 수 (book_search_api와 같음)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='가짜 책을 한 번에 추가할 수')
+        parser.add_argument('--keep', action='store_true', help='끝난 뒤 가짜 책을 지우지 않습니다.')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(',') if size.strip())
+        rng = np.random.default_rng(42)
+        titles = list(Book.objects.exclude(publisher=MARKER).values_list('title', 'author')[:20000])
+        if not titles:
+            raise CommandError("No books found. Load the catalog first.")
+        words = sorted({word for title, _ in titles for word in title.split() if word})
+        authors = sorted({author for _, author in titles if author}) or ['작가']
+
+        self.stdout.write(f"backend={text_search.backend()} vendor={connection.vendor} limit={options['limit']}")
+        self.stdout.write(f"{'books':>9} {'mode':>10} {'p50(ms)':>8} {'p95(ms)':>8} {'max(ms)':>8} {'avg hits':>9} {'orm':>5}")
+        try:
+            for size in sizes:
+                added = self._fill(size, words, authors, rng, options['batch_size'])
+                if added:
+                    self.stdout.write(f"  (added {added} synthetic books)")
+                queries = self._queries(titles, words, rng, options['queries'])
+                # 전문 검색 인덱스가 처리하지 못해 ORM 검색으로 대신한 검색어 비율 (SQLite에서 두 글자 이하 등)
+                min_length = text_search.MIN_TERM_LENGTH.get(text_search.backend(), 0)
+                fallback = np.mean([
+                    text_search.backend() == 'orm' or all(len(term) < min_length for term in text_search.split_terms(query))
+                    for query in queries
+                ])
+                for mode, search in (('fulltext', self._fulltext), ('icontains', self._icontains)):
+                    latencies, hits = [], []
+                    for query in queries:
+                        started = time.perf_counter()
+                        found = search(query, options['limit'])
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        hits.append(len(found))
+                    self.stdout.write(
+                        f"{Book.objects.count():9d} {mode:>10} {np.percentile(latencies, 50):8.2f} "
+                        f"{np.percentile(latencies, 95):8.2f} {max(latencies):8.2f} {np.mean(hits):9.1f} "
+                        f"{fallback if mode == 'fulltext' else 1:5.0%}"
+                    )
+        finally:
+            if not options['keep']:
+                with connection.cursor() as cursor:
+                    cursor.execute("DELETE FROM book WHERE publisher = %s", [MARKER])
+                    self.stdout.write(f"Removed {cursor.rowcount} synthetic books.")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _fill(self, size, words, authors, rng, batch_size):
+        """카탈로그가 size권이 될 때까지 실제 제목 단어를 섞은 가짜 책을 추가합니다."""
+        missing = size - Book.objects.count()
+        added = 0
+        while added < missing:
+            count = min(batch_size, missing - added)
+            books = []
+            for _ in range(count):
+                title = ' '.join(rng.choice(words, int(rng.integers(1, 4))).tolist()) if words else f"책 {added}"
+                books.append(Book(title=title, author=str(rng.choice(authors)), publisher=MARKER))
+            Book.objects.bulk_create(books, batch_size=batch_size)
+            added += count
+        return added
+
+    def _queries(self, titles, words, rng, count):
+        """플랜 만들기 책 검색처럼 제목 앞부분(2~6글자), 제목 단어 하나, 저자 이름을 섞은 검색어"""
+        queries = []
+        for i in range(count):
+            title, author = titles[int(rng.integers(len(titles)))]
+            if i % 3 == 0:
+                queries.append(title[:int(rng.integers(2, 7))])
+            elif i % 3 == 1 and words:
+                queries.append(str(rng.choice(words)))
+            else:
+                queries.append(author or title)
+        return [query.strip() for query in queries if query.strip()]
+
+    def _fulltext(self, query, limit):
+        return text_search.search_book_ids(query, limit)
+
+    def _icontains(self, query, limit):
+        # 예전 book_search_api의 쿼리
+        return list(
+            Book.objects.filter(Q(title__icontains=query) | Q(author__icontains=query)).distinct().values_list('id', flat=True)[:limit]
+        )
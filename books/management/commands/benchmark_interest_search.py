@@ -0,0 +1,88 @@
+# books/management/commands/benchmark_interest_search.py
+
+import time
+
+import faiss
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books import interests, recommendation
+
+
+class Command(BaseCommand):
+    help = '평균 취향 벡터 하나로 검색할 때와 다중 관심사(k-means 중심 벡터 여러 개)로 검색할 때의 지연 시간과 적중률을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=300, help='만들어 볼 가상 사용자 수')
+        parser.add_argument('--interests', type=int, default=3, help='가상 사용자마다 섞을 서로 다른 관심사 수')
+        parser.add_argument('--read-per-interest', type=int, default=5, help='관심사마다 읽은 것으로 칠 책 수')
+        parser.add_argument('--clusters', type=int, default=None, help='나눌 최대 관심사 수 (기본: REC_INTEREST_CLUSTERS, 1이면 3)')
+        parser.add_argument('--k', type=int, default=30)
+        parser.add_argument('--omp-threads', type=int, default=1, help='FAISS(OpenMP) 스레드 수')
+
+    def handle(self, *args, **options):
+        index = recommendation.load_index()
+        if index is None:
+            raise CommandError("No FAISS index version found. Run 'python build_faiss_index.py' first.")
+        faiss.omp_set_num_threads(options['omp_threads'])
+
+        k = options['k']
+        clusters = options['clusters'] or max(settings.REC_INTEREST_CLUSTERS, 3)
+        users = self._make_users(index, options['users'], options['interests'], options['read_per_interest'])
+        self.stdout.write(
+            f"books={index.index.ntotal} users={len(users)} interests/user={options['interests']} "
+            f"read/user={options['interests'] * options['read_per_interest']} clusters<={clusters} k={k}"
+        )
+        self.stdout.write(f"{'mode':>12} {'p50(ms)':>8} {'p95(ms)':>8} {'x mean':>7} {'recall@' + str(k):>10} {'coverage':>9}")
+
+        baseline = None
+        for mode in ('mean',) + interests.FUSION_METHODS:
+            latencies, recalls, coverages = [], [], []
+            for entries, held_out in users:
+                started = time.perf_counter()
+                found = self._recommend(index, entries, k, clusters, mode)
+                latencies.append((time.perf_counter() - started) * 1000)
+                found = set(found)
+                recalls.append(sum(len(found & group) for group in held_out) / sum(len(group) for group in held_out))
+                coverages.append(np.mean([bool(found & group) for group in held_out]))
+            p50 = np.percentile(latencies, 50)
+            baseline = baseline or p50
+            self.stdout.write(
+                f"{mode:>12} {p50:8.3f} {np.percentile(latencies, 95):8.3f} {p50 / baseline:7.2f} "
+                f"{np.mean(recalls):10.3f} {np.mean(coverages):9.3f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "Benchmark finished. (coverage: 숨겨 둔 관심사 중 추천에 한 권이라도 나온 비율)"
+        ))
+
+    def _make_users(self, index, count, interest_count, read_per_interest):
+        """관심사마다 임의의 책 하나와 그 이웃을 골라, 앞쪽 절반은 읽은 책으로, 나머지는 맞혀야 할 책으로 나눕니다."""
+        rng = np.random.default_rng(42)
+        neighbours = read_per_interest * 2 + 1
+        users = []
+        for _ in range(count):
+            seeds = rng.choice(len(index.book_ids), interest_count, replace=False)
+            _, ids = index.search(np.asarray(index.vectors[seeds], dtype=np.float32), neighbours)
+            entries, held_out = [], []
+            for row in ids:
+                row = [int(book_id) for book_id in row if book_id != -1]
+                entries.extend((book_id, int(rng.integers(3, 6))) for book_id in row[:read_per_interest])
+                held_out.append(set(row[read_per_interest:]))
+            users.append((entries, held_out))
+        return users
+
+    def _recommend(self, index, entries, k, clusters, mode):
+        """실시간 추천과 같은 순서(프로필 → 한 번의 검색 → 합치기)로 상위 k개의 책 ID를 반환합니다."""
+        read = np.fromiter((book_id for book_id, _ in entries), dtype=np.int64, count=len(entries))
+        profile = interests.interest_vectors(entries, clusters) if mode != 'mean' else None
+        if profile is None:  # 관심사를 나눌 만큼 읽지 않았으면 실시간 추천처럼 평균 벡터를 씁니다.
+            vectors = recommendation.get_book_vectors(read.tolist())
+            weights = [recommendation.RATING_MULTIPLIERS.get(rating, 1.0) for _, rating in entries]
+            query = np.average(np.vstack([vectors[book_id] for book_id, _ in entries]), axis=0, weights=weights)
+            distances, ids = index.search(query.astype(np.float32).reshape(1, -1), k, exclude_ids=read)
+            return [book_id for book_id, _ in recommendation.select_candidates(ids[0], distances[0], set(), k)]
+
+        centroids, shares = profile
+        distances, ids = index.search(centroids, k, exclude_ids=read)
+        return [book_id for book_id, _ in interests.fuse(distances, ids, shares, k, method=mode)]
@@ -0,0 +1,81 @@
+# books/management/commands/benchmark_korean_search.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from books import hangul, korean_index, text_search
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        '메모리 한글 bigram/초성 색인(books/korean_index.py)의 빌드 시간, 메모리, 검색어 종류별 p50/p95/p99 지연 시간을 '
+        '카탈로그 크기별로 측정합니다. 가짜 책은 메모리에서만 만들고 DB에는 쓰지 않습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='0,100000,1000000', help='쉼표로 구분한 책 수 (0은 현재 카탈로그)')
+        parser.add_argument('--queries', type=int, default=300, help='검색어 종류마다 실행할 수')
+        parser.add_argument('--k', type=int, default=10, help='자동 완성 결과 수')
+
+    def handle(self, *args, **options):
+        catalog = list(Book.objects.order_by('id').values_list('id', 'title', 'author'))
+        if not catalog:
+            raise CommandError("No books found. Load the catalog first.")
+        words = sorted({word for _, title, _ in catalog for word in (title or '').split()})
+        authors = sorted({author for _, _, author in catalog if author}) or ['작가']
+        rng = np.random.default_rng(42)
+        k = options['k']
+
+        self.stdout.write(f"{'books':>9} {'build(s)':>9} {'MB':>7} {'kind':>10} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8} {'avg hits':>9}")
+        for size in (int(value) for value in options['sizes'].split(',') if value.strip()):
+            rows = catalog if size == 0 else self._synthetic(size, words, authors, rng)
+            started = time.perf_counter()
+            index = korean_index.KoreanIndex.build(rows=rows)
+            build_seconds = time.perf_counter() - started
+            titles = [title for _, title, _ in rows if title]
+            queries = self._queries(titles, rng, options['queries'])
+
+            searches = [(kind, index.search, kind_queries) for kind, kind_queries in queries.items()]
+            if size == 0:
+                # 같은 검색어를 DB 전문 검색(book_search_api)으로 했을 때와 비교합니다.
+                searches.append(('db', lambda query, k: text_search.search_book_ids(query, k), queries['substring']))
+            for kind, search, kind_queries in searches:
+                latencies, hits = [], []
+                for query in kind_queries:
+                    started = time.perf_counter()
+                    found = search(query, k)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    hits.append(len(found))
+                self.stdout.write(
+                    f"{len(rows):9d} {build_seconds:9.2f} {index.nbytes / 1024 / 1024:7.1f} {kind:>10} "
+                    f"{np.percentile(latencies, 50):8.3f} {np.percentile(latencies, 95):8.3f} "
+                    f"{np.percentile(latencies, 99):8.3f} {np.mean(hits):9.1f}"
+                )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _synthetic(self, size, words, authors, rng):
+        """실제 제목 단어와 저자를 섞은 가짜 (ID, 제목, 저자) 목록"""
+        picks = rng.integers(0, len(words), (size, 3))
+        lengths = rng.integers(1, 4, size)
+        author_picks = rng.integers(0, len(authors), size)
+        return [
+            (i + 1, ' '.join(words[j] for j in picks[i, :lengths[i]]), authors[author_picks[i]])
+            for i in range(size)
+        ]
+
+    def _queries(self, titles, rng, count):
+        """자동 완성에서 나오는 검색어: 제목을 한 글자씩 입력하는 중간 상태, 제목 속 부분 문자열, 초성, 음절+초성"""
+        picked = [titles[i] for i in rng.integers(0, len(titles), count)]
+        compact = [''.join(title.split()) for title in picked]
+        keystroke, substring, chosung, mixed = [], [], [], []
+        for title in compact:
+            keystroke.append(title[:int(rng.integers(1, len(title) + 1))])
+            start = int(rng.integers(0, max(len(title) - 1, 1)))
+            substring.append(title[start:start + int(rng.integers(2, 5))])
+            prefix = title[:int(rng.integers(2, 6))]
+            chosung.append(hangul.to_chosung(prefix))
+            mixed.append(prefix[:1] + hangul.to_chosung(prefix[1:]))
+        return {'keystroke': keystroke, 'substring': substring, 'chosung': chosung, 'mixed': mixed}
@@ -0,0 +1,88 @@
+# books/management/commands/benchmark_pagination.py
+
+import datetime
+import time
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from books import pagination
+from books.models import Book, ReadingEntry, Wishlist
+
+MARKER = '__pagination_benchmark__'  # 벤치마크가 만든 책의 publisher 값이자 사용자 이름 (끝나면 지웁니다)
+
+
+class Command(BaseCommand):
+    help = (
+        '서재/위시리스트 목록에서 페이지 번호(Paginator: COUNT + OFFSET)와 키셋(books/pagination.py) 페이지네이션의 '
+        '첫 페이지와 깊은 페이지 지연 시간을 비교합니다. 임시 사용자와 가짜 책을 만들고 끝나면 지웁니다. (운영 DB에서 실행하지 마세요)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=str, default='1,500', help='쉼표로 구분한 측정할 페이지 번호')
+        parser.add_argument('--per-page', type=int, default=10, help='페이지당 항목 수')
+        parser.add_argument('--repeats', type=int, default=30, help='페이지마다 반복 측정할 횟수')
+
+    def handle(self, *args, **options):
+        pages = sorted(int(page) for page in options['pages'].split(',') if page.strip())
+        per_page = options['per_page']
+        size = pages[-1] * per_page + per_page
+        user = get_user_model().objects.create_user(username=MARKER, email=f'{MARKER}@example.com', is_active=False)
+        try:
+            self._fill(user, size)
+            self.stdout.write(f"{size} reading entries and wishlist items, {per_page} per page, median of {options['repeats']} runs")
+            self.stdout.write(f"{'list':>9} {'page':>5} {'mode':>7} {'median(ms)':>11} {'p95(ms)':>8} {'queries':>8}")
+            lists = (
+                ('library', ReadingEntry.objects.filter(user=user).select_related('book').defer(*Book.heavy_fields('book__')),
+                 pagination.LIBRARY_ORDERING),
+                ('wishlist', Wishlist.objects.filter(user=user).select_related('book').defer(*Book.heavy_fields('book__')),
+                 pagination.WISHLIST_ORDERING),
+            )
+            for name, queryset, ordering in lists:
+                for page in pages:
+                    cursor = self._cursor_for(queryset, ordering, page, per_page)
+                    modes = (
+                        ('offset', lambda: list(Paginator(queryset.order_by(*ordering), per_page).page(page))),
+                        ('keyset', lambda: list(pagination.KeysetPaginator(queryset, ordering, per_page).get_page(cursor))),
+                    )
+                    for mode, fetch in modes:
+                        latencies = []
+                        for _ in range(options['repeats']):
+                            with CaptureQueriesContext(connection) as queries:
+                                started = time.perf_counter()
+                                fetch()
+                                latencies.append((time.perf_counter() - started) * 1000)
+                        self.stdout.write(
+                            f"{name:>9} {page:5d} {mode:>7} {np.median(latencies):11.2f} "
+                            f"{np.percentile(latencies, 95):8.2f} {len(queries.captured_queries):8d}"
+                        )
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {ReadingEntry._meta.db_table} WHERE user_id = %s", [user.id])
+                cursor.execute(f"DELETE FROM {Wishlist._meta.db_table} WHERE user_id = %s", [user.id])
+                cursor.execute(f"DELETE FROM {Book._meta.db_table} WHERE publisher = %s", [MARKER])
+            user.delete()
+            self.stdout.write("Removed the benchmark user and synthetic books.")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _fill(self, user, size):
+        """가짜 책 size권과 그 책들의 독서 기록(읽은 날짜는 하루에 여러 권씩 겹치게), 위시리스트를 만듭니다."""
+        Book.objects.bulk_create([Book(title=f"페이지 벤치마크 {i}", author='작가', publisher=MARKER) for i in range(size)], batch_size=2000)
+        book_ids = list(Book.objects.filter(publisher=MARKER).values_list('id', flat=True))
+        today = datetime.date.today()
+        ReadingEntry.objects.bulk_create(
+            [ReadingEntry(user=user, book_id=book_id, read_date=today - datetime.timedelta(days=i // 5)) for i, book_id in enumerate(book_ids)],
+            batch_size=2000,
+        )
+        Wishlist.objects.bulk_create([Wishlist(user=user, book_id=book_id) for book_id in book_ids], batch_size=2000)
+
+    def _cursor_for(self, queryset, ordering, page, per_page):
+        """page 번호의 키셋 커서 (이전 페이지의 마지막 행 값). 첫 페이지는 None입니다."""
+        if page <= 1:
+            return None
+        last = queryset.order_by(*ordering)[(page - 1) * per_page - 1]
+        return pagination.encode_cursor([getattr(last, name.lstrip('-')) for name in ordering])
@@ -0,0 +1,81 @@
+# books/management/commands/benchmark_rec_filter.py
+
+import time
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from books import genre_index, index_store, recommendation
+
+
+class Command(BaseCommand):
+    help = '5배 후보 검색 후 파이썬 필터링과 IDSelector 필터 검색의 지연 시간과 결과 개수(k개를 채운 비율)를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', type=str, default='flat,ivfflat,hnsw', help='쉼표로 구분한 인덱스 종류')
+        parser.add_argument('--queries', type=int, default=200, help='카탈로그에서 뽑을 질의 벡터 수')
+        parser.add_argument('--k', type=int, default=30)
+        parser.add_argument('--excluded', type=str, default='0,100,1000', help='질의마다 제외할 책 수 (읽은 책 수를 흉내 냅니다)')
+        parser.add_argument('--from-db', action='store_true', help='현재 인덱스 버전 대신 DB의 임베딩 벡터를 사용합니다.')
+
+    def handle(self, *args, **options):
+        if options['from_db'] or index_store.current_version() is None:
+            book_ids, vectors = index_store.load_embeddings_from_db()
+        else:
+            book_ids, vectors = index_store.read_vectors()
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(book_ids) == 0:
+            raise CommandError("No embedding vectors found.")
+
+        k = options['k']
+        rng = np.random.default_rng(42)
+        rows = rng.choice(len(book_ids), min(options['queries'], len(book_ids)), replace=False)
+        queries = vectors[rows]
+        genres = genre_index.get_genre_index()
+        children_ids = genres.intersection(genres.books(*recommendation.CHILDREN_GENRES), book_ids)
+        faiss.omp_set_num_threads(1)
+
+        self.stdout.write(f"books={len(book_ids)} children={len(children_ids)} queries={len(queries)} k={k}")
+        self.stdout.write(
+            f"{'type':>8} {'excluded':>8} {'method':>9} {'p50(ms)':>8} {'p99(ms)':>8} {'full k':>7} {'recall':>7}"
+        )
+        exact, _ = index_store.build_index(book_ids, vectors, index_type='flat')
+        for index_type in [t.strip() for t in options['types'].split(',') if t.strip()]:
+            index, _ = index_store.build_index(book_ids, vectors, index_type=index_type)
+            for size in [int(value) for value in options['excluded'].split(',') if value.strip()]:
+                excluded = [
+                    np.union1d(children_ids, rng.choice(book_ids, min(size, len(book_ids)), replace=False))
+                    for _ in range(len(queries))
+                ]
+                # 정답은 제외 목록을 적용한 정확한 전수 검색 결과입니다.
+                truth = [index_store.search_filtered(exact, q.reshape(1, -1), k, ex)[1][0] for q, ex in zip(queries, excluded)]
+                for method in ('overfetch', 'selector'):
+                    latencies, results = self._run(method, index, queries, excluded, k)
+                    full = np.mean([len(found) >= min(k, len(book_ids) - len(ex)) for found, ex in zip(results, excluded)])
+                    recall = np.mean([
+                        len(np.intersect1d(found, t[t != -1])) / max(1, np.count_nonzero(t != -1))
+                        for found, t in zip(results, truth)
+                    ])
+                    self.stdout.write(
+                        f"{index_type:>8} {size:>8} {method:>9} {np.percentile(latencies, 50):8.3f} "
+                        f"{np.percentile(latencies, 99):8.3f} {full:7.1%} {recall:7.3f}"
+                    )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _run(self, method, index, queries, excluded, k):
+        latencies, results = [], []
+        for query, exclude_ids in zip(queries, excluded):
+            query = query.reshape(1, -1)
+            started = time.perf_counter()
+            if method == 'overfetch':
+                # 기존 방식: k*5개를 가져와 파이썬에서 제외 목록을 거릅니다.
+                distances, ids = index.search(query, k * 5)
+                exclude_set = set(exclude_ids.tolist())
+                found = [book_id for book_id, _ in recommendation.select_candidates(ids[0], distances[0], exclude_set, k)]
+            else:
+                _, ids = index_store.search_filtered(index, query, k, exclude_ids)
+                found = [int(book_id) for book_id in ids[0] if book_id != -1]
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append(np.array(found, dtype=np.int64))
+        return latencies, results
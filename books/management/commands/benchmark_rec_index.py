@@ -0,0 +1,99 @@
+# books/management/commands/benchmark_rec_index.py
+
+import time
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from books import index_store
+
+
+class Command(BaseCommand):
+    help = '인덱스 종류(flat/ivfflat/hnsw/ivfpq), 차원 축소, 양자화 설정별 빌드 시간, 크기, recall@k, 검색 지연 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', type=str, default=','.join(index_store.INDEX_TYPES), help='쉼표로 구분한 인덱스 종류')
+        parser.add_argument('--queries', type=int, default=200, help='카탈로그에서 뽑을 질의 벡터 수')
+        parser.add_argument('--k', type=int, default=30)
+        parser.add_argument('--from-db', action='store_true', help='현재 인덱스 버전 대신 DB의 임베딩 벡터를 사용합니다.')
+        parser.add_argument('--nlist', type=int)
+        parser.add_argument('--nprobe', type=int)
+        parser.add_argument('--ef-search', type=int)
+        parser.add_argument('--pq-m', type=int)
+        parser.add_argument('--reduce-dims', type=str, default='0', help='쉼표로 구분한 축소 차원 (0은 축소 없음). 예: 0,128,256')
+        parser.add_argument('--reduce-method', type=str, default=None, help='pca 또는 opq')
+        parser.add_argument('--quantizers', type=str, default='none', help=f"쉼표로 구분한 양자화 방식 ({', '.join(index_store.QUANTIZERS)})")
+
+    def handle(self, *args, **options):
+        if options['from_db'] or index_store.current_version() is None:
+            book_ids, vectors = index_store.load_embeddings_from_db()
+        else:
+            book_ids, vectors = index_store.read_vectors()
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(book_ids) == 0:
+            raise CommandError("No embedding vectors found.")
+
+        k = min(options['k'], len(book_ids))
+        rows = np.random.default_rng(42).choice(len(book_ids), min(options['queries'], len(book_ids)), replace=False)
+        queries = vectors[rows]
+        # 한 스레드로 측정해야 사용자 요청 하나의 지연 시간과 비교할 수 있습니다.
+        faiss.omp_set_num_threads(1)
+
+        overrides = {
+            'nlist': options['nlist'],
+            'nprobe': options['nprobe'],
+            'ef_search': options['ef_search'],
+            'pq_m': options['pq_m'],
+            'reduce_method': options['reduce_method'],
+        }
+        self.stdout.write(f"books={len(book_ids)} dim={vectors.shape[1]} queries={len(queries)} k={k}")
+        self.stdout.write(
+            f"{'type':>8} {'reduce':>6} {'quant':>5} {'build(s)':>9} {'size(MB)':>9} {'recall@' + str(k):>10} {'p50(ms)':>8} {'p99(ms)':>8}  params"
+        )
+
+        # 정답은 차원 축소/양자화 없는 정확한 전수 검색(flat)의 결과입니다.
+        truth = self._search(index_store.build_index(book_ids, vectors, index_type='flat', reduce_dim=0, quantizer='none')[0], queries, k)[0]
+        types = [t.strip() for t in options['types'].split(',') if t.strip()]
+        reduce_dims = [int(value) for value in options['reduce_dims'].split(',') if value.strip()]
+        quantizers = [value.strip() for value in options['quantizers'].split(',') if value.strip()]
+        for index_type in types:
+            for reduce_dim in reduce_dims:
+                for quantizer in quantizers:
+                    if index_type == 'ivfpq' and quantizer != 'none':
+                        continue  # IVF-PQ는 이미 압축된 코드를 저장합니다.
+                    started = time.perf_counter()
+                    index, params = index_store.build_index(
+                        book_ids, vectors, index_type=index_type, reduce_dim=reduce_dim, quantizer=quantizer, **overrides
+                    )
+                    build_seconds = time.perf_counter() - started
+                    size_mb = faiss.serialize_index(index).nbytes / 1024 / 1024
+                    found, latencies = self._search(index, queries, k)
+                    recall = np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(found, truth)])
+
+                    shown = {key: params[key] for key in ('nlist', 'nprobe', 'hnsw_m', 'ef_search', 'pq_m')
+                             if key in params and self._uses(index_type, key)}
+                    if reduce_dim:
+                        shown['reduce_method'] = params['reduce_method']
+                    self.stdout.write(
+                        f"{index_type:>8} {reduce_dim or '-':>6} {quantizer:>5} {build_seconds:9.2f} {size_mb:9.1f} {recall:10.3f} "
+                        f"{np.percentile(latencies, 50):8.3f} {np.percentile(latencies, 99):8.3f}  {shown}"
+                    )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _search(self, index, queries, k):
+        latencies = []
+        found = np.empty((len(queries), k), dtype=np.int64)
+        for i, query in enumerate(queries):
+            started = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found[i] = ids[0]
+        return found, latencies
+
+    def _uses(self, index_type, key):
+        if key in ('nlist', 'nprobe'):
+            return index_type.startswith('ivf')
+        if key in ('hnsw_m', 'ef_search'):
+            return index_type == 'hnsw'
+        return key == 'pq_m' and index_type == 'ivfpq'
@@ -0,0 +1,92 @@
+# books/management/commands/benchmark_search_batcher.py
+
+import threading
+import time
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from books import recommendation
+from books.search_batcher import SearchBatcher
+
+
+class Command(BaseCommand):
+    help = '여러 스레드가 동시에 추천 검색을 할 때 개별 검색과 마이크로 배치 검색의 처리량, 지연 시간, 배치 채움을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='동시에 검색하는 요청 스레드 수')
+        parser.add_argument('--requests', type=int, default=2000, help='스레드 전체가 보낼 검색 수')
+        parser.add_argument('--k', type=int, default=60, help='요청당 검색할 후보 수')
+        parser.add_argument('--excluded', type=int, default=20, help='요청마다 제외할 책 수 (읽은 책을 흉내 냅니다)')
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--max-wait-ms', type=float, default=2.0)
+        parser.add_argument('--omp-threads', type=int, default=1, help='FAISS(OpenMP) 스레드 수')
+
+    def handle(self, *args, **options):
+        index = recommendation.load_index()
+        if index is None:
+            raise CommandError("No FAISS index version found. Run 'python build_faiss_index.py' first.")
+        faiss.omp_set_num_threads(options['omp_threads'])
+
+        rng = np.random.default_rng(42)
+        total = options['requests']
+        rows = rng.integers(0, len(index.book_ids), total)
+        queries = np.asarray(index.vectors[rows], dtype=np.float32) + rng.normal(0, 0.01, (total, index.vectors.shape[1])).astype(np.float32)
+        excluded = [set(rng.choice(index.book_ids, options['excluded'], replace=False).tolist()) for _ in range(total)]
+        shared = index.children_ids
+        k = options['k']
+
+        def direct(i):
+            exclude_ids = np.union1d(np.fromiter(excluded[i], dtype=np.int64), shared)
+            return index.search(queries[i:i + 1], k, exclude_ids=exclude_ids)
+
+        batcher = SearchBatcher(options['batch_size'], options['max_wait_ms'])
+
+        def batched(i):
+            return batcher.search(index, queries[i], k, excluded[i], shared)
+
+        self.stdout.write(f"books={index.index.ntotal} threads={options['threads']} requests={total} k={k}")
+        self.stdout.write(f"{'mode':>8} {'req/s':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8}")
+        results = {}
+        for mode, search in (('direct', direct), ('batched', batched)):
+            latencies, found, elapsed = self._run(search, total, options['threads'])
+            results[mode] = found
+            self.stdout.write(
+                f"{mode:>8} {total / elapsed:9.0f} {np.percentile(latencies, 50):8.3f} "
+                f"{np.percentile(latencies, 95):8.3f} {np.percentile(latencies, 99):8.3f}"
+            )
+
+        stats = batcher.stats()
+        self.stdout.write(
+            f"batches={stats['batches']} avg_batch={stats['avg_batch']:.1f} max_batch={stats['max_batch']} "
+            f"fill={stats['fill_ratio']:.0%} retries={stats['retries']} "
+            f"queue wait p50={stats['wait_p50_ms']:.3f}ms p95={stats['wait_p95_ms']:.3f}ms"
+        )
+        mismatches = sum(not np.array_equal(a, b) for a, b in zip(results['direct'], results['batched']))
+        self.stdout.write(self.style.SUCCESS(f"Benchmark finished. ({mismatches} requests differ between modes)"))
+
+    def _run(self, search, total, threads):
+        latencies = [0.0] * total
+        found = [None] * total
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                started = time.perf_counter()
+                _, ids = search(i)
+                latencies[i] = (time.perf_counter() - started) * 1000
+                found[i] = ids[0]
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return latencies, found, time.perf_counter() - started
@@ -0,0 +1,82 @@
+# books/management/commands/book_query_size.py
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from books.models import Book, ReadingEntry, Wishlist
+from plans.models import PlanBook
+
+
+def _value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return len(str(value))
+
+
+def result_size(queryset):
+    """쿼리셋의 SQL을 직접 실행해 (행 수, 받은 값의 바이트 수, 걸린 ms)를 반환합니다."""
+    sql, params = queryset.query.sql_with_params()
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    elapsed = (time.perf_counter() - started) * 1000
+    return len(rows), sum(_value_size(value) for row in rows for value in row), elapsed
+
+
+class Command(BaseCommand):
+    help = '목록 화면의 책 쿼리가 큰 텍스트 컬럼을 미뤘을 때와 모두 읽을 때 전송량을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, help='서재/위시리스트를 측정할 사용자 (기본: 독서 기록이 가장 많은 사용자)')
+        parser.add_argument('--query', type=str, default='', help='book_search에서 사용할 검색어 (기본: 모든 책)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            reader_id = ReadingEntry.objects.values_list('user_id', flat=True).order_by('-id').first()
+            user = User.objects.filter(id=reader_id).first()
+        if user is None:
+            raise CommandError("No user with reading entries found. Use --username.")
+
+        query = options['query']
+        search = Book.objects.filter(Q(title__icontains=query) | Q(author__icontains=query)).distinct()[:10]
+        entries = ReadingEntry.objects.filter(user=user).select_related('book').order_by('-read_date')[:6]
+        wishlist = Wishlist.objects.filter(user=user).select_related('book').order_by('-created_at')[:5]
+        plan_book_ids = PlanBook.objects.values_list('book_id', flat=True)[:50]
+        recommended_ids = list(Book.objects.values_list('id', flat=True)[:30])
+
+        # (화면, 예전 쿼리, 지금 쿼리)
+        cases = [
+            ('book_search (page 1)', search.with_details(), search),
+            ('my_library: entries', entries, entries.defer(*Book.heavy_fields('book__'))),
+            ('my_library: wishlist', wishlist, wishlist.defer(*Book.heavy_fields('book__'))),
+            ('recommend_books (30)', Book.objects.with_details().filter(id__in=recommended_ids), Book.objects.for_recommendation().filter(id__in=recommended_ids)),
+            ('plans: plan_books__book', Book.objects.with_details().filter(id__in=plan_book_ids), Book.objects.filter(id__in=plan_book_ids)),
+            ('admin changelist (100)', Book.objects.with_details().order_by('-id')[:100], Book.objects.order_by('-id')[:100]),
+        ]
+
+        self.stdout.write(f"{'view':<26} {'rows':>5} {'before(KB)':>11} {'after(KB)':>10} {'saved':>6} {'before(ms)':>11} {'after(ms)':>10}")
+        total_before = total_after = 0
+        for name, before_qs, after_qs in cases:
+            rows, before_bytes, before_ms = result_size(before_qs)
+            _, after_bytes, after_ms = result_size(after_qs)
+            total_before += before_bytes
+            total_after += after_bytes
+            saved = 1 - after_bytes / before_bytes if before_bytes else 0
+            self.stdout.write(
+                f"{name:<26} {rows:>5} {before_bytes / 1024:11.1f} {after_bytes / 1024:10.1f} {saved:6.0%} {before_ms:11.2f} {after_ms:10.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB per set of list views"
+        ))
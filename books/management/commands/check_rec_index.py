@@ -0,0 +1,44 @@
+# books/management/commands/check_rec_index.py
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from books import index_store
+from books.models import BookEmbedding
+
+
+class Command(BaseCommand):
+    help = '추천 인덱스(기본 버전 + 저널)의 책 ID와 DB의 임베딩이 있는 책 ID를 비교하고, --repair로 차이를 저널에 기록합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='빠진 책은 추가, 남은 책은 삭제하도록 저널에 기록합니다.')
+        parser.add_argument('--compact', action='store_true', help='--repair 후 바로 compact_rec_index를 실행합니다.')
+
+    def handle(self, *args, **options):
+        version = index_store.current_version()
+        if version is None:
+            raise CommandError("No FAISS index version found. Run 'python build_faiss_index.py' first.")
+
+        manifest = index_store.read_manifest(version)
+        base_ids, _ = index_store.read_vectors(version, mmap=True)
+        changes = index_store.journal_changes(manifest.get('journal_position', 0))
+        index_ids = (set(base_ids.tolist()) - changes.deletes) | set(changes.upserts)
+
+        db_ids = set(BookEmbedding.objects.values_list('book_id', flat=True))
+        missing = sorted(db_ids - index_ids)
+        extra = sorted(index_ids - db_ids)
+
+        self.stdout.write(f"Index {version}: {len(index_ids)} books (base {len(base_ids)}, pending journal changes {len(changes.upserts) + len(changes.deletes)})")
+        self.stdout.write(f"DB: {len(db_ids)} books with embeddings")
+        if not missing and not extra:
+            self.stdout.write(self.style.SUCCESS("✅ Index is consistent with the database."))
+            return
+
+        self.stdout.write(self.style.WARNING(f"Missing from index: {len(missing)} {missing[:10]}"))
+        self.stdout.write(self.style.WARNING(f"Not in database:    {len(extra)} {extra[:10]}"))
+
+        if options['repair']:
+            index_store.record_changes(upsert_ids=missing, delete_ids=extra)
+            self.stdout.write(self.style.SUCCESS(f"Recorded {len(missing) + len(extra)} repairs in the index journal."))
+            if options['compact']:
+                call_command('compact_rec_index', stdout=self.stdout)
@@ -0,0 +1,34 @@
+# books/management/commands/compact_rec_index.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books import index_store
+
+
+class Command(BaseCommand):
+    help = '저널에 쌓인 책 추가/변경/삭제를 기본 인덱스에 합쳐 새 인덱스 버전을 공개합니다. (cron 등으로 주기 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-changes', type=int, default=1, help='변경된 책이 이 수보다 적으면 합치지 않습니다.')
+
+    def handle(self, *args, **options):
+        version = index_store.current_version()
+        if version is None:
+            raise CommandError("No FAISS index version found. Run 'python build_faiss_index.py' first.")
+
+        manifest = index_store.read_manifest(version)
+        changes = index_store.journal_changes(manifest.get('journal_position', 0))
+        change_count = len(changes.upserts) + len(changes.deletes)
+        if change_count < options['min_changes']:
+            self.stdout.write(f"Only {change_count} pending changes since {version}. Nothing to compact.")
+            return
+
+        self.stdout.write(f"Applying {len(changes.upserts)} upserts and {len(changes.deletes)} deletes to {version}...")
+        index = index_store.read_index(version)
+        book_ids, vectors = index_store.read_vectors(version)
+        # 인덱스 종류와 파라미터는 기존 버전의 것을 그대로 이어받습니다.
+        params = {key: value for key, value in manifest.items() if key in index_store.index_params()}
+        index, book_ids, vectors = index_store.apply_changes(index, book_ids, vectors, changes, **params)
+
+        new_version = index_store.publish(index, book_ids, vectors, changes.position, extra_manifest=params)
+        self.stdout.write(self.style.SUCCESS(f"Published index version {new_version} with {index.ntotal} books."))
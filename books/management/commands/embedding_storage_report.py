@@ -0,0 +1,82 @@
+# books/management/commands/embedding_storage_report.py
+
+import json
+import time
+
+import numpy as np
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.functions import Length
+from django.core.management.base import BaseCommand, CommandError
+
+from books import index_store
+from books.models import BookEmbedding
+
+
+def table_size_bytes(table):
+    """DB가 보고하는 테이블(인덱스 포함) 크기입니다. 알 수 없으면 None입니다."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT data_length + index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table]
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [table])
+            except Exception:
+                return None  # dbstat 가상 테이블 없이 빌드된 SQLite
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+class Command(BaseCommand):
+    help = '바이너리 임베딩 저장소(book_embedding)의 크기와 조회 시간을 JSON 리스트 저장 방식과 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=20, help='한 번에 조회할 책 수 (추천 요청 1회는 최근 20권)')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        count = BookEmbedding.objects.count()
+        if count == 0:
+            raise CommandError("No rows in book_embedding. Run 'python generate_embeddings.py' first.")
+
+        payload = BookEmbedding.objects.aggregate(total=Sum(Length('vector')))['total'] or 0
+        started = time.perf_counter()
+        book_ids, vectors = index_store.load_embeddings_from_db()
+        binary_full_ms = (time.perf_counter() - started) * 1000
+
+        # 같은 벡터를 예전 JSONField 형식(소수 텍스트)으로 만들었을 때의 크기와 파싱 시간입니다.
+        json_rows = [json.dumps(vector.tolist()) for vector in vectors]
+        json_bytes = sum(len(row.encode()) for row in json_rows)
+        started = time.perf_counter()
+        np.array([json.loads(row) for row in json_rows], dtype=np.float32)
+        json_decode_ms = (time.perf_counter() - started) * 1000
+
+        rng = np.random.default_rng(0)
+        sample = min(options['sample'], count)
+        latencies = []
+        for _ in range(options['repeat']):
+            ids = rng.choice(book_ids, sample, replace=False).tolist()
+            started = time.perf_counter()
+            index_store.fetch_embeddings(ids)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        dtypes = sorted(set(BookEmbedding.objects.values_list('dtype', flat=True)))
+        table_bytes = table_size_bytes(BookEmbedding._meta.db_table)
+
+        self.stdout.write(f"Rows: {count}, dimension: {vectors.shape[1]}, dtype: {', '.join(dtypes)}")
+        self.stdout.write(f"Binary payload:        {payload / 1024 / 1024:8.2f} MB ({payload / count:.0f} B/row)")
+        self.stdout.write(f"JSON list equivalent:  {json_bytes / 1024 / 1024:8.2f} MB ({json_bytes / count:.0f} B/row)")
+        if table_bytes is not None:
+            self.stdout.write(f"book_embedding table:  {table_bytes / 1024 / 1024:8.2f} MB (including indexes)")
+        self.stdout.write(f"Load all vectors (binary, DB round trip): {binary_full_ms:8.1f} ms")
+        self.stdout.write(f"Parse all vectors from JSON text only:    {json_decode_ms:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Fetch {sample} vectors by id: p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms"
+        ))
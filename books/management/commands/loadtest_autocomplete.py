@@ -0,0 +1,91 @@
+# books/management/commands/loadtest_autocomplete.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from books import autocomplete, korean_index
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        '입력 중 검색어(제목을 한 글자씩 입력한 접두사, 인기 제목일수록 자주)로 자동 완성 API(books:autocomplete_api)와 '
+        '기존 책 검색 API(plans:book_search_api, DB 전문 검색/메모리 색인)에 요청을 보내 초당 요청 수와 p50/p95 지연 시간을 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='API마다 보낼 요청 수')
+        parser.add_argument('--threads', type=int, default=4, help='동시에 요청하는 스레드 수')
+        parser.add_argument('--titles', type=int, default=200, help='검색어를 만들 제목 수')
+        parser.add_argument('--zipf', type=float, default=1.2, help='제목 선택 빈도의 Zipf 지수 (클수록 같은 검색어가 자주 반복됩니다)')
+
+    def handle(self, *args, **options):
+        titles = list(Book.objects.order_by('?').values_list('title', flat=True)[:options['titles']])
+        if not titles:
+            raise CommandError("No books found. Load the catalog first.")
+        queries = self._queries(titles, options['requests'], options['zipf'], np.random.default_rng(42))
+
+        # 색인 빌드는 워커가 뜰 때 한 번이므로 측정에서 뺍니다.
+        autocomplete.get_autocomplete_index()
+        korean_index.get_korean_index()
+
+        targets = [
+            ('search(db)', reverse('plans:book_search_api'), {'BOOK_SEARCH_IN_MEMORY': False}),
+            ('search(mem)', reverse('plans:book_search_api'), {'BOOK_SEARCH_IN_MEMORY': True}),
+            ('autocomplete', reverse('books:autocomplete_api'), {}),
+        ]
+        self.stdout.write(f"{len(queries)} requests, {len(set(queries))} distinct queries, {options['threads']} threads")
+        self.stdout.write(f"{'endpoint':>13} {'req/s':>8} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8} {'lru hit':>8}")
+        for name, url, overrides in targets:
+            before = autocomplete.stats()
+            with override_settings(**overrides):
+                rps, latencies = self._run(url, queries, options['threads'])
+            after = autocomplete.stats()
+            lookups = after['hit'] + after['miss'] - before['hit'] - before['miss']
+            hit_rate = f"{(after['hit'] - before['hit']) / lookups:8.1%}" if lookups else f"{'-':>8}"
+            self.stdout.write(
+                f"{name:>13} {rps:8.0f} {np.percentile(latencies, 50):8.2f} {np.percentile(latencies, 95):8.2f} "
+                f"{np.percentile(latencies, 99):8.2f} {hit_rate}"
+            )
+        self.stdout.write(self.style.SUCCESS("Load test finished."))
+
+    def _queries(self, titles, count, exponent, rng):
+        """인기 제목(Zipf 분포)을 한 글자씩 입력하는 중간 상태들"""
+        weights = 1.0 / np.arange(1, len(titles) + 1) ** exponent
+        picks = rng.choice(len(titles), count, p=weights / weights.sum())
+        queries = []
+        for pick in picks:
+            title = titles[pick].strip() or '책'
+            queries.append(title[:int(rng.integers(1, min(len(title), 8) + 1))])
+        return queries
+
+    def _run(self, url, queries, threads):
+        host = next((host for host in settings.ALLOWED_HOSTS if '*' not in host and not host.startswith('.')), 'localhost')
+
+        def worker(chunk):
+            client = Client(HTTP_HOST=host)
+            latencies = []
+            try:
+                for query in chunk:
+                    started = time.perf_counter()
+                    response = client.get(url, {'query': query})
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f"{url} returned {response.status_code}")
+            finally:
+                connection.close()
+            return latencies
+
+        chunks = [queries[i::threads] for i in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = [latency for result in executor.map(worker, chunks) for latency in result]
+        return len(queries) / (time.perf_counter() - started), latencies
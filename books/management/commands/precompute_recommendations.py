@@ -0,0 +1,159 @@
+# books/management/commands/precompute_recommendations.py
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from books import catalog, genre_index, interests, item_cf, recommendation, taste
+from books.models import BookRecommend, ReadingEntry, UserFeedback
+
+
+class Command(BaseCommand):
+    help = '사용자별 추천을 여러 사용자씩 묶어 한 번에 검색하고 BookRecommend 테이블에 새 세대로 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=0, help='최근 N일 안에 로그인했거나 기록/피드백을 남긴 사용자만 계산합니다. (0이면 독서 기록이 있는 모든 사용자)')
+        parser.add_argument('--batch-size', type=int, default=256, help='한 번의 FAISS 검색에 묶을 사용자 수')
+        parser.add_argument('--k', type=int, default=30, help='사용자당 저장할 추천 수')
+
+    def handle(self, *args, **options):
+        index = recommendation.load_index()
+        if index is None:
+            raise CommandError("No FAISS index version found. Run 'python build_faiss_index.py' first.")
+
+        user_ids = self._target_user_ids(options['active_days'])
+        backfilled = taste.backfill_missing(user_ids)
+        if backfilled:
+            self.stdout.write(f"Built taste vectors for {backfilled} users without one.")
+        generation = (BookRecommend.objects.aggregate(latest=Max('generation'))['latest'] or 0) + 1
+        self.stdout.write(f"Computing generation {generation} for {len(user_ids)} users...")
+
+        started = time.perf_counter()
+        written = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            rows = self._compute_batch(index, batch, options['k'], generation)
+            self._publish_batch(batch, rows, generation)
+            written += len(rows)
+            done = min(start + batch_size, len(user_ids))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {done}/{len(user_ids)} users, {written} rows ({done / elapsed:.1f} users/sec)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generation {generation}: {written} recommendations for {len(user_ids)} users in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _target_user_ids(self, active_days):
+        readers = ReadingEntry.objects.values_list('user_id', flat=True)
+        if not active_days:
+            return sorted(set(readers))
+        since = timezone.now() - timedelta(days=active_days)
+        active = set(get_user_model().objects.filter(last_login__gte=since).values_list('id', flat=True))
+        active |= set(readers.filter(created_at__gte=since))
+        active |= set(UserFeedback.objects.filter(created_at__gte=since).values_list('user_id', flat=True))
+        # 독서 기록이 없는 사용자는 콜드 스타트 추천(실시간)을 사용합니다.
+        return sorted(active & set(readers))
+
+    def _compute_batch(self, index, user_ids, k, generation):
+        """사용자 묶음의 추천을 계산해 저장할 BookRecommend 객체 목록을 반환합니다. (쿼리 수는 사용자 수와 무관합니다)"""
+        read_by_user = defaultdict(dict)
+        for user_id, book_id, rating in ReadingEntry.objects.filter(user_id__in=user_ids).values_list('user_id', 'book_id', 'rating'):
+            read_by_user[user_id][book_id] = rating
+
+        # 독서 기록 시그널이 갱신해 둔 취향 벡터를 묶음 단위로 한 번에 읽습니다. (books/taste.py)
+        user_vectors = taste.get_user_vectors(user_ids)
+        vector_user_ids = [user_id for user_id in user_ids if user_id in user_vectors]
+        if not vector_user_ids:
+            return []
+
+        not_interested = defaultdict(set)
+        for user_id, book_id in UserFeedback.objects.filter(user_id__in=vector_user_ids, is_interested=False).values_list('user_id', 'book_id'):
+            not_interested[user_id].add(book_id)
+        genres = genre_index.get_genre_index()
+        children_readers = {
+            user_id for user_id in vector_user_ids if genres.has_any(read_by_user[user_id], *recommendation.CHILDREN_GENRES)
+        }
+
+        # 다중 관심사가 켜져 있으면 사용자마다 관심사 중심 벡터 여러 개로 검색합니다. (books/interests.py)
+        profiles = {}
+        if interests.enabled():
+            entries = interests.recent_entries(vector_user_ids)
+            profiles = {user_id: interests.interest_vectors(entries.get(user_id, [])) for user_id in vector_user_ids}
+        queries = {
+            user_id: profiles[user_id][0] if profiles.get(user_id) is not None else user_vectors[user_id].reshape(1, -1)
+            for user_id in vector_user_ids
+        }
+
+        pool = item_cf.candidate_pool(k)
+        neighbours = item_cf.load_neighbours({book_id for read in read_by_user.values() for book_id in read})
+        children_set = set(index.children_ids.tolist())
+
+        # 아동 도서 제외 여부가 같은 사용자끼리 묶어 한 번의 다중 질의 검색으로 처리합니다.
+        # 공통 제외(아동 도서)는 IDSelector로 검색 단계에서 거르고, 사용자마다 다른 제외(읽은 책, 관심 없음)는
+        # 그 개수만큼만 더 가져와서 거릅니다. 가져올 개수는 사용자마다 다르므로, 제외 목록이 긴 한 사용자 때문에
+        # 묶음 전체가 많이 가져오지 않도록 (후보 풀 + 제외 개수)를 2의 거듭제곱으로 올린 값이 같은 사용자끼리 검색합니다.
+        selected_by_user = {}
+        excluded = {user_id: set(read_by_user[user_id]) | not_interested[user_id] for user_id in vector_user_ids}
+        groups = defaultdict(list)
+        for user_id in vector_user_ids:
+            groups[user_id not in children_readers, 1 << (pool + len(excluded[user_id]) - 1).bit_length()].append(user_id)
+        for (blocks_children, fetch_k), group in sorted(groups.items()):
+            distances, ids = index.search(
+                np.vstack([queries[user_id] for user_id in group]), fetch_k,
+                exclude_ids=index.children_ids if blocks_children else None,
+            )
+            start = 0
+            for user_id in group:
+                rows = slice(start, start + len(queries[user_id]))
+                start = rows.stop
+                selected = self._select(profiles.get(user_id), distances[rows], ids[rows], excluded[user_id], pool)
+                if len(selected) < pool:
+                    # 근사 인덱스가 후보를 다 채우지 못한 사용자만 전체 제외 목록으로 다시 검색합니다.
+                    exclude_ids = np.fromiter(excluded[user_id], dtype=np.int64)
+                    if blocks_children:
+                        exclude_ids = np.union1d(exclude_ids, index.children_ids)
+                    distances_one, ids_one = index.search(queries[user_id], pool, exclude_ids=exclude_ids)
+                    selected = self._select(profiles.get(user_id), distances_one, ids_one, set(), pool)
+
+                # 함께 읽힌 책(아이템-아이템 CF) 점수를 섞어 최종 k개를 고릅니다. (실시간 추천과 같은 방식)
+                cf_excluded = excluded[user_id] | children_set if blocks_children else excluded[user_id]
+                scores = item_cf.cf_scores(
+                    {book_id: recommendation.RATING_MULTIPLIERS.get(rating, 1.0) for book_id, rating in read_by_user[user_id].items()},
+                    neighbours, cf_excluded,
+                )
+                selected_by_user[user_id] = item_cf.blend(index, queries[user_id], selected, scores, k)
+
+        rows = []
+        for user_id in vector_user_ids:
+            rows.extend(
+                BookRecommend(
+                    user_id=user_id, book_id=book_id, rank=rank, score=score,
+                    generation=generation, is_active=False,
+                )
+                for rank, (book_id, score) in enumerate(selected_by_user[user_id], start=1)
+            )
+        return rows
+
+    def _select(self, profile, distances, ids, excluded_ids, pool):
+        if profile is None:
+            return recommendation.select_candidates(ids[0], distances[0], excluded_ids, pool)
+        return interests.fuse(distances, ids, profile[1], pool, excluded_ids)
+
+    def _publish_batch(self, user_ids, rows, generation):
+        """새 세대를 비활성으로 모두 쓴 뒤, 한 트랜잭션에서 이전 세대와 활성 상태를 맞바꿉니다."""
+        BookRecommend.objects.bulk_create(rows, batch_size=1000)
+        with transaction.atomic():
+            BookRecommend.objects.filter(user_id__in=user_ids, is_active=True).update(is_active=False)
+            BookRecommend.objects.filter(user_id__in=user_ids, generation=generation).update(is_active=True)
+        BookRecommend.objects.filter(Q(user_id__in=user_ids) & ~Q(generation=generation)).delete()
+        # 캐시에 남아 있는 이전 결과 대신 방금 저장한 세대를 읽도록 합니다. (웹 워커도 보는 DB 버전이므로
+        # 이 명령 프로세스의 캐시만 지우는 것과 달리 모든 워커의 rec_cache 결과가 버려집니다)
+        catalog.bump(catalog.RECOMMENDATIONS)
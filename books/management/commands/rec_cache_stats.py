@@ -0,0 +1,25 @@
+# books/management/commands/rec_cache_stats.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books import rec_cache
+
+
+class Command(BaseCommand):
+    help = '사용자별 추천 캐시의 적중/미스 횟수와 적중률을 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력한 뒤 카운터를 0으로 초기화합니다.')
+
+    def handle(self, *args, **options):
+        stats = rec_cache.stats()
+        backend = settings.CACHES[settings.REC_CACHE_ALIAS]['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"Cache backend: {backend} (TTL {settings.REC_CACHE_TTL}s)")
+        if not settings.REC_CACHE_STATS:
+            self.stdout.write(self.style.WARNING("REC_CACHE_STATS is off: counters are not being updated."))
+        self.stdout.write(f"hit={stats['hit']} miss={stats['miss']} stale={stats['stale']} invalidate={stats['invalidate']}")
+        self.stdout.write(self.style.SUCCESS(f"Hit rate: {stats['hit_rate']:.1%}"))
+        if options['reset']:
+            rec_cache.reset_stats()
+            self.stdout.write("Counters reset.")
@@ -0,0 +1,107 @@
+# books/management/commands/rec_index_memory.py
+
+import multiprocessing
+import os
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from books import index_store
+
+
+def read_memory_kb(pid):
+    """/proc에서 프로세스의 (RSS, PSS)를 kB 단위로 읽습니다. PSS를 알 수 없으면 None입니다."""
+    rss = pss = None
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Rss:'):
+                    rss = int(line.split()[1])
+                elif line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss = int(line.split()[1])
+        except OSError:
+            pass
+    return rss, pss
+
+
+def _touch(index, vectors):
+    """인덱스와 벡터 행렬의 모든 페이지를 한 번 읽어 실제 서빙 상태와 같게 만듭니다."""
+    query = np.zeros((1, index.d), dtype=np.float32)
+    index.search(query, 1)
+    if vectors is not None:
+        float(np.asarray(vectors).sum())
+
+
+def _load(mmap):
+    index = index_store.read_index(mmap=mmap)
+    _, vectors = index_store.read_vectors(mmap=mmap)
+    return index, vectors
+
+
+def _worker(mmap, preloaded, ready, done):
+    index, vectors = preloaded if preloaded else _load(mmap)
+    _touch(index, vectors)
+    ready.put(os.getpid())
+    done.wait()
+
+
+class Command(BaseCommand):
+    help = '추천 인덱스를 힙/mmap 모드로 로드한 워커들의 RSS/PSS를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='모드별로 띄울 워커 프로세스 수')
+        parser.add_argument('--preload', action='store_true', help='부모 프로세스에서 미리 로드한 뒤 fork 합니다. (gunicorn --preload)')
+        parser.add_argument('--pids', type=str, default='', help='쉼표로 구분한 실행 중인 gunicorn 워커 PID (지정하면 해당 프로세스만 측정)')
+
+    def handle(self, *args, **options):
+        if options['pids']:
+            pids = [int(pid) for pid in options['pids'].split(',') if pid.strip()]
+            self._report('running', self._measure(pids))
+            return
+
+        if index_store.current_version() is None:
+            raise CommandError(f"No FAISS index version found in {index_store.index_dir()}")
+
+        for mmap in (False, True):
+            mode = 'mmap' if mmap else 'heap'
+            if options['preload']:
+                mode += '+preload'
+            self._report(mode, self._run_workers(mmap, options['workers'], options['preload']))
+
+    def _run_workers(self, mmap, workers, preload):
+        ctx = multiprocessing.get_context('fork')
+        preloaded = _load(mmap) if preload else None
+        ready, done = ctx.Queue(), ctx.Event()
+        procs = [ctx.Process(target=_worker, args=(mmap, preloaded, ready, done)) for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+        try:
+            pids = [ready.get(timeout=300) for _ in procs]
+            # PSS는 공유 중인 프로세스 수로 나눈 값이므로 모든 워커가 살아 있을 때 측정합니다.
+            return self._measure(pids)
+        finally:
+            done.set()
+            for proc in procs:
+                proc.join()
+
+    def _measure(self, pids):
+        return [(pid, *read_memory_kb(pid)) for pid in pids]
+
+    def _report(self, mode, rows):
+        self.stdout.write(f"\n[{mode}]")
+        self.stdout.write(f"{'pid':>8} {'RSS(MB)':>10} {'PSS(MB)':>10}")
+        total_rss = total_pss = 0
+        for pid, rss, pss in rows:
+            total_rss += rss or 0
+            total_pss += pss or 0
+            pss_text = f"{pss / 1024:10.1f}" if pss is not None else f"{'-':>10}"
+            self.stdout.write(f"{pid:>8} {(rss or 0) / 1024:10.1f} {pss_text}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':>8} {total_rss / 1024:10.1f} {total_pss / 1024:10.1f}"
+        ))
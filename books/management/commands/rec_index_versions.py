@@ -0,0 +1,25 @@
+# books/management/commands/rec_index_versions.py
+
+from django.core.management.base import BaseCommand
+
+from books import index_store
+
+
+class Command(BaseCommand):
+    help = '추천 인덱스 버전 목록을 보여주고, --gc 옵션으로 사용되지 않는 이전 버전을 삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gc', action='store_true', help='어떤 프로세스도 사용하지 않는 이전 버전을 삭제합니다.')
+
+    def handle(self, *args, **options):
+        if options['gc']:
+            removed = index_store.collect_garbage()
+            self.stdout.write(self.style.SUCCESS(f"Removed {len(removed)} unused versions: {', '.join(removed) or '-'}"))
+
+        current = index_store.current_version()
+        for version in index_store.list_versions():
+            manifest = index_store.read_manifest(version)
+            marker = '*' if version == current else ' '
+            self.stdout.write(
+                f"{marker} {version}  books={manifest['book_count']}  dim={manifest['dimension']}  built_at={manifest['built_at']}"
+            )
@@ -0,0 +1,28 @@
+# books/management/commands/search_cache_stats.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books import catalog, search_cache
+
+
+class Command(BaseCommand):
+    help = '검색어별 결과 캐시의 적중(부정 캐시 포함)/미스 횟수와 적중률을 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력한 뒤 카운터를 0으로 초기화합니다.')
+
+    def handle(self, *args, **options):
+        stats = search_cache.stats()
+        backend = settings.CACHES[settings.REC_CACHE_ALIAS]['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(
+            f"Cache backend: {backend} (TTL {settings.SEARCH_CACHE_TTL}s, negative TTL {settings.SEARCH_CACHE_NEGATIVE_TTL}s, "
+            f"catalog version {catalog.version()})"
+        )
+        if backend == 'LocMemCache':
+            self.stdout.write(self.style.WARNING("locmem cache is per process: these counters cover only this command's process."))
+        self.stdout.write(f"hit={stats['hit']} negative_hit={stats['negative_hit']} miss={stats['miss']}")
+        self.stdout.write(self.style.SUCCESS(f"Hit rate: {stats['hit_rate']:.1%}"))
+        if options['reset']:
+            search_cache.reset_stats()
+            self.stdout.write("Counters reset.")
@@ -0,0 +1,29 @@
+# books/management/commands/update_item_cf.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books import item_cf
+
+try:
+    import resource
+except ImportError:  # Windows 개발 환경
+    resource = None
+
+
+class Command(BaseCommand):
+    help = '독서 기록/위시리스트로 사용자×책 희소 행렬을 만들어 책-책 코사인 유사도 상위 K개를 book_item_similarity에 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=None, help=f'책당 저장할 유사 책 수 (기본: settings.REC_CF_TOP_K={settings.REC_CF_TOP_K})')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='한 번의 희소 행렬 곱에 포함할 책(열) 수. 작을수록 메모리를 덜 씁니다.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = item_cf.build_item_similarity(top_k=options['top_k'], chunk_size=options['chunk_size'], log=self.stdout.write)
+        peak = f" (peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB)" if resource else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Stored {written} item-item similarities in {time.perf_counter() - started:.1f}s{peak}"
+        ))
@@ -0,0 +1,28 @@
+# books/management/commands/update_popularity.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books import popularity
+from books.models import BookPopularity
+
+
+class Command(BaseCommand):
+    help = '독서 기록, 평점, 위시리스트 추가를 시간 감쇠로 집계해 전체/장르별 인기 순위표(book_popularity)를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=None, help=f'전체/장르별로 저장할 순위 수 (기본: settings.REC_POPULARITY_TOP_N={settings.REC_POPULARITY_TOP_N})')
+        parser.add_argument('--half-life-days', type=float, default=None, help=f'가중치가 절반이 되는 기간(일) (기본: {settings.REC_POPULARITY_HALF_LIFE_DAYS})')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = popularity.rebuild_popularity(top_n=options['top_n'], half_life_days=options['half_life_days'])
+        lists = BookPopularity.objects.values('genre_id').distinct().count()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {written} popularity rows in {lists} lists ({time.perf_counter() - started:.2f}s)"
+        ))
+        top = BookPopularity.objects.filter(genre__isnull=True).select_related('book').only('rank', 'score', 'book__title').order_by('rank')[:5]
+        for row in top:
+            self.stdout.write(f"  {row.rank:>3}. {row.book.title} ({row.score:.2f})")
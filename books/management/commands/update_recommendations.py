@@ -1,41 +1,46 @@
-import numpy as np
-import faiss
+from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from sentence_transformers import SentenceTransformer
+from books.embedding import generate_embeddings
+from books.index_store import build_index, current_version, journal_head, load_embeddings_from_db, publish
 from books.models import Book
-# import json # json은 이제 JSONField를 사용하므로 필요 없습니다.
 
 class Command(BaseCommand):
     help = 'Updates book vectors and FAISS index for recommendations'
 
-    def handle(self, *args, **options):
-        # ... (모델 로드, 책 가져오기, 텍스트 변환 로직은 동일) ...
-        self.stdout.write('Loading Sentence-BERT model...')
-        model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-
-        self.stdout.write('Fetching books from database...')
-        books = list(Book.objects.all())
-        book_ids = [book.id for book in books]
-
-        self.stdout.write('Preprocessing book data...')
-        book_texts = [f"{book.description or ''}. {book.genre or ''}." for book in books]
-
-        self.stdout.write('Encoding books to vectors... This may take a while.')
-        book_vectors = model.encode(book_texts, convert_to_tensor=False, show_progress_bar=True)
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='입력 텍스트가 바뀌지 않은 책까지 모두 다시 인코딩합니다.')
+        parser.add_argument('--rebuild', action='store_true', help='저널을 합치는 대신 인덱스 전체를 새로 빌드합니다.')
+        parser.add_argument('--chunk-size', type=int, default=512, help='DB에서 한 번에 읽고 저장할 책 수')
+        parser.add_argument('--batch-size', type=int, default=64, help='모델 encode()의 배치 크기')
+        parser.add_argument('--workers', type=int, default=0, help='인코딩 프로세스 수 (0이면 현재 프로세스에서 인코딩)')
+        parser.add_argument('--threads', type=int, default=None, help='프로세스당 torch 스레드 수')
 
-        # --- 수정된 부분 ---
-        self.stdout.write('Saving vectors to database...')
-        for book, vector in zip(books, book_vectors):
-            book.embedding_vector = vector.tolist()  # numpy 배열을 파이썬 리스트로 변환하여 저장
-            book.save()
-        # --------------------
-
-        self.stdout.write('Building FAISS index...')
-        embedding_dim = book_vectors.shape[1]
-        index = faiss.IndexFlatL2(embedding_dim)
-        index = faiss.IndexIDMap(index)
-        book_ids_np = np.array(book_ids, dtype=np.int64)
-        index.add_with_ids(book_vectors, book_ids_np)
-
-        faiss.write_index(index, 'book_index.faiss')
-        self.stdout.write(self.style.SUCCESS(f'Successfully created index and saved vectors for {index.ntotal} books.'))
\ No newline at end of file
+    def handle(self, *args, **options):
+        # 입력 텍스트 해시나 모델이 바뀐 책만 인코딩합니다. 임베딩 모델은 인코딩할 책이 있을 때 처음 로드됩니다.
+        # 바뀐 책을 읽은 사용자의 취향 벡터도 generate_embeddings가 다시 계산합니다.
+        self.stdout.write(f'Encoding changed books with {settings.EMBEDDING_MODEL_NAME} (version {settings.EMBEDDING_MODEL_VERSION})...')
+        encoded = generate_embeddings(
+            Book.objects.all(),
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            threads=options['threads'],
+            only_changed=not options['full'],
+            log=self.stdout.write,
+        )
+
+        # 바뀐 책은 저널에 기록되었으므로, 기존 인덱스가 있으면 그 변경만 합칩니다.
+        if current_version() is not None and not options['rebuild']:
+            if encoded:
+                call_command('compact_rec_index', stdout=self.stdout)
+            else:
+                self.stdout.write(self.style.SUCCESS('No embedding changes. The current index is up to date.'))
+            return
+
+        self.stdout.write(f'Building FAISS index ({settings.REC_INDEX_TYPE})...')
+        journal_position = journal_head()
+        book_ids, book_vectors = load_embeddings_from_db()
+        index, params = build_index(book_ids, book_vectors)
+        version = publish(index, book_ids, book_vectors, journal_position, extra_manifest=params)
+        self.stdout.write(self.style.SUCCESS(f'Successfully created index version {version} and saved vectors for {index.ntotal} books.'))
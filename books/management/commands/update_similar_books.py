@@ -0,0 +1,39 @@
+# books/management/commands/update_similar_books.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books import similar
+from books.models import BookEmbedding
+
+
+class Command(BaseCommand):
+    help = '책마다 임베딩이 가까운 책 N권을 묶음 검색으로 계산해 book_similar 테이블에 저장합니다. (기본: 바뀐 책만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='모든 책의 목록을 처음부터 다시 계산합니다.')
+        parser.add_argument('--n', type=int, default=10, help='책당 저장할 비슷한 책 수')
+        parser.add_argument('--batch-size', type=int, default=512, help='한 번의 FAISS 검색에 묶을 책 수')
+
+    def handle(self, *args, **options):
+        n = options['n']
+        if options['all']:
+            book_ids = list(BookEmbedding.objects.order_by('book_id').values_list('book_id', flat=True))
+        else:
+            book_ids = similar.stale_book_ids(n)
+        if not book_ids:
+            self.stdout.write(self.style.SUCCESS("✅ All similar-book lists are up to date."))
+            return
+
+        self.stdout.write(f"Computing similar books for {len(book_ids)} books...")
+        started = time.perf_counter()
+        try:
+            updated = similar.update_similar_books(
+                book_ids, n=n, batch_size=options['batch_size'], incremental=not options['all'], log=self.stdout.write,
+            )
+        except RuntimeError as e:
+            raise CommandError(f"{e} Run 'python build_faiss_index.py' first.")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Updated {updated} similar-book lists in {time.perf_counter() - started:.1f}s"
+        ))
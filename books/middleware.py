@@ -0,0 +1,32 @@
+# books/middleware.py
+
+from . import catalog, recommendation
+
+
+class RecommendationIndexReloadMiddleware:
+    """응답을 만든 뒤, 새 추천 인덱스 버전이 공개되었는지 확인하고 교체합니다.
+
+    워커를 재시작하지 않아도 build_faiss_index.py / update_recommendations의 결과가 반영됩니다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        recommendation.maybe_reload()
+        return response
+
+
+class CatalogVersionMiddleware:
+    """요청 하나 안에서는 공유 버전(books/catalog.py)을 이름마다 한 번만 DB에서 읽게 합니다.
+
+    추천 캐시와 검색 결과 캐시가 조회할 때마다 버전 행을 읽지 않도록 합니다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with catalog.cached_versions():
+            return self.get_response(request)
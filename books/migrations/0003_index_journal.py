@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexJournal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.BigIntegerField()),
+                ('op', models.CharField(choices=[('upsert', '추가/변경'), ('delete', '삭제')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'book_index_journal',
+            },
+        ),
+    ]
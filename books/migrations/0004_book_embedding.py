@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:10
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def json_to_binary(apps, schema_editor):
+    """Book.embedding_vector(JSON 리스트)를 book_embedding 테이블의 float32 바이트로 옮깁니다."""
+    Book = apps.get_model('books', 'Book')
+    BookEmbedding = apps.get_model('books', 'BookEmbedding')
+
+    rows = Book.objects.filter(embedding_vector__isnull=False).order_by('id').values_list('id', 'embedding_vector')
+    batch = []
+    for book_id, vector in rows.iterator(chunk_size=BATCH_SIZE):
+        if not vector:
+            continue
+        array = np.asarray(vector, dtype=np.float32)
+        batch.append(BookEmbedding(book_id=book_id, vector=array.tobytes(), dtype='float32', dimension=len(array)))
+        if len(batch) >= BATCH_SIZE:
+            BookEmbedding.objects.bulk_create(batch)
+            batch = []
+    BookEmbedding.objects.bulk_create(batch)
+
+
+def binary_to_json(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookEmbedding = apps.get_model('books', 'BookEmbedding')
+
+    batch = []
+    for book_id, data, dtype in BookEmbedding.objects.values_list('book_id', 'vector', 'dtype').iterator(chunk_size=BATCH_SIZE):
+        batch.append(Book(id=book_id, embedding_vector=np.frombuffer(data, dtype=dtype).astype(np.float32).tolist()))
+        if len(batch) >= BATCH_SIZE:
+            Book.objects.bulk_update(batch, ['embedding_vector'])
+            batch = []
+    Book.objects.bulk_update(batch, ['embedding_vector'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_index_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookEmbedding',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='books.book')),
+                ('vector', models.BinaryField()),
+                ('dtype', models.CharField(choices=[('float32', 'float32'), ('float16', 'float16')], default='float32', max_length=10)),
+                ('dimension', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'book_embedding',
+            },
+        ),
+        migrations.RunPython(json_to_binary, binary_to_json),
+        migrations.RemoveField(
+            model_name='book',
+            name='embedding_vector',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_embedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookembedding',
+            name='model_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='bookembedding',
+            name='model_version',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='bookembedding',
+            name='source_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_embedding_source_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookrecommend',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='bookrecommend',
+            index=models.Index(fields=['user', 'is_active', 'rank'], name='book_recommend_active_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0006_recommend_generation'),
+        ('users', '0004_merge_20251024_1725'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTasteVector',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='taste_vector', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('weighted_sum', models.BinaryField()),
+                ('total_weight', models.FloatField(default=0)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_taste_vector',
+            },
+        ),
+    ]
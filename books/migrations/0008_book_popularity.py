@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_user_taste_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookPopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('reader_count', models.PositiveIntegerField(default=0)),
+                ('avg_rating', models.FloatField(blank=True, null=True)),
+                ('wishlist_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='popularity', to='books.book')),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='popularity', to='books.genre')),
+            ],
+            options={
+                'db_table': 'book_popularity',
+                'indexes': [models.Index(fields=['genre', 'rank'], name='book_popularity_rank_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# books/migrations/0011_book_text_search.py
+"""
+책 제목/저자 전문 검색 인덱스를 DB 종류에 맞게 만듭니다. (books/text_search.py가 사용합니다)
+
+- PostgreSQL: pg_trgm 확장, tsvector 식 GIN 인덱스, 제목/저자 trigram GIN 인덱스
+- MySQL: ngram 파서 FULLTEXT 인덱스 (MariaDB에는 ngram 파서가 없어 건너뛰고 ORM 검색을 그대로 씁니다)
+- SQLite: trigram 토크나이저 FTS5 외부 콘텐츠 테이블과 동기화 트리거 (SQLite 3.34 미만이면 건너뜁니다)
+"""
+
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS book_search_tsv_idx ON book "
+    "USING GIN (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '')))",
+    "CREATE INDEX IF NOT EXISTS book_title_trgm_idx ON book USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS book_author_trgm_idx ON book USING GIN (author gin_trgm_ops)",
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS book_search_tsv_idx",
+    "DROP INDEX IF EXISTS book_title_trgm_idx",
+    "DROP INDEX IF EXISTS book_author_trgm_idx",
+]
+
+MYSQL_FORWARD = ["ALTER TABLE book ADD FULLTEXT INDEX book_title_author_ft (title, author) WITH PARSER ngram"]
+MYSQL_BACKWARD = ["ALTER TABLE book DROP INDEX book_title_author_ft"]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE book_fts USING fts5(title, author, content='book', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER book_fts_insert AFTER INSERT ON book BEGIN "
+    "INSERT INTO book_fts(rowid, title, author) VALUES (new.id, new.title, new.author); END",
+    "CREATE TRIGGER book_fts_delete AFTER DELETE ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author); END",
+    "CREATE TRIGGER book_fts_update AFTER UPDATE OF title, author ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author); "
+    "INSERT INTO book_fts(rowid, title, author) VALUES (new.id, new.title, new.author); END",
+    "INSERT INTO book_fts(book_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS book_fts_insert",
+    "DROP TRIGGER IF EXISTS book_fts_delete",
+    "DROP TRIGGER IF EXISTS book_fts_update",
+    "DROP TABLE IF EXISTS book_fts",
+]
+
+
+def _statements(connection, forward):
+    if connection.vendor == 'postgresql':
+        return POSTGRESQL_FORWARD if forward else POSTGRESQL_BACKWARD
+    if connection.vendor == 'mysql':
+        if connection.mysql_is_mariadb:
+            return []  # 기본 파서 FULLTEXT는 띄어쓰기로만 단어를 나눠 한글 부분 문자열을 찾지 못합니다.
+        return MYSQL_FORWARD if forward else MYSQL_BACKWARD
+    if connection.vendor == 'sqlite':
+        import sqlite3
+        if sqlite3.sqlite_version_info < (3, 34):
+            return []  # trigram 토크나이저가 없으므로 ORM 검색을 그대로 씁니다.
+        return SQLITE_FORWARD if forward else SQLITE_BACKWARD
+    return []
+
+
+def create_search_indexes(apps, schema_editor):
+    for statement in _statements(schema_editor.connection, forward=True):
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    for statement in _statements(schema_editor.connection, forward=False):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_item_similarity'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0011_book_text_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='readingentry',
+            index=models.Index(fields=['user', '-read_date', 'id'], name='reading_entry_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['user', '-created_at', 'id'], name='wishlist_user_created_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # books/models.py
 
+import numpy as np
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -11,7 +12,36 @@ class Genre(models.Model):
         return self.name
 
 
+class BookQuerySet(models.QuerySet):
+    def with_details(self):
+        """미뤄 둔 컬럼까지 모두 읽습니다. (책 상세 페이지, 관리자 수정 화면)"""
+        return self.defer(None)
+
+    def for_recommendation(self):
+        """추천 카드(recommend.html)에 필요한 줄거리와 장르만 추가로 읽습니다."""
+        return self.defer(None).defer('description', 'keywords').prefetch_related('genres')
+
+    def for_embedding(self):
+        """임베딩 텍스트(build_book_text)에 필요한 컬럼만 읽습니다."""
+        return self.defer(None).only('id', 'title', 'summary', 'keywords').prefetch_related('genres')
+
+
+class BookManager(models.Manager.from_queryset(BookQuerySet)):
+    """목록 화면이 쓰지 않는 큰 텍스트 컬럼(Book.HEAVY_FIELDS)을 기본으로 읽지 않는 매니저
+
+    필요한 곳에서는 with_details(), for_recommendation(), for_embedding()으로 명시적으로 읽습니다.
+    select_related()나 외래 키 prefetch로 함께 읽는 책에는 적용되지 않으므로
+    Book.heavy_fields('book__')를 defer 하거나 Prefetch(queryset=Book.objects.all())를 사용하세요.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*Book.HEAVY_FIELDS)
+
+
 class Book(models.Model):
+    # 목록 화면에서 읽지 않는 큰 텍스트 컬럼 (임베딩은 BookEmbedding 테이블에 따로 있습니다)
+    HEAVY_FIELDS = ('description', 'summary', 'keywords')
+
     # book_id는 자동 생성되므로 명시할 필요 없음
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255, null=True, blank=True)
@@ -23,11 +53,12 @@ class Book(models.Model):
    # CharField를 TextField로 변경하고, max_length 옵션은 삭제합니다.
     keywords = models.TextField(blank=True, null=True)
     isbn13 = models.CharField(max_length=13, unique=True, null=True, blank=True)
-    embedding_vector = models.JSONField(null=True, blank=True)
     publication_year = models.IntegerField(null=True, blank=True)
     summary = models.TextField(blank=True, null=True)
     kdc_code = models.CharField(max_length=255, blank=True, null=True, verbose_name="KDC 분류코드")
 
+    objects = BookManager()
+
     # Meta 클래스는 db_table 이름이 모델이름_소문자와 다를 경우에만 명시
     class Meta:
         db_table = 'book'
@@ -35,6 +66,56 @@ class Book(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def heavy_fields(cls, prefix=''):
+        """select_related()로 책을 함께 읽는 쿼리에서 defer 할 필드 이름입니다. 예: Book.heavy_fields('book__')"""
+        return [prefix + name for name in cls.HEAVY_FIELDS]
+
+
+class BookEmbedding(models.Model):
+    """책 임베딩 벡터를 float32(또는 float16) 바이트로 저장하는 테이블
+
+    JSON 리스트보다 4~8배 작고, Book 조회 시 함께 읽히지 않습니다.
+    as_array()는 float32로 저장된 벡터를 복사 없이 numpy 배열로 반환합니다.
+    """
+    DTYPE_CHOICES = (('float32', 'float32'), ('float16', 'float16'))
+
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    vector = models.BinaryField()
+    dtype = models.CharField(max_length=10, choices=DTYPE_CHOICES, default='float32')
+    dimension = models.PositiveIntegerField()
+    # 어떤 입력과 모델로 만든 벡터인지 기록합니다. 셋 다 같으면 다시 인코딩하지 않습니다. (embedding.generate_embeddings)
+    source_hash = models.CharField(max_length=64, blank=True, default='')
+    model_name = models.CharField(max_length=255, blank=True, default='')
+    model_version = models.CharField(max_length=50, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'book_embedding'
+
+    def __str__(self):
+        return f"{self.book_id} ({self.dtype}, {self.dimension}d)"
+
+    @staticmethod
+    def encode(vector, dtype='float32'):
+        """벡터를 저장할 바이트로 변환합니다."""
+        return np.ascontiguousarray(vector, dtype=dtype).tobytes()
+
+    @staticmethod
+    def decode(data, dtype='float32'):
+        """저장된 바이트를 float32 배열로 변환합니다. float32는 버퍼를 그대로 참조하는 읽기 전용 배열입니다."""
+        array = np.frombuffer(data, dtype=dtype)
+        return array if dtype == 'float32' else array.astype(np.float32)
+
+    def set_array(self, vector, dtype='float32'):
+        self.vector = self.encode(vector, dtype)
+        self.dtype = dtype
+        self.dimension = len(vector)
+
+    def as_array(self):
+        return self.decode(self.vector, self.dtype)
+
+
 class ReadingEntry(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
@@ -46,6 +127,8 @@ class ReadingEntry(models.Model):
 
     class Meta:
         unique_together = ('user', 'book')
+        # 서재 목록의 키셋 페이지네이션(books/pagination.py) 정렬 순서
+        indexes = [models.Index(fields=['user', '-read_date', 'id'], name='reading_entry_user_read_idx')]
     def __str__(self):
         return f"{self.user.username}'s review for {self.book.title}"
     
@@ -57,6 +140,7 @@ class Wishlist(models.Model):
 
     class Meta:
         unique_together = ('user', 'book')
+        indexes = [models.Index(fields=['user', '-created_at', 'id'], name='wishlist_user_created_idx')]
     def __str__(self):
         return f"{self.user.username}'s wishlist item: {self.book.title}"
 
@@ -68,9 +152,12 @@ class BookRecommend(models.Model):
     is_active = models.BooleanField(default=True)
     generated_time = models.DateTimeField(auto_now_add=True)
     score = models.FloatField(blank=True, null=True)
+    # precompute_recommendations 실행 번호. 새 세대를 모두 쓴 뒤 is_active를 한 번에 바꿉니다.
+    generation = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = 'book_recommend'
+        indexes = [models.Index(fields=['user', 'is_active', 'rank'], name='book_recommend_active_idx')]
 
 class Keyword(models.Model):
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='book_keywords')
@@ -90,4 +177,110 @@ class UserFeedback(models.Model):
     class Meta:
         unique_together = ('user', 'book')
     def __str__(self):
-        return f"Feedback from {self.user.username} for {self.book.title}"
\ No newline at end of file
+        return f"Feedback from {self.user.username} for {self.book.title}"
+
+class UserTasteVector(models.Model):
+    """사용자 취향 벡터: 읽은 책 벡터의 평점 가중 합과 가중치 합 (books/taste.py가 독서 기록 시그널로 갱신합니다)"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='taste_vector')
+    # 더하고 빼기를 반복해도 오차가 쌓이지 않도록 float64 바이트로 저장합니다.
+    weighted_sum = models.BinaryField()
+    total_weight = models.FloatField(default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_taste_vector'
+
+    def __str__(self):
+        return f"{self.user_id} ({self.entry_count} books)"
+
+    def set_sum(self, weighted_sum):
+        self.weighted_sum = np.ascontiguousarray(weighted_sum, dtype=np.float64).tobytes()
+
+    def as_array(self):
+        return np.frombuffer(self.weighted_sum, dtype=np.float64)
+
+    def mean_vector(self):
+        """검색에 쓸 (1, 차원) float32 평균 벡터입니다."""
+        if self.total_weight <= 0:
+            return None
+        return (self.as_array() / self.total_weight).astype(np.float32).reshape(1, -1)
+
+
+class BookPopularity(models.Model):
+    """전체/장르별 인기 순위표 (update_popularity 명령이 주기적으로 다시 계산합니다). genre가 비어 있으면 전체 순위입니다."""
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, null=True, blank=True, related_name='popularity')
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='popularity')
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    reader_count = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+    wishlist_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'book_popularity'
+        indexes = [models.Index(fields=['genre', 'rank'], name='book_popularity_rank_idx')]
+
+    def __str__(self):
+        return f"#{self.rank} {self.book_id} ({self.genre_id or 'all'})"
+
+
+class SimilarBook(models.Model):
+    """책별로 임베딩 거리가 가까운 책 목록 (update_similar_books 명령이 미리 계산합니다)"""
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='similar_books')
+    similar = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    distance = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'book_similar'
+        indexes = [models.Index(fields=['book', 'rank'], name='book_similar_rank_idx')]
+
+    def __str__(self):
+        return f"{self.book_id} -> #{self.rank} {self.similar_id}"
+
+
+class ItemSimilarity(models.Model):
+    """독서 기록/위시리스트 공동 출현으로 계산한 책-책 코사인 유사도 상위 K개 (update_item_cf 명령이 계산합니다)"""
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='item_similarities')
+    similar = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'book_item_similarity'
+
+    def __str__(self):
+        return f"{self.book_id} ~ {self.similar_id} ({self.score:.3f})"
+
+
+class IndexJournal(models.Model):
+    """추천 인덱스에 아직 반영되지 않은 책 임베딩 변경 기록 (compact_rec_index로 기본 인덱스에 합쳐집니다)"""
+    OP_UPSERT = 'upsert'
+    OP_DELETE = 'delete'
+    OP_CHOICES = ((OP_UPSERT, '추가/변경'), (OP_DELETE, '삭제'))
+
+    # 삭제된 책도 기록해야 하므로 ForeignKey 대신 ID만 저장합니다.
+    book_id = models.BigIntegerField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'book_index_journal'
+
+    def __str__(self):
+        return f"#{self.id} {self.op} book {self.book_id}"
+
+
+class CatalogVersion(models.Model):
+    """모든 프로세스가 함께 보는 버전 번호 (books/catalog.py). 이름마다 한 행이며, 바뀐 데이터가 있으면 1씩 올립니다."""
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'book_catalog_version'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,157 @@
+# books/pagination.py
+"""
+키셋(커서) 페이지네이션입니다.
+
+Paginator는 페이지마다 COUNT(*)와 OFFSET을 실행하므로 뒤 페이지일수록 건너뛸 행을 모두 읽어 느려집니다.
+KeysetPaginator는 고정된 정렬(예: '-read_date', 'id')에서 페이지의 마지막(첫) 행 값을 커서로 넘기고,
+다음 페이지를 "그 값보다 뒤(앞)인 행 중 per_page + 1개"로 읽습니다. 필요한 행만 (user, 정렬 필드) 인덱스에서 읽으므로
+몇 번째 페이지든 비용이 같습니다. 마지막 정렬 필드는 유일해야 합니다. (동점 행이 두 페이지에 걸치지 않도록)
+
+커서는 정렬 필드 값과 방향을 JSON → URL-safe base64로 묶은 문자열이며, 잘못된 커서는 첫 페이지로 처리합니다.
+페이지 번호와 전체 개수가 없으므로 템플릿에는 이전/다음 링크만 보여 줍니다. (templates/partials/_cursor_pagination.html)
+작은 목록은 paginate()가 기존 Paginator를 그대로 써서 페이지 번호 UI를 유지합니다.
+"""
+
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+# 서재(ReadingEntry)와 위시리스트의 고정 정렬. 같은 순서의 (user, ...) 인덱스가 있습니다.
+LIBRARY_ORDERING = ('-read_date', 'id')
+WISHLIST_ORDERING = ('-created_at', 'id')
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder는 datetime을 밀리초까지만 쓰므로, 커서에서는 마이크로초까지 그대로 씁니다."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values, direction=NEXT):
+    raw = json.dumps([direction, values], cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(방향, 값 목록)을 반환합니다. 잘못된 커서면 None입니다."""
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPage:
+    """키셋 페이지. Paginator의 Page처럼 순회할 수 있고 has_next/has_previous를 제공합니다."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """queryset을 ordering(필드 이름, '-'는 내림차순) 순서로 per_page개씩 나눕니다."""
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.per_page = per_page
+
+    def _order_by(self, reverse):
+        return [f"{'-' if descending != reverse else ''}{name}" for name, descending in self.ordering]
+
+    def _values(self, obj):
+        return [getattr(obj, name) for name, _ in self.ordering]
+
+    def _after(self, values, reverse):
+        """정렬 순서(reverse면 반대 순서)에서 values보다 뒤인 행의 조건
+        (a > x) OR (a = x AND b > y) OR ... 으로 펼쳐 복합 정렬과 방향이 섞인 정렬을 모두 처리합니다.
+        앞에 붙인 a >= x는 결과가 같은 중복 조건이지만, DB가 OR 조건에서도 인덱스 범위 탐색을 하게 해 줍니다."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[i]})
+            for j, (equal_name, _) in enumerate(self.ordering[:i]):
+                term &= Q(**{equal_name: values[j]})
+            condition |= term
+        name, descending = self.ordering[0]
+        return Q(**{f"{name}__{'lte' if descending != reverse else 'gte'}": values[0]}) & condition
+
+    def _parse(self, values):
+        """커서의 JSON 값을 모델 필드 값으로 되돌립니다. (날짜 문자열 → date 등)"""
+        model = self.queryset.model
+        return [model._meta.get_field(name).to_python(value) for (name, _), value in zip(self.ordering, values)]
+
+    def get_page(self, cursor=None):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is not None and len(decoded[1]) == len(self.ordering):
+            direction, values = decoded
+            try:
+                values = self._parse(values)
+            except (ValidationError, TypeError):
+                direction, values = NEXT, None
+        else:
+            direction, values = NEXT, None
+
+        reverse = direction == PREVIOUS
+        rows = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            rows = rows.filter(self._after(values, reverse))
+        rows = list(rows[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, None, None)
+
+        # 앞으로 넘겨 온 페이지는 이전 페이지가 있고(커서가 있었으므로), 뒤로 넘겨 온 페이지는 다음 페이지가 있습니다.
+        has_next = more if not reverse else True
+        has_previous = values is not None if not reverse else more
+        return KeysetPage(
+            rows,
+            encode_cursor(self._values(rows[-1]), NEXT) if has_next else None,
+            encode_cursor(self._values(rows[0]), PREVIOUS) if has_previous else None,
+        )
+
+
+def paginate(request, queryset, ordering, per_page, page_param='page', cursor_param='cursor'):
+    """목록이 settings.PAGINATION_PAGE_NUMBER_MAX_ITEMS개 이하면 기존 페이지 번호(Paginator),
+    더 크거나 커서가 주어졌으면 키셋 페이지를 반환합니다. (작은지 여부는 그 개수 + 1행까지만 세어 판단합니다)"""
+    cursor = request.GET.get(cursor_param)
+    limit = settings.PAGINATION_PAGE_NUMBER_MAX_ITEMS
+    if cursor or queryset.order_by().values('pk')[:limit + 1].count() > limit:
+        return KeysetPaginator(queryset, ordering, per_page).get_page(cursor)
+    return Paginator(queryset.order_by(*ordering), per_page).get_page(request.GET.get(page_param))
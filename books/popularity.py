@@ -0,0 +1,122 @@
+# books/popularity.py
+"""
+인기 도서 순위표(BookPopularity)를 계산하고, 그 안에서 무작위로 책을 뽑는 모듈입니다.
+
+점수 = 시간 감쇠한 독서 기록 수 × (베이지안 평균 평점 / 5) + WISHLIST_WEIGHT × 시간 감쇠한 위시리스트 추가 수
+감쇠는 settings.REC_POPULARITY_HALF_LIFE_DAYS마다 절반이 되는 지수 감쇠이고,
+평점은 전체 평균을 RATING_PRIOR_COUNT개 기록만큼 섞어 기록이 적은 책의 극단값을 누릅니다.
+
+순위표는 update_popularity 명령이 전체와 장르별로 상위 settings.REC_POPULARITY_TOP_N권씩 다시 씁니다.
+추천 폴백은 (genre, rank) 인덱스로 무작위 순위 k개만 읽으므로 ORDER BY RANDOM() 없이 O(k)입니다.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import catalog, genre_index
+from .models import BookPopularity, Genre, ReadingEntry, Wishlist
+
+WISHLIST_WEIGHT = 0.5
+RATING_PRIOR_COUNT = 5
+SECONDS_PER_DAY = 86400.0
+
+
+def _decay_weights(created_times, now, half_life_days):
+    ages = np.fromiter(((now - created).total_seconds() for created in created_times), dtype=np.float64, count=len(created_times))
+    return np.power(0.5, np.maximum(ages, 0) / SECONDS_PER_DAY / half_life_days)
+
+
+def compute_scores(now=None, half_life_days=None):
+    """책별 (ID 배열, 점수, 독서 수, 평균 평점(없으면 nan), 위시리스트 수)를 ID 오름차순으로 반환합니다."""
+    now = now or timezone.now()
+    half_life_days = half_life_days or settings.REC_POPULARITY_HALF_LIFE_DAYS
+
+    entries = list(ReadingEntry.objects.values_list('book_id', 'rating', 'created_at').iterator(chunk_size=5000))
+    wishes = list(Wishlist.objects.values_list('book_id', 'created_at').iterator(chunk_size=5000))
+    entry_books = np.array([row[0] for row in entries], dtype=np.int64)
+    wish_books = np.array([row[0] for row in wishes], dtype=np.int64)
+    book_ids = np.union1d(entry_books, wish_books)
+    if not len(book_ids):
+        return book_ids, np.empty(0), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64)
+
+    size = len(book_ids)
+    entry_rows = np.searchsorted(book_ids, entry_books)
+    wish_rows = np.searchsorted(book_ids, wish_books)
+    entry_weights = _decay_weights([row[2] for row in entries], now, half_life_days)
+    wish_weights = _decay_weights([row[1] for row in wishes], now, half_life_days)
+
+    reader_counts = np.bincount(entry_rows, minlength=size)
+    wishlist_counts = np.bincount(wish_rows, minlength=size)
+    decayed_reads = np.bincount(entry_rows, weights=entry_weights, minlength=size)
+    decayed_wishes = np.bincount(wish_rows, weights=wish_weights, minlength=size)
+
+    ratings = np.array([np.nan if row[1] is None else row[1] for row in entries], dtype=np.float64)
+    rated = ~np.isnan(ratings)
+    rating_counts = np.bincount(entry_rows[rated], minlength=size)
+    rating_sums = np.bincount(entry_rows[rated], weights=ratings[rated], minlength=size)
+    prior = ratings[rated].mean() if rated.any() else 3.0
+    bayesian = (RATING_PRIOR_COUNT * prior + rating_sums) / (RATING_PRIOR_COUNT + rating_counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_ratings = np.where(rating_counts > 0, rating_sums / rating_counts, np.nan)
+
+    scores = decayed_reads * (bayesian / 5.0) + WISHLIST_WEIGHT * decayed_wishes
+    return book_ids, scores, reader_counts, avg_ratings, wishlist_counts
+
+
+def _top_rows(rows, scores, book_ids, top_n):
+    """rows를 점수 내림차순(같으면 책 ID 오름차순)으로 정렬해 상위 top_n개를 반환합니다."""
+    order = np.lexsort((book_ids[rows], -scores[rows]))
+    return rows[order[:top_n]]
+
+
+def rebuild_popularity(top_n=None, now=None, half_life_days=None):
+    """전체 및 장르별 순위표를 다시 계산해 한 트랜잭션에서 교체합니다. 쓴 행 수를 반환합니다."""
+    now = now or timezone.now()
+    top_n = top_n or settings.REC_POPULARITY_TOP_N
+    book_ids, scores, reader_counts, avg_ratings, wishlist_counts = compute_scores(now, half_life_days)
+
+    def make_rows(genre_id, rows):
+        return [
+            BookPopularity(
+                genre_id=genre_id, book_id=int(book_ids[row]), rank=rank, score=float(scores[row]),
+                reader_count=int(reader_counts[row]), wishlist_count=int(wishlist_counts[row]),
+                avg_rating=None if np.isnan(avg_ratings[row]) else float(avg_ratings[row]),
+                computed_at=now,
+            )
+            for rank, row in enumerate(rows, start=1)
+        ]
+
+    objects = make_rows(None, _top_rows(np.arange(len(book_ids)), scores, book_ids, top_n))
+    # 장르별 순위는 장르 역색인과의 교집합으로 구하므로 Book→genres 조인이 필요 없습니다.
+    genres = genre_index.refresh()
+    for name, genre_id in Genre.objects.values_list('name', 'id'):
+        rows = np.searchsorted(book_ids, genres.intersection(book_ids, genres.ids_by_name.get(name, genre_index.EMPTY)))
+        if len(rows):
+            objects.extend(make_rows(genre_id, _top_rows(rows, scores, book_ids, top_n)))
+
+    with transaction.atomic():
+        BookPopularity.objects.all().delete()
+        BookPopularity.objects.bulk_create(objects, batch_size=1000)
+    catalog.bump(catalog.POPULARITY)  # 자동 완성(books/autocomplete.py)이 인기 순서로 다시 만들어집니다.
+    return len(objects)
+
+
+def sample_popular_ids(k, genres=None, pool=None, rng=None):
+    """인기 순위 상위 pool위 안에서 k권을 무작위로 골라 책 ID 목록으로 반환합니다.
+
+    genres(장르 이름 목록)를 주면 그 장르들의 순위표에서 뽑습니다. 무작위 순위에 해당하는 행만
+    인덱스로 읽고, 순위표가 pool보다 짧아 모자라면 상위 순위로 채웁니다.
+    """
+    pool = max(k, pool or settings.REC_POPULARITY_SAMPLE_POOL)
+    rows = BookPopularity.objects.filter(genre__isnull=True) if not genres else BookPopularity.objects.filter(genre__name__in=genres)
+    ranks = (np.random.default_rng(rng).choice(pool, k, replace=False) + 1).tolist()
+
+    picked = list(dict.fromkeys(rows.filter(rank__in=ranks).values_list('book_id', flat=True)))
+    if len(picked) < k:
+        for book_id in rows.order_by('rank').values_list('book_id', flat=True)[:k * 2]:
+            if book_id not in picked:
+                picked.append(book_id)
+    np.random.default_rng(rng).shuffle(picked)
+    return picked[:k]
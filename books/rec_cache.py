@@ -0,0 +1,106 @@
+# books/rec_cache.py
+"""
+사용자별 추천 결과 캐시입니다.
+
+최종 추천 책 ID 목록과 그 결과를 만든 입력(인덱스 버전, 추천 종류, 출처)을 Django 캐시에 TTL과 함께 저장합니다.
+캐시 키에는 사용자별 세대 번호가 들어 있어서, 독서 기록/피드백/선호 장르가 바뀌면 세대만 올려
+이전 결과를 즉시 무효화합니다. (계산 중이던 요청이 늦게 저장해도 이전 세대 키에 저장되므로 읽히지 않습니다)
+인덱스 버전이나 추천 버전(precompute_recommendations가 새 세대를 공개할 때마다 올리는 DB 행, books/catalog.py)이
+바뀐 결과는 읽을 때 버리므로, 관리 명령 프로세스에서 계산한 결과도 모든 웹 워커에 바로 반영됩니다.
+
+locmem(개발), 파일, DB 캐시 어디서나 동작하도록 get/set/add/incr만 사용합니다.
+사용자별 세대 번호는 캐시에 있으므로, 여러 워커가 같은 사용자의 요청을 나눠 받는 운영 환경에서는
+워커가 함께 쓰는 백엔드(서버 기본값인 DB 캐시, 또는 파일 캐시)가 필요합니다. locmem이면 다른 워커의 무효화가 보이지 않으므로
+gunicorn 워커가 2개 이상일 때는 시작하지 않습니다. (gunicorn.conf.py)
+추천 버전은 요청마다 한 번만 읽고(catalog.cached_versions), 적중/미스 카운터는 settings.REC_CACHE_STATS가 켜져 있을 때만 셉니다.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import catalog, index_store
+
+STATS_KEYS = ('hit', 'miss', 'stale', 'invalidate')
+
+
+def _cache():
+    return caches[settings.REC_CACHE_ALIAS]
+
+
+def _generation_key(user_id):
+    return f'rec:gen:{user_id}'
+
+
+def _result_key(user_id, generation):
+    return f'rec:result:{user_id}:{generation}'
+
+
+def _count(name):
+    if not settings.REC_CACHE_STATS:
+        return
+    cache = _cache()
+    key = f'rec:stats:{name}'
+    # add()는 키가 없을 때만 0으로 만들고, incr()는 백엔드가 지원하는 방식으로 1 올립니다.
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)  # add와 incr 사이에 키가 만료/삭제된 경우
+
+
+def _generation(user_id):
+    return _cache().get(_generation_key(user_id), 0)
+
+
+def get(user_id):
+    """캐시된 (책 ID 목록, 추천 종류)를 반환합니다. 없거나 인덱스/추천 버전이 바뀌었으면 None입니다."""
+    entry = _cache().get(_result_key(user_id, _generation(user_id)))
+    if entry is None:
+        _count('miss')
+        return None
+    if (entry['index_version'] != index_store.current_version()
+            or entry.get('recommendations_version') != catalog.version(catalog.RECOMMENDATIONS)):
+        _count('stale')
+        return None
+    _count('hit')
+    return entry['book_ids'], entry['recommendation_type']
+
+
+def set(user_id, book_ids, recommendation_type, source):
+    """추천 결과와 그 입력 정보를 현재 세대 키에 저장합니다."""
+    entry = {
+        'book_ids': list(book_ids),
+        'recommendation_type': recommendation_type,
+        'source': source,
+        'index_version': index_store.current_version(),
+        'recommendations_version': catalog.version(catalog.RECOMMENDATIONS),
+        'created_at': time.time(),
+    }
+    _cache().set(_result_key(user_id, _generation(user_id)), entry, timeout=settings.REC_CACHE_TTL)
+
+
+def invalidate(user_id):
+    """사용자의 세대 번호를 올려 이전 결과를 읽히지 않게 합니다."""
+    cache = _cache()
+    key = _generation_key(user_id)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    _count('invalidate')
+
+
+def stats():
+    """{'hit': n, 'miss': n, 'stale': n, 'invalidate': n, 'hit_rate': 0~1}"""
+    values = _cache().get_many([f'rec:stats:{name}' for name in STATS_KEYS])
+    result = {name: values.get(f'rec:stats:{name}', 0) for name in STATS_KEYS}
+    lookups = result['hit'] + result['miss'] + result['stale']
+    result['hit_rate'] = result['hit'] / lookups if lookups else 0.0
+    return result
+
+
+def reset_stats():
+    _cache().delete_many([f'rec:stats:{name}' for name in STATS_KEYS])
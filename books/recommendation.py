@@ -0,0 +1,388 @@
+# books/recommendation.py
+"""
+추천 시스템 서빙 모듈입니다.
+
+웹 워커는 미리 계산된 FAISS 인덱스와 DB에 저장된 임베딩 벡터만 사용합니다.
+텍스트 인코딩(SentenceTransformer)은 books/embedding.py에서 오프라인으로만 수행하므로
+이 모듈은 torch나 transformers를 import 하지 않습니다.
+"""
+
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+from . import genre_index, index_store, popularity, rec_cache
+from .models import Book, ReadingEntry, UserFeedback
+
+CHILDREN_GENRES = ['아동', '어린이', '유아']
+RATING_MULTIPLIERS = {5: 1.5, 4: 1.2, 3: 1.0, 2: 0.8, 1: 0.5}
+
+
+class _Overlay:
+    """기본 인덱스 버전 이후의 저널 변경을 담은 작은 델타 인덱스입니다. (생성 후 변경하지 않습니다)"""
+
+    def __init__(self, changes, base_index=None):
+        import numpy as np
+
+        self.position = changes.position
+        self.vectors = changes.upserts
+        self.removed = np.array(sorted(set(changes.upserts) | changes.deletes), dtype=np.int64)
+        self.index = None
+        if changes.upserts:
+            ids = np.fromiter(changes.upserts, dtype=np.int64, count=len(changes.upserts))
+            self.index = index_store.build_flat_index(ids, np.vstack(list(changes.upserts.values())), like=base_index)
+
+    @property
+    def is_empty(self):
+        return self.index is None and not len(self.removed)
+
+
+class LoadedIndex:
+    """한 버전의 FAISS 인덱스와 벡터 행렬을 묶어 둔 객체입니다.
+
+    객체가 살아 있는 동안 버전 디렉터리에 대한 공유 잠금을 유지하므로
+    다른 프로세스의 가비지 컬렉션이 사용 중인 파일을 지우지 않습니다.
+    기본 인덱스는 읽기 전용이고, 이후의 변경은 저널에서 만든 델타(_Overlay)로 겹쳐 검색합니다.
+    """
+
+    def __init__(self, version, mmap=False):
+        self.version = version
+        lease = index_store.acquire_lease(version)
+        weakref.finalize(self, index_store.release_lease, lease)
+        self.manifest = index_store.read_manifest(version)
+        self.index = index_store.read_index(version, mmap=mmap)
+        self.book_ids, self.vectors = index_store.read_vectors(version, mmap=mmap)
+        self.refresh_overlay()
+
+    def refresh_overlay(self):
+        """기본 버전 이후의 저널을 다시 읽어 델타 인덱스를 교체합니다.
+
+        새 책이 들어왔을 수 있으므로 장르 역색인(books/genre_index.py)과 아동 도서 ID 집합도 함께 다시 만듭니다.
+        """
+        changes = index_store.journal_changes(self.manifest.get('journal_position', 0))
+        self.children_ids = genre_index.refresh(self.version).books(*CHILDREN_GENRES)
+        self.overlay = _Overlay(changes, self.index)
+
+    def search(self, query, k, exclude_ids=None):
+        """기본 인덱스와 델타 인덱스를 함께 검색해 거리순 상위 k개의 (거리, ID)를 반환합니다.
+
+        exclude_ids(읽은 책, 관심 없음, 아동 도서 등)는 FAISS IDSelector로 검색 단계에서 건너뛰므로
+        후보를 넉넉히 가져와 파이썬에서 거를 필요가 없습니다. 삭제/변경되어 델타로 가려진 책도 같은 방식으로 제외합니다.
+        모자란 자리는 (inf, -1)로 채웁니다.
+        """
+        import numpy as np
+
+        overlay = self.overlay
+        if exclude_ids is not None and len(exclude_ids):
+            exclude_ids = np.asarray(exclude_ids, dtype=np.int64)
+            base_exclude = np.union1d(overlay.removed, exclude_ids)
+        else:
+            exclude_ids, base_exclude = None, overlay.removed
+        distances, ids = index_store.search_filtered(self.index, query, k, base_exclude)
+        if overlay.index is not None:
+            delta_distances, delta_ids = index_store.search_filtered(overlay.index, query, k, exclude_ids)
+            distances = np.hstack([distances, delta_distances])
+            ids = np.hstack([ids, delta_ids])
+            order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+            distances = np.take_along_axis(distances, order, axis=1)
+            ids = np.take_along_axis(ids, order, axis=1)
+
+        if ids.shape[1] < k:
+            pad = k - ids.shape[1]
+            distances = np.pad(distances, ((0, 0), (0, pad)), constant_values=np.inf)
+            ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+        return distances, ids
+
+    def distances(self, query, book_ids):
+        """질의와 책들 사이의 L2 제곱 거리를 {book_id: 거리}로 계산합니다. (인덱스의 차원 축소 공간 기준)
+
+        검색 결과 밖의 책(예: 협업 필터링 후보)의 거리를 검색 결과의 거리와 같은 기준으로 비교할 때 씁니다.
+        질의가 여러 행(다중 관심사 중심 벡터)이면 가장 가까운 질의까지의 거리입니다. 벡터가 없는 책은 빠집니다.
+        """
+        import numpy as np
+
+        vectors = get_book_vectors(book_ids)
+        found = [book_id for book_id in book_ids if book_id in vectors]
+        if not found:
+            return {}
+        matrix = index_store.transform_vectors(self.index, np.vstack([vectors[book_id] for book_id in found]))
+        query = np.asarray(query, dtype=np.float32)
+        queries = index_store.transform_vectors(self.index, query.reshape(-1, query.shape[-1]))
+        distances = ((matrix[None, :, :] - queries[:, None, :]) ** 2).sum(axis=2).min(axis=0)
+        return dict(zip(found, distances.tolist()))
+
+    def get_vector(self, book_id):
+        """책의 현재 벡터를 반환합니다. 인덱스에 없는 책이면 None입니다."""
+        import numpy as np
+
+        overlay = self.overlay
+        if book_id in overlay.vectors:
+            return overlay.vectors[book_id]
+        if self.vectors is None or not len(self.book_ids) or book_id in overlay.removed:
+            return None
+        row = int(np.searchsorted(self.book_ids, book_id))
+        if row < len(self.book_ids) and self.book_ids[row] == book_id:
+            return self.vectors[row]
+        return None
+
+
+REC_INDEX = None  # 현재 서빙 중인 LoadedIndex (교체는 참조 대입 한 번으로 이루어집니다)
+_load_lock = threading.Lock()
+_last_check = 0.0
+
+
+def _load_version(version):
+    global REC_INDEX
+    mmap = settings.REC_INDEX_MMAP
+    REC_INDEX = LoadedIndex(version, mmap=mmap)
+    print(f"✅ FAISS index {version} loaded successfully. (books={REC_INDEX.index.ntotal}, mmap={mmap})")
+    return REC_INDEX
+
+
+def load_index():
+    """현재 버전의 FAISS 인덱스와 벡터 행렬을 필요할 때만 한 번 로드합니다.
+
+    settings.REC_INDEX_MMAP이 True이면 파일을 읽기 전용으로 매핑하여
+    모든 워커가 페이지 캐시의 한 복사본을 공유합니다.
+    """
+    if REC_INDEX is not None:
+        return REC_INDEX
+
+    with _load_lock:
+        if REC_INDEX is not None:
+            return REC_INDEX
+        version = index_store.current_version()
+        if version is None:
+            print(f"⚠️ ERROR: No FAISS index version found in {index_store.index_dir()}")
+            return None
+        try:
+            return _load_version(version)
+        except Exception as e:
+            print(f"⚠️ Error loading FAISS index {version}: {e}")
+            return None
+
+
+def maybe_reload():
+    """CURRENT 버전이 바뀌었으면 새 버전으로 교체하고, 저널에 새 변경이 있으면 델타를 갱신합니다.
+    요청 사이에 호출됩니다.
+
+    settings.REC_INDEX_RELOAD_INTERVAL초에 한 번만 CURRENT 파일을 읽으므로 비용이 거의 없습니다.
+    아직 인덱스를 로드하지 않은 워커는 아무것도 하지 않습니다.
+    """
+    global _last_check
+    loaded = REC_INDEX
+    if loaded is None:
+        return False
+
+    now = time.monotonic()
+    if now - _last_check < settings.REC_INDEX_RELOAD_INTERVAL:
+        return False
+    _last_check = now
+
+    version = index_store.current_version()
+    if version is None or version == loaded.version:
+        # 버전이 같으면 저널에 새 변경이 있는지만 확인합니다. (기본 키로 최댓값 하나만 읽는 쿼리)
+        if index_store.journal_head() > loaded.overlay.position:
+            loaded.refresh_overlay()
+            return True
+        return False
+
+    if not _load_lock.acquire(blocking=False):
+        return False  # 다른 스레드가 이미 교체 중입니다.
+    try:
+        _load_version(version)
+    except Exception as e:
+        print(f"⚠️ Error reloading FAISS index {version}: {e}")
+        return False
+    finally:
+        _load_lock.release()
+
+    # 이전 버전의 잠금은 마지막 참조가 사라질 때 풀리므로, 여기서 정리 가능한 버전만 지웁니다.
+    del loaded
+    index_store.collect_garbage()
+    return True
+
+
+def get_book_vectors(book_ids):
+    """책 ID 목록에 해당하는 벡터를 {book_id: 벡터} 형태로 반환합니다.
+
+    인덱스와 함께 저장된 벡터 행렬(과 델타)에서 찾고, 없는 책은 DB(book_embedding)에서 읽습니다.
+    """
+    found = {}
+    loaded = REC_INDEX
+    if loaded is not None:
+        for book_id in set(book_ids):
+            vector = loaded.get_vector(book_id)
+            if vector is not None:
+                found[book_id] = vector
+
+    missing = [book_id for book_id in book_ids if book_id not in found]
+    if missing:
+        found.update(index_store.fetch_embeddings(missing))
+    return found
+
+
+def select_candidates(ids, distances, excluded_ids, k):
+    """검색 결과에서 -1(빈 자리)과 excluded_ids를 빼고 상위 k개의 (book_id, 거리)를 반환합니다."""
+    selected = []
+    for book_id, distance in zip(ids, distances):
+        book_id = int(book_id)
+        if book_id == -1 or book_id in excluded_ids:
+            continue
+        selected.append((book_id, float(distance)))
+        if len(selected) >= k:
+            break
+    return selected
+
+
+def get_recommendations_for_user(user, k=30):
+    """사용자별 캐시 → 미리 계산된 추천(BookRecommend) → 실시간 계산 순서로 추천을 반환합니다.
+
+    계산한 결과는 책 ID 순서만 rec_cache에 저장하고, 캐시 적중 시에는 그 순서대로 책만 한 번에 조회합니다.
+    """
+    cached = rec_cache.get(user.id)
+    if cached is not None:
+        book_ids, recommendation_type = cached
+        return fetch_books_in_order(book_ids[:k]), recommendation_type
+
+    books = get_precomputed_recommendations(user, k)
+    if books:
+        recommendation_type, source = f"{user.username}님의 독서 기록을 바탕으로 추천하는 책이에요.", 'precomputed'
+    else:
+        books, recommendation_type = compute_recommendations_for_user(user, k)
+        source = 'online'
+    if books:
+        rec_cache.set(user.id, [book.id for book in books], recommendation_type, source)
+    return books, recommendation_type
+
+
+def popular_books(k, genres=None):
+    """인기 순위표(BookPopularity)에서 k권을 무작위로 골라 반환합니다.
+
+    순위표가 아직 계산되지 않았으면 장르 지정 시 빈 리스트를, 아니면 최근 등록된 책을 반환합니다.
+    """
+    book_ids = popularity.sample_popular_ids(k, genres)
+    if book_ids:
+        return fetch_books_in_order(book_ids)
+    if genres:
+        return []
+    return list(Book.objects.for_recommendation().order_by('-id')[:k])
+
+
+def fetch_books_in_order(book_ids):
+    """책 ID 목록을 한 번의 쿼리로 조회해 주어진 순서대로 반환합니다. (삭제된 책은 건너뜁니다)"""
+    books = {book.id: book for book in Book.objects.for_recommendation().filter(id__in=book_ids)}
+    return [books[book_id] for book_id in book_ids if book_id in books]
+
+
+def get_precomputed_recommendations(user, k=30):
+    """precompute_recommendations 명령이 저장한 활성 추천을 순위대로 반환합니다.
+
+    만든 지 settings.REC_PRECOMPUTED_MAX_AGE_HOURS가 지났거나, 그 뒤에 독서 기록이나 피드백이
+    추가되었으면 최신이 아니므로 빈 리스트를 반환합니다. 기록의 수정/삭제는 생성 시각으로 알 수 없으므로
+    시그널이 mark_precomputed_stale로 활성 추천을 내립니다. (books/signals.py)
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from .models import BookRecommend
+
+    rows = list(BookRecommend.objects.filter(user=user, is_active=True).order_by('rank').values_list('book_id', 'generated_time')[:k])
+    if not rows:
+        return []
+    generated_time = min(generated for _, generated in rows)
+    if generated_time < timezone.now() - timedelta(hours=settings.REC_PRECOMPUTED_MAX_AGE_HOURS):
+        return []
+    if (ReadingEntry.objects.filter(user=user, created_at__gt=generated_time).exists()
+            or UserFeedback.objects.filter(user=user, created_at__gt=generated_time).exists()):
+        return []
+
+    return fetch_books_in_order([book_id for book_id, _ in rows])
+
+
+def mark_precomputed_stale(user_id):
+    """사용자의 독서 기록/피드백이 수정되거나 삭제되면 미리 계산한 추천을 비활성으로 바꿔 실시간 추천을 쓰게 합니다."""
+    from .models import BookRecommend
+
+    BookRecommend.objects.filter(user_id=user_id, is_active=True).update(is_active=False)
+
+
+def compute_recommendations_for_user(user, k=30):
+    """사용자의 독서 기록, 피드백, 후보정 필터를 적용하여 책을 추천합니다."""
+    import numpy as np
+
+    index = load_index()
+    if index is None:
+        return [], "추천 시스템을 준비 중입니다."
+
+    user_entries = ReadingEntry.objects.filter(user=user)
+    read_ratings = dict(user_entries.values_list('book_id', 'rating'))
+    read_book_ids = set(read_ratings)
+
+    if not read_book_ids:
+        recommendation_type = "선택하신 선호 장르의 인기 도서예요."
+        if hasattr(user, 'profile') and hasattr(user.profile, 'get_preferred_genres'):
+            preferred_genres = user.profile.get_preferred_genres()
+            if preferred_genres:
+                # 선호 장르의 인기 순위표에서 뽑고, 순위표가 없으면 장르 역색인에서 뽑습니다. (Book→genres 조인 없음)
+                # 역색인에서 뽑을 때는 '관심 없음' 책과, 아동 장르를 고르지 않은 사용자에게는 아동 도서도 뺍니다.
+                recommended_books = popular_books(k, preferred_genres)
+                if not recommended_books:
+                    genres = genre_index.get_genre_index()
+                    excluded = [UserFeedback.objects.filter(user=user, is_interested=False).values_list('book_id', flat=True)]
+                    if not set(preferred_genres) & set(CHILDREN_GENRES):
+                        excluded.append(genres.books(*CHILDREN_GENRES))
+                    candidates = genres.difference(genres.books(*preferred_genres), *excluded)
+                    recommended_books = fetch_books_in_order(genres.sample(candidates, k).tolist())
+                if recommended_books: return recommended_books, recommendation_type
+        return popular_books(k), "Cheereading의 인기 추천 도서예요."
+
+    recommendation_type = f"{user.username}님의 독서 기록을 바탕으로 추천하는 책이에요."
+
+    # 독서 기록 시그널이 갱신해 둔 취향 벡터(평점 가중 평균)를 한 번에 읽어 옵니다. (books/taste.py)
+    from . import taste
+    user_vector = taste.get_user_vector(user.id)
+    if user_vector is None:
+        return popular_books(k), "독서 기록을 분석 중입니다. 우선 인기 도서를 추천해드려요."
+
+    # ▼▼▼ [핵심 1] 사용자 피드백 필터링 (Blocklist) ▼▼▼
+    not_interested_book_ids = set(UserFeedback.objects.filter(user=user, is_interested=False).values_list('book_id', flat=True))
+    own_excluded = read_book_ids.union(not_interested_book_ids)
+    excluded_ids = np.fromiter(own_excluded, dtype=np.int64)
+
+    # ▼▼▼ [핵심 2] 후보정 필터링 (Gatekeeper) ▼▼▼
+    # 아동 도서를 읽은 적 없는 사용자는 미리 계산해 둔 아동 도서 ID도 검색에서 제외합니다.
+    shared_excluded = None
+    if not genre_index.get_genre_index().has_any(read_book_ids, *CHILDREN_GENRES):
+        shared_excluded = index.children_ids
+        excluded_ids = np.union1d(excluded_ids, shared_excluded)
+
+    # 제외할 책은 검색 단계에서 건너뛰므로 CF와 섞을 후보 풀만큼만 검색합니다.
+    from . import interests, item_cf, search_batcher
+    pool = item_cf.candidate_pool(k)
+    profile = interests.for_user(user.id)
+    if profile is not None:
+        # 다중 관심사: 관심사 중심 벡터들을 한 번의 다중 질의 검색으로 찾아 합칩니다. (books/interests.py)
+        user_vector, shares = profile
+        distances, ids = index.search(user_vector, pool, exclude_ids=excluded_ids)
+        candidates = interests.fuse(distances, ids, shares, pool)
+    else:
+        # REC_SEARCH_BATCHING이 켜져 있으면 동시에 들어온 요청들과 묶어 한 번에 검색합니다. (books/search_batcher.py)
+        batcher = search_batcher.get_batcher()
+        if batcher is not None:
+            distances, ids = batcher.search(index, user_vector, pool, own_excluded, shared_excluded)
+        else:
+            distances, ids = index.search(user_vector, pool, exclude_ids=excluded_ids)
+        candidates = select_candidates(ids[0], distances[0], set(), len(ids[0]))
+
+    # ▼▼▼ [핵심 3] 함께 읽힌 책(아이템-아이템 CF) 점수를 FAISS 점수와 섞습니다 ▼▼▼
+    scores = item_cf.cf_scores(
+        {book_id: RATING_MULTIPLIERS.get(rating, 1.0) for book_id, rating in read_ratings.items()},
+        item_cf.load_neighbours(read_book_ids),
+        set(excluded_ids.tolist()),
+    )
+    recommended_ids = [book_id for book_id, _ in item_cf.blend(index, user_vector, candidates, scores, k)]
+    return fetch_books_in_order(recommended_ids), recommendation_type
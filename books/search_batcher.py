@@ -0,0 +1,175 @@
+# books/search_batcher.py
+"""
+동시에 들어온 추천 검색을 모아 한 번의 다중 질의 FAISS 검색으로 처리하는 스케줄러입니다. (선택 기능)
+
+워커 스레드마다 질의 벡터 하나로 search를 부르면 FAISS가 BLAS 행렬 곱으로 묶어 처리할 기회를 잃습니다.
+settings.REC_SEARCH_BATCHING이 True이면 요청 스레드는 질의를 큐에 넣고 기다리고,
+배처 스레드가 최대 REC_SEARCH_MAX_WAIT_MS 동안 또는 REC_SEARCH_BATCH_SIZE개가 찰 때까지 모아 한 번에 검색한 뒤
+결과를 각 요청에 나눠 줍니다. threaded gunicorn 워커나 ASGI처럼 한 프로세스에 동시 요청이 있을 때만 효과가 있습니다.
+
+사용자마다 다른 제외 목록(읽은 책, 관심 없음)은 하나의 IDSelector로 묶을 수 없으므로,
+모든 사용자에게 같은 제외 목록(아동 도서 등)만 검색 단계에서 거르고 개인 제외 목록은 그 개수만큼 더 가져와서 거릅니다.
+(precompute_recommendations와 같은 방식) 근사 인덱스에서 그래도 모자라면 그 요청만 따로 다시 검색합니다.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from django.conf import settings
+
+
+class _Request:
+    __slots__ = ('index', 'query', 'k', 'own_exclude', 'shared_exclude', 'enqueued', 'done', 'result', 'error')
+
+    def __init__(self, index, query, k, own_exclude, shared_exclude):
+        self.index = index
+        self.query = query
+        self.k = k
+        self.own_exclude = own_exclude
+        self.shared_exclude = shared_exclude
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchBatcher:
+    """질의를 모아 LoadedIndex.search를 한 번에 호출하는 배처. 프로세스마다 하나의 배처 스레드를 씁니다."""
+
+    def __init__(self, batch_size=32, max_wait_ms=2.0, history=1000):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.retries = 0
+        self._waits = deque(maxlen=history)  # 큐에서 기다린 시간 (추가 지연)
+        self._fills = deque(maxlen=history)  # 배치에 모인 요청 수
+
+    def search(self, index, query, k, own_exclude=(), shared_exclude=None, timeout=5.0):
+        """(거리 배열, ID 배열)을 반환합니다. 결과에는 own_exclude와 shared_exclude가 모두 빠져 있습니다."""
+        self._ensure_thread()
+        request = _Request(index, np.asarray(query, dtype=np.float32).reshape(1, -1), k, set(own_exclude), shared_exclude)
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("Recommendation search batcher did not respond in time.")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_thread(self):
+        # fork 된 워커에는 부모의 스레드가 없으므로 프로세스마다 새로 시작합니다.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='rec-search-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            # 이미 쌓여 있는 요청은 기다리지 않고 모두 가져옵니다.
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            # 첫 요청이 들어온 지 max_wait가 지나기 전까지만 더 기다립니다.
+            deadline = batch[0].enqueued + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._execute(batch)
+
+    def _execute(self, batch):
+        started = time.perf_counter()
+        groups = {}
+        for request in batch:
+            key = (id(request.index), id(request.shared_exclude) if request.shared_exclude is not None else None)
+            groups.setdefault(key, []).append(request)
+
+        for requests in groups.values():
+            try:
+                self._search_group(requests)
+            except Exception as e:  # 요청 스레드에서 다시 발생시킵니다.
+                for request in requests:
+                    request.error = e
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self._fills.append(len(batch))
+            self._waits.extend(started - request.enqueued for request in batch)
+        for request in batch:
+            request.done.set()
+
+    def _search_group(self, requests):
+        index, shared = requests[0].index, requests[0].shared_exclude
+        fetch_k = max(request.k + len(request.own_exclude) for request in requests)
+        distances, ids = index.search(np.vstack([request.query for request in requests]), fetch_k, exclude_ids=shared)
+        for row, request in enumerate(requests):
+            keep = (ids[row] != -1) & ~np.isin(ids[row], list(request.own_exclude))
+            row_ids, row_distances = ids[row][keep][:request.k], distances[row][keep][:request.k]
+            if len(row_ids) < request.k and index.index.ntotal > fetch_k:
+                # 근사 인덱스가 모자라게 돌려준 요청만 전체 제외 목록으로 다시 검색합니다.
+                exclude_ids = np.fromiter(request.own_exclude, dtype=np.int64, count=len(request.own_exclude))
+                if shared is not None:
+                    exclude_ids = np.union1d(exclude_ids, shared)
+                request.result = index.search(request.query, request.k, exclude_ids=exclude_ids)
+                with self._stats_lock:
+                    self.retries += 1
+                continue
+            pad = request.k - len(row_ids)
+            request.result = (
+                np.pad(row_distances, (0, pad), constant_values=np.inf).reshape(1, -1),
+                np.pad(row_ids, (0, pad), constant_values=-1).reshape(1, -1),
+            )
+
+    def stats(self):
+        """배치 수, 평균/최대 배치 크기, 배치 채움 비율, 큐 대기(추가 지연) p50/p95(ms)"""
+        with self._stats_lock:
+            fills = np.array(self._fills or [0], dtype=np.float64)
+            waits = np.array(self._waits or [0.0], dtype=np.float64) * 1000
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'retries': self.retries,
+                'avg_batch': float(fills.mean()),
+                'max_batch': int(fills.max()),
+                'fill_ratio': float(fills.mean() / self.batch_size),
+                'wait_p50_ms': float(np.percentile(waits, 50)),
+                'wait_p95_ms': float(np.percentile(waits, 95)),
+            }
+
+
+_BATCHER = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """settings.REC_SEARCH_BATCHING이 True이면 프로세스 공용 배처를, 아니면 None을 반환합니다."""
+    global _BATCHER
+    if not settings.REC_SEARCH_BATCHING:
+        return None
+    if _BATCHER is None:
+        with _batcher_lock:
+            if _BATCHER is None:
+                _BATCHER = SearchBatcher(settings.REC_SEARCH_BATCH_SIZE, settings.REC_SEARCH_MAX_WAIT_MS)
+    return _BATCHER
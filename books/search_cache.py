@@ -0,0 +1,85 @@
+# books/search_cache.py
+"""
+책 검색 결과 캐시입니다.
+
+같은 검색어('해리포터', '한강')를 사용자마다, 페이지마다 다시 검색하지 않도록 정규화한 검색어별로
+관련도순 책 ID 목록(최대 text_search.MAX_RESULTS개)을 Django 캐시에 한 번 저장하고 어느 페이지든 그 목록에서 잘라 씁니다.
+결과가 없는 검색어도 빈 목록으로 저장하되(부정 캐시) 더 짧은 TTL(settings.SEARCH_CACHE_NEGATIVE_TTL)을 씁니다.
+
+정규화: NFC(맥의 NFD 입력 대응), casefold, 연속 공백을 한 칸으로. ('해리  포터 ', '해리 포터'는 같은 검색어)
+캐시 키에 카탈로그 버전(books/catalog.py)이 들어 있어서 책 추가/수정/삭제, 가져오기로 버전이 오르면
+이전 결과는 더 이상 읽히지 않고 TTL이 지나면 사라집니다. 버전은 DB 행이라 어느 프로세스에서 올렸든
+모든 워커가 검색할 때마다 바로 보므로, 캐시 백엔드와 관계없이 책이 바뀐 뒤의 이전 결과를 읽지 않습니다.
+(인기 순위 재계산은 검색 결과와 무관하므로 이 버전을 올리지 않습니다)
+
+locmem(개발), 파일, DB 캐시 어디서나 동작하도록 get/set/add/incr만 사용합니다. (rec_cache와 같은 방식)
+locmem은 워커마다 따로라서 결과와 적중 통계(search_cache_stats)도 워커별이고 적중률이 낮아집니다.
+여러 워커가 결과를 함께 쓰려면 settings.REC_CACHE_ALIAS를 파일/DB 캐시로 설정하세요. (CACHE_BACKEND 환경 변수)
+"""
+
+import hashlib
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import catalog, text_search
+
+STATS_KEYS = ('hit', 'negative_hit', 'miss')
+
+
+def _cache():
+    return caches[settings.REC_CACHE_ALIAS]
+
+
+def normalize(query):
+    """NFC 정규화, casefold, 공백 정리"""
+    return ' '.join(unicodedata.normalize('NFC', query or '').casefold().split())
+
+
+def _result_key(normalized):
+    # 검색어를 해시해 캐시 백엔드의 키 길이/문자 제한을 피합니다.
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    return f'search:result:{catalog.version()}:{digest}'
+
+
+def _count(name):
+    cache = _cache()
+    key = f'search:stats:{name}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)  # add와 incr 사이에 키가 만료/삭제된 경우
+
+
+def search_book_ids(query, limit=text_search.MAX_RESULTS):
+    """text_search.search_book_ids와 같은 결과를 캐시를 거쳐 반환합니다. (관련도순 책 ID, 최대 limit개)"""
+    normalized = normalize(query)
+    if not normalized:
+        return []
+    key = _result_key(normalized)
+    book_ids = _cache().get(key)
+    if book_ids is not None:
+        _count('hit' if book_ids else 'negative_hit')
+        return book_ids[:limit]
+
+    _count('miss')
+    # limit과 관계없이 항상 MAX_RESULTS개를 저장해 두고 잘라 씁니다. (모든 페이지와 API가 같은 항목을 공유)
+    book_ids = text_search.search_book_ids(normalized, text_search.MAX_RESULTS)
+    timeout = settings.SEARCH_CACHE_TTL if book_ids else settings.SEARCH_CACHE_NEGATIVE_TTL
+    _cache().set(key, book_ids, timeout=timeout)
+    return book_ids[:limit]
+
+
+def stats():
+    """{'hit': n, 'negative_hit': n, 'miss': n, 'hit_rate': 0~1} (부정 캐시 적중도 적중으로 셉니다)"""
+    values = _cache().get_many([f'search:stats:{name}' for name in STATS_KEYS])
+    result = {name: values.get(f'search:stats:{name}', 0) for name in STATS_KEYS}
+    lookups = result['hit'] + result['negative_hit'] + result['miss']
+    result['hit_rate'] = (result['hit'] + result['negative_hit']) / lookups if lookups else 0.0
+    return result
+
+
+def reset_stats():
+    _cache().delete_many([f'search:stats:{name}' for name in STATS_KEYS])
@@ -0,0 +1,78 @@
+# books/signals.py
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import Profile
+
+from . import catalog, index_store, rec_cache, recommendation, taste
+from .models import Book, BookEmbedding, ReadingEntry, UserFeedback
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def bump_catalog_version(sender, instance, **kwargs):
+    """책이 추가/수정/삭제되면 카탈로그 버전을 올려 워커의 검색 색인이 다시 만들어지게 합니다."""
+    catalog.bump()
+
+
+@receiver(post_save, sender=BookEmbedding)
+def journal_embedding_change(sender, instance, **kwargs):
+    """책의 임베딩이 새로 생기거나 바뀌면 추천 인덱스 저널에 기록합니다."""
+    index_store.record_changes(upsert_ids=[instance.book_id])
+
+
+@receiver(post_delete, sender=BookEmbedding)
+def journal_embedding_delete(sender, instance, **kwargs):
+    """임베딩이 지워진 책(책 삭제 포함)을 추천 인덱스에서 빼도록 저널에 기록합니다."""
+    index_store.record_changes(delete_ids=[instance.book_id])
+
+
+@receiver(pre_save, sender=ReadingEntry)
+def remember_previous_entry(sender, instance, **kwargs):
+    """수정 전의 (책, 평점)을 기억해 두었다가 저장 후 취향 벡터에서 빼도록 합니다."""
+    instance._taste_previous = None
+    if instance.pk:
+        instance._taste_previous = ReadingEntry.objects.filter(pk=instance.pk).values_list('book_id', 'rating').first()
+
+
+@receiver(post_save, sender=ReadingEntry)
+def update_taste_on_save(sender, instance, created, **kwargs):
+    """독서 기록이 추가/수정되면 사용자 취향 벡터에 변경분만 반영합니다."""
+    previous = None if created else getattr(instance, '_taste_previous', None)
+    taste.apply_entry_change(instance.user_id, removed=previous, added=(instance.book_id, instance.rating))
+    if previous is not None and previous != (instance.book_id, instance.rating):
+        # 평점 수정은 created_at으로 알 수 없으므로 미리 계산한 추천을 직접 내립니다.
+        recommendation.mark_precomputed_stale(instance.user_id)
+    rec_cache.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=ReadingEntry)
+def update_taste_on_delete(sender, instance, **kwargs):
+    """독서 기록이 삭제되면 사용자 취향 벡터에서 그 책을 뺍니다."""
+    taste.apply_entry_change(instance.user_id, removed=(instance.book_id, instance.rating))
+    recommendation.mark_precomputed_stale(instance.user_id)
+    rec_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=UserFeedback)
+@receiver(post_delete, sender=UserFeedback)
+def invalidate_rec_cache_on_feedback(sender, instance, created=False, **kwargs):
+    """'관심 없음' 피드백이 바뀌면 그 사용자의 추천 캐시를 무효화합니다."""
+    if not created:
+        # 수정/삭제된 피드백은 created_at으로 알 수 없으므로 미리 계산한 추천도 내립니다.
+        recommendation.mark_precomputed_stale(instance.user_id)
+    rec_cache.invalidate(instance.user_id)
+
+
+@receiver(post_init, sender=Profile)
+def remember_preferred_genres(sender, instance, **kwargs):
+    """로드 시점의 선호 장르를 기억해 둡니다. (로그인 등으로 프로필만 다시 저장될 때는 무효화하지 않기 위함)"""
+    instance._rec_preferred_genres = instance.__dict__.get('preferred_genres')
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_rec_cache_on_genres(sender, instance, created, **kwargs):
+    """선호 장르가 실제로 바뀐 경우에만 추천 캐시를 무효화합니다."""
+    if not created and instance.preferred_genres != getattr(instance, '_rec_preferred_genres', None):
+        rec_cache.invalidate(instance.user_id)
+    instance._rec_preferred_genres = instance.preferred_genres
@@ -0,0 +1,130 @@
+# books/similar.py
+"""
+책 상세 페이지의 "비슷한 책" 목록을 미리 계산하는 모듈입니다.
+
+서빙 중인 추천 인덱스(recommendation.load_index)로 여러 책을 묶어 한 번에 검색하고,
+책마다 가까운 책 N권을 SimilarBook 테이블에 (book, rank) 순서로 저장합니다.
+book_detail은 이 테이블을 (book, rank) 인덱스로 한 번만 읽습니다.
+
+증분 실행은 목록이 없거나, 목록을 만든 뒤 임베딩이 바뀌었거나, 이웃이 삭제되어 목록이 짧아진 책만 다시 계산합니다.
+새로 들어온 책은 기존 책들의 목록에도 끼어들 수 있으므로, 새 책과 가까운 책(REVERSE_FACTOR × N권)의
+목록 중 마지막 이웃보다 새 책이 가까운 목록에 끼워 넣습니다.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import recommendation
+from .models import BookEmbedding, SimilarBook
+
+REVERSE_FACTOR = 3
+
+
+def stale_book_ids(n):
+    """다시 계산해야 하는 책 ID (목록 없음, 임베딩이 더 최신, 목록이 n권보다 짧음)."""
+    computed = {
+        row['book_id']: (row['computed_at'], row['count'])
+        for row in SimilarBook.objects.values('book_id').annotate(computed_at=Max('computed_at'), count=Count('id'))
+    }
+    stale = []
+    for book_id, updated_at in BookEmbedding.objects.values_list('book_id', 'updated_at').iterator(chunk_size=5000):
+        state = computed.get(book_id)
+        if state is None or state[0] < updated_at or state[1] < n:
+            stale.append(book_id)
+    return stale
+
+
+def search_neighbours(index, book_ids, k):
+    """book_ids를 묶어 한 번에 검색하고 {book_id: [(이웃 ID, 거리), ...]}를 반환합니다. (자기 자신 제외)"""
+    vectors = recommendation.get_book_vectors(book_ids)
+    book_ids = [book_id for book_id in book_ids if book_id in vectors]
+    if not book_ids:
+        return {}
+    distances, ids = index.search(np.vstack([vectors[book_id] for book_id in book_ids]).astype(np.float32), k + 1)
+    result = {}
+    for row, book_id in enumerate(book_ids):
+        result[book_id] = [
+            (int(other), float(distance)) for other, distance in zip(ids[row], distances[row])
+            if other != -1 and other != book_id
+        ][:k]
+    return result
+
+
+def _write_lists(lists, computed_at):
+    """{book_id: [(이웃 ID, 거리), ...]} 목록들을 한 트랜잭션에서 교체합니다."""
+    objects = [
+        SimilarBook(book_id=book_id, similar_id=other, rank=rank, distance=distance, computed_at=computed_at)
+        for book_id, neighbours in lists.items()
+        for rank, (other, distance) in enumerate(neighbours, start=1)
+    ]
+    with transaction.atomic():
+        SimilarBook.objects.filter(book_id__in=list(lists)).delete()
+        SimilarBook.objects.bulk_create(objects, batch_size=1000)
+
+
+def update_similar_books(book_ids, n=10, batch_size=512, incremental=True, log=print):
+    """book_ids의 이웃 목록을 다시 계산합니다. incremental이면 이웃 책들의 목록에도 끼워 넣습니다. 갱신한 목록 수를 반환합니다."""
+    index = recommendation.load_index()
+    if index is None:
+        raise RuntimeError("No recommendation index is available.")
+
+    computed_at = timezone.now()
+    recomputed = set(book_ids)
+    updated = 0
+    for start in range(0, len(book_ids), batch_size):
+        batch = book_ids[start:start + batch_size]
+        found = search_neighbours(index, batch, n * REVERSE_FACTOR if incremental else n)
+        _write_lists({book_id: neighbours[:n] for book_id, neighbours in found.items()}, computed_at)
+        updated += len(found)
+        if incremental:
+            updated += _insert_reverse(found, recomputed, n, computed_at)
+        log(f"  {min(start + batch_size, len(book_ids))}/{len(book_ids)} books")
+    return updated
+
+
+def _insert_reverse(found, recomputed, n, computed_at):
+    """새로 계산한 책이 가까운 이웃 책들의 목록에 들어가야 하면 끼워 넣습니다. (L2 거리는 대칭입니다)
+
+    이번 실행에서 목록을 새로 계산하는 책(recomputed)은 전체 인덱스로 검색하므로 건너뜁니다.
+    """
+    candidates = defaultdict(list)
+    for book_id, neighbours in found.items():
+        for other, distance in neighbours:
+            if other not in recomputed:
+                candidates[other].append((book_id, distance))
+    if not candidates:
+        return 0
+
+    current = defaultdict(list)
+    rows = SimilarBook.objects.filter(book_id__in=list(candidates)).order_by('book_id', 'rank')
+    for book_id, other, distance in rows.values_list('book_id', 'similar_id', 'distance'):
+        current[book_id].append((other, distance))
+
+    changed = {}
+    for book_id, additions in candidates.items():
+        neighbours = current[book_id]
+        worst = neighbours[-1][1] if len(neighbours) >= n else float('inf')
+        additions = [item for item in additions if item[1] < worst]
+        if not additions:
+            continue
+        added_ids = {other for other, _ in additions}
+        merged = [item for item in neighbours if item[0] not in added_ids] + additions
+        changed[book_id] = sorted(merged, key=lambda item: item[1])[:n]
+    if changed:
+        _write_lists(changed, computed_at)
+    return len(changed)
+
+
+def similar_books(book, limit=10):
+    """book_detail용: 미리 계산된 비슷한 책을 순위대로 반환합니다. ((book, rank) 인덱스를 쓰는 쿼리 한 번)"""
+    rows = (
+        SimilarBook.objects.filter(book=book)
+        .select_related('similar')
+        .only('rank', 'similar__id', 'similar__title', 'similar__author', 'similar__cover_image_url')
+        .order_by('rank')[:limit]
+    )
+    return [row.similar for row in rows]
@@ -0,0 +1,198 @@
+# books/taste.py
+"""
+사용자 취향 벡터 모듈입니다.
+
+취향 벡터는 사용자가 읽은 책 벡터의 평점 가중 합(weighted_sum)과 가중치 합(total_weight)으로
+UserTasteVector 테이블에 저장됩니다. 독서 기록이 추가/수정/삭제될 때 시그널(books/signals.py)이
+해당 책의 기여분만 더하고 빼므로, 추천 요청은 저장된 벡터 하나를 읽어 평균을 내기만 하면 됩니다.
+
+책 임베딩이 다시 생성되면 예전에 더한 기여분과 달라져, 나중에 그 기록을 수정/삭제할 때 더한 벡터와 다른 벡터를 빼게 됩니다.
+그래서 임베딩 생성(embedding.generate_embeddings: generate_embeddings.py, update_recommendations)이 끝나면
+임베딩을 다시 만든 책을 읽은 사용자의 벡터를 rebuild_readers로 다시 계산합니다.
+"""
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from . import index_store
+from .bulk import bulk_upsert
+from .models import ReadingEntry, UserTasteVector
+from .recommendation import RATING_MULTIPLIERS, get_book_vectors
+
+
+def rating_weight(rating):
+    return RATING_MULTIPLIERS.get(rating, 1.0)
+
+
+def _weight_table():
+    """평점(0~5, 없으면 0) -> 가중치 조회 배열"""
+    table = np.ones(6, dtype=np.float64)
+    for rating, multiplier in RATING_MULTIPLIERS.items():
+        table[rating] = multiplier
+    return table
+
+
+def get_user_vector(user_id):
+    """사용자의 평균 취향 벡터를 (1, 차원) float32로 반환합니다. 저장된 벡터가 없으면 독서 기록으로 만들어 저장합니다."""
+    taste = UserTasteVector.objects.filter(user_id=user_id).first()
+    if taste is None:
+        taste = rebuild_user(user_id)
+    return taste.mean_vector() if taste is not None else None
+
+
+def get_user_vectors(user_ids):
+    """여러 사용자의 평균 취향 벡터를 {user_id: (차원,) float32}로 반환합니다. 저장된 벡터가 없는 사용자는 빠집니다."""
+    vectors = {}
+    for taste in UserTasteVector.objects.filter(user_id__in=user_ids):
+        vector = taste.mean_vector()
+        if vector is not None:
+            vectors[taste.user_id] = vector[0]
+    return vectors
+
+
+def backfill_missing(user_ids):
+    """user_ids 중 취향 벡터가 없는 사용자만 한 번에 계산해 저장하고, 저장한 사용자 수를 반환합니다."""
+    existing = set(UserTasteVector.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if not missing:
+        return 0
+    return save_taste_vectors(compute_taste_vectors(missing))
+
+
+def rebuild_user(user_id):
+    """한 사용자의 취향 벡터를 독서 기록 전체로 다시 계산해 저장합니다. 벡터가 있는 책이 없으면 None입니다."""
+    entries = list(ReadingEntry.objects.filter(user_id=user_id).values_list('book_id', 'rating'))
+    book_vectors = get_book_vectors([book_id for book_id, _ in entries])
+    weighted_sum = None
+    total_weight = 0.0
+    count = 0
+    for book_id, rating in entries:
+        vector = book_vectors.get(book_id)
+        if vector is None:
+            continue
+        weight = rating_weight(rating)
+        contribution = np.asarray(vector, dtype=np.float64) * weight
+        weighted_sum = contribution if weighted_sum is None else weighted_sum + contribution
+        total_weight += weight
+        count += 1
+
+    if weighted_sum is None:
+        UserTasteVector.objects.filter(user_id=user_id).delete()
+        return None
+    taste = UserTasteVector(user_id=user_id, total_weight=total_weight, entry_count=count)
+    taste.set_sum(weighted_sum)
+    taste.save()
+    return taste
+
+
+def rebuild_readers(book_ids):
+    """book_ids(ID 목록이나 values_list 쿼리셋)의 책을 읽은 사용자의 취향 벡터를 독서 기록 전체로 다시 계산합니다.
+
+    임베딩이 바뀐 책의 예전 기여분을 새 벡터로 바꾸기 위한 것이며, 다시 계산한 사용자 수를 반환합니다.
+    """
+    user_ids = set(ReadingEntry.objects.filter(book_id__in=book_ids).values_list('user_id', flat=True))
+    if not user_ids:
+        return 0
+    computed = compute_taste_vectors(user_ids)
+    save_taste_vectors(computed)
+    # 벡터가 있는 책이 하나도 남지 않은 사용자의 예전 취향 벡터는 지웁니다.
+    UserTasteVector.objects.filter(user_id__in=user_ids).exclude(user_id__in=computed[0].tolist()).delete()
+    return len(user_ids)
+
+
+def apply_entry_change(user_id, removed=None, added=None):
+    """독서 기록 하나의 변경을 취향 벡터에 반영합니다. removed/added는 (book_id, rating) 또는 None입니다."""
+    if removed == added:
+        return
+    book_vectors = get_book_vectors([change[0] for change in (removed, added) if change is not None])
+    with transaction.atomic():
+        taste = UserTasteVector.objects.select_for_update().filter(user_id=user_id).first()
+        if taste is None:
+            # 아직 취향 벡터가 없으면(백필 전) 이번 변경이 반영된 독서 기록 전체로 만듭니다.
+            # 삭제만 있는 경우는 뺄 것이 없고, 사용자 삭제 중일 수도 있으므로 만들지 않습니다.
+            if added is not None:
+                rebuild_user(user_id)
+            return
+
+        weighted_sum = taste.as_array().copy()
+        total_weight = taste.total_weight
+        entry_count = taste.entry_count
+        for change, sign in ((removed, -1), (added, 1)):
+            vector = book_vectors.get(change[0]) if change is not None else None
+            if vector is None:
+                continue
+            if len(vector) != len(weighted_sum):
+                rebuild_user(user_id)  # 임베딩 차원이 바뀌었습니다.
+                return
+            weight = rating_weight(change[1])
+            weighted_sum += sign * weight * np.asarray(vector, dtype=np.float64)
+            total_weight += sign * weight
+            entry_count += sign
+
+        # save() 대신 update()를 사용해, 연쇄 삭제 중에 이미 지워진 행을 다시 만들지 않습니다.
+        rows = UserTasteVector.objects.filter(user_id=user_id)
+        if entry_count <= 0 or total_weight <= 1e-9:
+            rows.delete()
+            return
+        taste.set_sum(weighted_sum)
+        rows.update(weighted_sum=taste.weighted_sum, total_weight=total_weight, entry_count=entry_count, updated_at=timezone.now())
+
+
+def compute_taste_vectors(user_ids=None, chunk_size=200000):
+    """독서 기록 전체로 사용자 취향 벡터를 numpy 연산으로 한 번에 계산합니다.
+
+    반환값은 (사용자 ID 배열, 가중 합 행렬(float64), 가중치 합 배열, 기록 수 배열)입니다.
+    user_ids를 주면 해당 사용자만 계산합니다.
+    """
+    empty = (np.empty(0, dtype=np.int64), np.empty((0, 0)), np.empty(0), np.empty(0, dtype=np.int64))
+    book_ids, vectors = index_store.load_embeddings_from_db()
+    if vectors is None:
+        return empty
+
+    entries = ReadingEntry.objects.order_by('user_id')
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=list(user_ids))
+    rows = list(entries.values_list('user_id', 'book_id', 'rating'))
+    if not rows:
+        return empty
+    entry_users = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    entry_books = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    entry_ratings = np.fromiter((row[2] or 0 for row in rows), dtype=np.int64, count=len(rows))
+
+    # 벡터가 있는 책의 기록만 남기고, 각 기록의 벡터 행 번호와 가중치를 구합니다.
+    positions = np.searchsorted(book_ids, entry_books)
+    positions[positions == len(book_ids)] = 0
+    found = book_ids[positions] == entry_books
+    entry_users, positions = entry_users[found], positions[found]
+    weights = _weight_table()[np.clip(entry_ratings[found], 0, 5)]
+    if not len(entry_users):
+        return empty
+
+    users = np.unique(entry_users)
+    user_rows = np.searchsorted(users, entry_users)
+    sums = np.zeros((len(users), vectors.shape[1]), dtype=np.float64)
+    # 기록은 사용자 순으로 정렬되어 있으므로 청크마다 reduceat으로 사용자별 합을 구해 더합니다.
+    for start in range(0, len(user_rows), chunk_size):
+        chunk_rows = user_rows[start:start + chunk_size]
+        chunk_users, starts = np.unique(chunk_rows, return_index=True)
+        weighted = vectors[positions[start:start + chunk_size]] * weights[start:start + chunk_size, None]
+        sums[chunk_users] += np.add.reduceat(weighted, starts, axis=0)
+    totals = np.bincount(user_rows, weights=weights, minlength=len(users))
+    counts = np.bincount(user_rows, minlength=len(users))
+    return users, sums, totals, counts
+
+
+def save_taste_vectors(computed, batch_size=1000):
+    """compute_taste_vectors의 결과를 bulk upsert 합니다. 저장한 사용자 수를 반환합니다."""
+    users, sums, totals, counts = computed
+    tastes = []
+    for user_id, weighted_sum, total_weight, count in zip(users.tolist(), sums, totals.tolist(), counts.tolist()):
+        taste = UserTasteVector(user_id=user_id, total_weight=total_weight, entry_count=count)
+        taste.set_sum(weighted_sum)
+        tastes.append(taste)
+    return bulk_upsert(
+        UserTasteVector, tastes,
+        update_fields=['weighted_sum', 'total_weight', 'entry_count', 'updated_at'],
+        batch_size=batch_size,
+    )
@@ -0,0 +1,17 @@
+# books/templatetags/pagination_tags.py
+
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def cursor_url(request, cursor_name, cursor):
+    """
+    현재 요청의 쿼리 문자열에서 cursor_name 값만 cursor로 바꾼 '?...' 링크를 만듭니다.
+    다른 파라미터(검색어 등)는 그대로 인코딩해 두므로 &, =, #, 한글이 들어 있어도 링크가 깨지지 않습니다.
+    사용법: {% cursor_url request 'cursor' page_obj.next_cursor %}
+    """
+    query = request.GET.copy()
+    query[cursor_name] = cursor
+    return '?' + query.urlencode()
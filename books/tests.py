@@ -1,3 +1,138 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+
+from . import genre_index, index_store, pagination, recommendation, taste
+from .models import Book, BookEmbedding, BookRecommend, IndexJournal, ReadingEntry, UserFeedback, UserTasteVector
+
+
+class SaveEmbeddingsTests(TestCase):
+    """save_embeddings는 DB가 충돌 대상 지정 upsert를 지원하든(PostgreSQL/SQLite) 아니든(MySQL/MariaDB) 같은 결과여야 합니다."""
+
+    def setUp(self):
+        self.books = [Book.objects.create(title=f"책 {i}", author='작가') for i in range(3)]
+        self.book_ids = [book.id for book in self.books]
+
+    def _save_twice(self):
+        index_store.save_embeddings(self.book_ids[:2], np.ones((2, 4), dtype=np.float32), source_hashes=['a', 'a'])
+        index_store.save_embeddings(self.book_ids, np.full((3, 4), 2, dtype=np.float32), source_hashes=['b', 'b', 'b'])
+
+    def _assert_upserted(self):
+        self.assertEqual(BookEmbedding.objects.count(), 3)
+        for embedding in BookEmbedding.objects.all():
+            np.testing.assert_array_equal(embedding.as_array(), np.full(4, 2, dtype=np.float32))
+            self.assertEqual(embedding.source_hash, 'b')
+        # 다시 저장한 책이 삭제로 기록되면 안 됩니다.
+        self.assertFalse(IndexJournal.objects.filter(op=IndexJournal.OP_DELETE).exists())
+        self.assertEqual(IndexJournal.objects.filter(op=IndexJournal.OP_UPSERT).count(), 5)
+
+    def test_upsert_without_conflict_target(self):
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self._save_twice()
+        self._assert_upserted()
+
+    def test_upsert_with_conflict_target(self):
+        if not connection.features.supports_update_conflicts_with_target:
+            self.skipTest("DB does not support ON CONFLICT targets.")
+        self._save_twice()
+        self._assert_upserted()
+
+
+class RebuildReadersTests(TestCase):
+    """임베딩을 다시 만든 책을 읽은 사용자의 취향 벡터가 새 벡터로 다시 계산되어야 합니다. (MySQL 방식 upsert 포함)"""
+
+    def setUp(self):
+        self.book = Book.objects.create(title="책", author='작가')
+        other = Book.objects.create(title="다른 책", author='작가')
+        index_store.save_embeddings([self.book.id, other.id], np.eye(2, 4, dtype=np.float32))
+        self.user = get_user_model().objects.create_user(username='reader', password='password')
+        ReadingEntry.objects.create(user=self.user, book=self.book, rating=5, read_date=datetime.date.today())
+        ReadingEntry.objects.create(user=self.user, book=other, rating=5, read_date=datetime.date.today())
+
+    def test_rebuild_after_reembedding(self):
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            start = index_store.journal_head()
+            index_store.save_embeddings([self.book.id], np.full((1, 4), 3, dtype=np.float32))
+            rebuilt = taste.rebuild_readers(IndexJournal.objects.filter(id__gt=start).values_list('book_id', flat=True))
+        self.assertEqual(rebuilt, 1)
+        stored = UserTasteVector.objects.get(user=self.user)
+        expected = taste.compute_taste_vectors([self.user.id])
+        np.testing.assert_allclose(stored.as_array(), expected[1][0])
+        np.testing.assert_allclose(stored.mean_vector()[0], [1.5, 2.0, 1.5, 1.5])
+
+
+class GenreIndexTests(TestCase):
+    """장르 역색인의 집합 연산 (DB 없이 배열만으로 확인합니다)"""
+
+    def setUp(self):
+        ids = lambda *book_ids: np.array(book_ids, dtype=np.int64)
+        self.genres = genre_index.GenreIndex(None, {'소설': ids(1, 2, 3, 5), '아동': ids(3, 4), '어린이': ids(4, 6), '역사': ids(2, 5, 7)})
+
+    def test_union_and_intersection(self):
+        self.assertEqual(self.genres.books('아동', '어린이', '없는 장르').tolist(), [3, 4, 6])
+        self.assertEqual(self.genres.books_in_all('소설', '역사').tolist(), [2, 5])
+        self.assertEqual(self.genres.books_in_all('소설', '없는 장르').tolist(), [])
+
+    def test_difference(self):
+        novels = self.genres.books('소설')
+        self.assertEqual(self.genres.difference(novels, self.genres.books('아동', '어린이'), {5}).tolist(), [1, 2])
+        self.assertEqual(self.genres.difference(novels, [], set()).tolist(), [1, 2, 3, 5])
+
+    def test_has_any(self):
+        self.assertTrue(self.genres.has_any({7, 6}, '아동', '어린이'))
+        self.assertFalse(self.genres.has_any({1, 2, 2}, '아동', '어린이'))
+        self.assertFalse(self.genres.has_any(set(), '아동'))
+
+
+class CursorPaginationLinkTests(TestCase):
+    """키셋 페이지 링크는 다른 쿼리 파라미터를 인코딩해 유지하고 현재 커서만 바꿔야 합니다."""
+
+    def test_links_keep_encoded_params(self):
+        request = RequestFactory().get('/books/my-library/', {'query': '해리 & 포터=#1', 'cursor_wishlist': 'old', 'tag': ['a', 'b']})
+        page = pagination.KeysetPage([object()], 'next-cursor', 'previous-cursor')
+        html = render_to_string('partials/_cursor_pagination.html', {'page_obj': page, 'request': request, 'cursor_query_name': 'cursor_wishlist'})
+        links = [part.split('"', 1)[0].replace('&amp;', '&') for part in html.split('href="?')[1:]]
+        self.assertEqual(len(links), 2)
+        for link, cursor in zip(links, ('previous-cursor', 'next-cursor')):
+            query = QueryDict(link)
+            self.assertEqual(query['query'], '해리 & 포터=#1')
+            self.assertEqual(query.getlist('cursor_wishlist'), [cursor])
+            self.assertEqual(query.getlist('tag'), ['a', 'b'])
+
+
+class PrecomputedStalenessTests(TestCase):
+    """미리 계산한 추천은 독서 기록/피드백이 추가될 때뿐 아니라 수정/삭제될 때도 최신이 아니어야 합니다."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='reader', password='password')
+        self.books = [Book.objects.create(title=f"책 {i}", author='작가') for i in range(3)]
+        self.entry = ReadingEntry.objects.create(user=self.user, book=self.books[0], rating=5, read_date=datetime.date.today())
+        self.feedback = UserFeedback.objects.create(user=self.user, book=self.books[1], is_interested=False)
+        BookRecommend.objects.create(user=self.user, book=self.books[2], rank=1)
+
+    def _precomputed(self):
+        return recommendation.get_precomputed_recommendations(self.user)
+
+    def test_fresh_batch_is_served(self):
+        self.entry.review = "리뷰만 고침"
+        self.entry.save()
+        self.assertEqual(self._precomputed(), [self.books[2]])
+
+    def test_rating_edit_marks_stale(self):
+        self.entry.rating = 1
+        self.entry.save()
+        self.assertEqual(self._precomputed(), [])
+
+    def test_entry_delete_marks_stale(self):
+        self.entry.delete()
+        self.assertEqual(self._precomputed(), [])
+
+    def test_feedback_delete_marks_stale(self):
+        self.feedback.delete()
+        self.assertEqual(self._precomputed(), [])
@@ -0,0 +1,187 @@
+# books/text_search.py
+"""
+책 제목/저자 전문 검색 모듈입니다. (book_search 페이지와 플랜 만들기의 책 검색 API가 사용합니다)
+
+title__icontains | author__icontains는 앞쪽 와일드카드 LIKE라 B-tree 인덱스를 쓸 수 없어 매번 전체 테이블을 훑습니다.
+DB 종류에 따라 마이그레이션(0011_book_text_search)이 만든 전문 검색 인덱스를 사용합니다.
+
+- PostgreSQL: to_tsvector('simple', 제목 || 저자) GIN 인덱스와 제목/저자 pg_trgm GIN 인덱스
+  (부분 문자열 ILIKE도 trigram 인덱스로 처리됩니다)
+- MySQL: ngram 파서 FULLTEXT 인덱스 (한글처럼 띄어쓰기만으로 나뉘지 않는 단어도 2글자 단위로 찾습니다)
+  MariaDB에는 ngram 파서가 없어 마이그레이션이 인덱스를 만들지 않으므로 ORM 검색을 씁니다.
+- SQLite: trigram 토크나이저 FTS5 가상 테이블 book_fts (트리거로 book 테이블과 동기화됩니다)
+
+검색어는 공백으로 나눈 단어마다 제목이나 저자 중 하나에 포함되어야 하며(AND), 결과는 관련도순(같으면 ID순)입니다.
+인덱스가 처리할 수 없는 짧은 단어(SQLite 3글자 미만, MySQL 2글자 미만)는 LIKE 조건으로 함께 거르고,
+전문 검색 인덱스가 없으면 ORM icontains 검색으로 대신합니다.
+"""
+
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Book
+
+MAX_RESULTS = 1000  # 한 검색어로 순위를 매길 최대 책 수 (페이지네이션도 이 안에서 이루어집니다)
+MAX_TERMS = 8
+ORM_RANK_WINDOW = 4  # ORM 검색은 limit의 이 배수만큼 찾은 뒤 그 안에서 순위를 매깁니다.
+FTS_TABLE = 'book_fts'
+# 인덱스가 단어를 찾을 수 있는 최소 글자 수 (SQLite trigram: 3, MySQL ngram_token_size 기본값: 2)
+MIN_TERM_LENGTH = {'sqlite': 3, 'mysql': 2, 'postgresql': 1}
+
+
+def split_terms(query):
+    """검색어를 공백 기준 단어 목록으로 나눕니다. (중복 제거, 최대 MAX_TERMS개)"""
+    terms = []
+    for term in (query or '').split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _like_pattern(term):
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+@lru_cache(maxsize=None)
+def _has_fts_table(alias):
+    """SQLite에서 book_fts 가상 테이블이 만들어졌는지 (trigram을 지원하지 않는 SQLite면 마이그레이션이 건너뜁니다)"""
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def backend():
+    """현재 DB에서 사용할 검색 방식 이름: 'postgresql', 'mysql', 'sqlite', 또는 'orm'"""
+    vendor = connection.vendor
+    if vendor == 'postgresql' or (vendor == 'mysql' and not connection.mysql_is_mariadb):
+        return vendor
+    if vendor == 'sqlite' and _has_fts_table(connection.alias):
+        return vendor
+    return 'orm'
+
+
+def search_book_ids(query, limit=MAX_RESULTS):
+    """검색어와 관련도가 높은 순서대로 책 ID 목록을 최대 limit개 반환합니다."""
+    terms = split_terms(query)
+    if not terms:
+        return []
+    limit = min(limit, MAX_RESULTS)
+    name = backend()
+    if name == 'orm':
+        return orm_search_ids(terms, limit)
+    indexed = [term for term in terms if len(term) >= MIN_TERM_LENGTH[name]]
+    if not indexed:
+        return orm_search_ids(terms, limit)  # 인덱스로 찾을 수 있는 단어가 없습니다. (예: SQLite에서 두 글자 검색어)
+    short = [term for term in terms if term not in indexed]
+
+    if name == 'postgresql':
+        sql, params = _postgresql_sql(terms, limit)
+    elif name == 'mysql':
+        sql, params = _mysql_sql(indexed, short, limit)
+    else:
+        sql, params = _sqlite_sql(indexed, short, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _like_filters(terms, operator='LIKE', escape=''):
+    """단어마다 제목이나 저자에 포함되어야 한다는 LIKE 조건 (MySQL과 PostgreSQL은 기본 이스케이프 문자가 역슬래시입니다)"""
+    clauses, params = [], []
+    for term in terms:
+        clauses.append(f"(b.title {operator} %s{escape} OR b.author {operator} %s{escape})")
+        params += [_like_pattern(term)] * 2
+    return clauses, params
+
+
+def _postgresql_sql(terms, limit):
+    # 인덱스와 같은 식이어야 GIN 인덱스를 사용합니다. (마이그레이션 0011의 book_search_tsv_idx)
+    document = "to_tsvector('simple', coalesce(b.title, '') || ' ' || coalesce(b.author, ''))"
+    query = ' '.join(terms)
+    like_clauses, like_params = _like_filters(terms, 'ILIKE')
+    sql = (
+        f"SELECT b.id FROM book b "
+        f"WHERE {document} @@ plainto_tsquery('simple', %s) OR ({' AND '.join(like_clauses)}) "
+        f"ORDER BY ts_rank({document}, plainto_tsquery('simple', %s)) "
+        f"+ greatest(similarity(coalesce(b.title, ''), %s), similarity(coalesce(b.author, ''), %s)) DESC, b.id "
+        f"LIMIT %s"
+    )
+    return sql, [query, *like_params, query, query, query, limit]
+
+
+def _mysql_sql(indexed, short, limit):
+    # 불리언 모드에서 단어마다 +"단어"로 반드시 포함되도록 하고, 관련도는 자연어 모드 점수로 정렬합니다.
+    boolean_query = ' '.join('+"{}"'.format(term.replace('"', ' ')) for term in indexed)
+    natural_query = ' '.join(indexed)
+    clauses, params = _like_filters(short)
+    where = ' AND '.join(["MATCH(b.title, b.author) AGAINST (%s IN BOOLEAN MODE)", *clauses])
+    sql = (
+        f"SELECT b.id FROM book b WHERE {where} "
+        f"ORDER BY MATCH(b.title, b.author) AGAINST (%s IN NATURAL LANGUAGE MODE) DESC, b.id LIMIT %s"
+    )
+    return sql, [boolean_query, *params, natural_query, limit]
+
+
+def _sqlite_sql(indexed, short, limit):
+    # 단어마다 큰따옴표 구문으로 감싸 FTS5 문법 문자를 그대로 찾습니다. 제목 일치에 저자보다 큰 가중치를 줍니다.
+    # bm25()를 직접 정렬하지 않고 rank 열로 정렬해야 FTS5가 상위 LIMIT개만 골라 내는 최적화를 씁니다.
+    match = ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in indexed)
+    where = f"{FTS_TABLE} MATCH %s AND rank MATCH 'bm25(2.0, 1.0)'"
+    if not short:
+        return f"SELECT rowid FROM {FTS_TABLE} WHERE {where} ORDER BY rank, rowid LIMIT %s", [match, limit]
+    clauses, params = _like_filters(short, escape=" ESCAPE '\\'")
+    sql = (
+        f"SELECT b.id FROM {FTS_TABLE} JOIN book b ON b.id = {FTS_TABLE}.rowid "
+        f"WHERE {' AND '.join([where, *clauses])} ORDER BY {FTS_TABLE}.rank, b.id LIMIT %s"
+    )
+    return sql, [match, *params, limit]
+
+
+def orm_search_ids(terms, limit):
+    """전문 검색 인덱스 없이 icontains로 찾습니다. 제목 일치 → 제목 시작 → 그 밖의 순서입니다.
+
+    전체를 정렬하면 일치하는 모든 행을 읽어야 하므로, 먼저 찾은 limit의 ORM_RANK_WINDOW배 안에서만 순위를 매깁니다.
+    (인덱스가 처리하지 못하는 한두 글자 검색어도 예전 쿼리처럼 그만큼만 훑고 멈춥니다)
+    """
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(author__icontains=term)
+    phrase = ' '.join(terms).casefold()
+
+    def rank(row):
+        title = (row[1] or '').casefold()
+        return (0 if title == phrase else 1 if title.startswith(phrase) else 2, row[0])
+
+    rows = Book.objects.filter(condition).values_list('id', 'title')[:min(limit * ORM_RANK_WINDOW, MAX_RESULTS)]
+    return [book_id for book_id, _ in sorted(rows, key=rank)[:limit]]
+
+
+class RankedBooks:
+    """순위가 매겨진 책 ID 목록을 Paginator에 넘기기 위한 시퀀스입니다. 페이지마다 그 페이지의 책만 조회합니다."""
+
+    def __init__(self, book_ids, queryset=None):
+        self.book_ids = list(book_ids)
+        self.queryset = queryset if queryset is not None else Book.objects.all()
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def count(self):
+        return len(self.book_ids)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return fetch_in_order(self.book_ids[key], self.queryset)
+        return fetch_in_order([self.book_ids[key]], self.queryset)[0]
+
+
+def fetch_in_order(book_ids, queryset=None):
+    """책 ID 목록을 한 번의 쿼리로 조회해 주어진 순서대로 반환합니다. (삭제된 책은 건너뜁니다)"""
+    queryset = queryset if queryset is not None else Book.objects.all()
+    books = {book.id: book for book in queryset.filter(id__in=book_ids)}
+    return [books[book_id] for book_id in book_ids if book_id in books]
+
+
+def search_books(query, limit=MAX_RESULTS, queryset=None):
+    """검색어와 관련도가 높은 순서대로 책을 최대 limit권 반환합니다."""
+    return fetch_in_order(search_book_ids(query, limit), queryset)
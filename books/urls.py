@@ -8,8 +8,11 @@ app_name = 'books'
 urlpatterns = [
     path('', views.home, name='home'),
     path('search/', views.book_search, name='search'),
+    path('api/autocomplete/', views.autocomplete_api, name='autocomplete_api'),
     path('<int:book_id>/', views.book_detail, name='book_detail'),
     path('my-library/', views.my_library_view, name='my_library'),
+    path('api/my-library/', views.my_library_api, name='my_library_api'),
+    path('api/wishlist/', views.wishlist_api, name='wishlist_api'),
 
     # ▼▼▼ [수정 1] 'add_review' 경로의 이름을 'add_reading_entry'로 변경합니다. ▼▼▼
     # 이렇게 하면 템플릿에서 {% url 'books:add_reading_entry' ... %}를 사용할 수 있습니다.
@@ -1,68 +1,24 @@
 import datetime
-import os  # 👈 [추가]
-from django.conf import settings  # 👈 [추가]
-# import faiss  # [수정] 파일 최상단에서 삭제
-# import numpy as np  # [수정] 파일 최상단에서 삭제
-# from sentence_transformers import SentenceTransformer  # [수정] 파일 최상단에서 삭제
 import json
 from django.db.models import Count
 from collections import Counter
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from users.models import Profile
 from .form import ReadingEntryForm
 from .models import Book, ReadingEntry, Wishlist, Genre, UserFeedback
+from .recommendation import get_recommendations_for_user, popular_books
+from .similar import similar_books
+from . import autocomplete, pagination, search_cache, text_search
+from django.conf import settings
+from django.views.decorators.cache import cache_control
 from django.urls import reverse
 
 
-# --- [수정] 추천 시스템 관련: 지연 로딩(Lazy Loading) ---
-REC_MODEL = None
-REC_INDEX = None
-
-def load_recommendation_system():
-    """추천 시스템 모델과 인덱스를 필요할 때만 로드합니다."""
-    global REC_MODEL, REC_INDEX
-    
-    # 이미 로드되었다면, 다시 로드하지 않음
-    if REC_MODEL is not None and REC_INDEX is not None:
-        return
-
-    try:
-        # [수정] 함수 내부에서 라이브러리를 import 합니다.
-        from sentence_transformers import SentenceTransformer
-        import faiss
-        
-        # ▼▼▼ [핵심 수정] FAISS 파일 경로를 BASE_DIR 기준으로 설정 ▼▼▼
-        faiss_file_path = os.path.join(settings.BASE_DIR, 'book_index.faiss')
-
-        # 파일 존재 여부 확인
-        if not os.path.exists(faiss_file_path):
-            print(f"⚠️ ERROR: FAISS file not found at {faiss_file_path}")
-            REC_MODEL = None
-            REC_INDEX = None
-            return
-        # ▲▲▲ [핵심 수정] ▲▲▲
-
-        REC_MODEL = SentenceTransformer('jhgan/ko-sroberta-multitask')
-        REC_INDEX = faiss.read_index(faiss_file_path) # 👈 수정된 경로 사용
-        print("✅ Recommendation model and FAISS index loaded successfully.")
-
-    except FileNotFoundError: # 👈 명시적 에러 처리
-        print(f"⚠️ FileNotFoundError: FAISS file not found at {faiss_file_path}")
-        REC_MODEL = None
-        REC_INDEX = None
-    except Exception as e:
-        REC_MODEL = None
-        REC_INDEX = None
-        print(f"⚠️ Error loading recommendation model/index: {e}")
-# --- [수정 완료] ---
-
-
 # --- 기존 뷰 함수들은 변경 없이 그대로 유지됩니다 ---
 def home(request):
     """메인 페이지를 렌더링합니다."""
@@ -71,14 +27,28 @@ def home(request):
 def book_search(request):
     """책을 검색하고 결과를 페이지네이션하여 보여줍니다."""
     query = request.GET.get('query', '').strip()
-    book_list = Book.objects.filter(Q(title__icontains=query) | Q(author__icontains=query)).distinct() if query else Book.objects.none()
+    # 전문 검색 인덱스로 관련도순 책 ID를 구하고(같은 검색어는 캐시, books/search_cache.py), 페이지마다 그 페이지의 책만 조회합니다.
+    book_list = text_search.RankedBooks(search_cache.search_book_ids(query)) if query else Book.objects.none()
     paginator = Paginator(book_list, 10) 
     page_obj = paginator.get_page(request.GET.get('page'))
     context = {'page_obj': page_obj, 'query': query}
     return render(request, 'books/book_search.html', context)
 
+@cache_control(public=True, max_age=settings.BOOK_AUTOCOMPLETE_MAX_AGE)
+def autocomplete_api(request):
+    """검색어로 시작하는 제목/저자의 책을 인기 순으로 반환합니다. (입력 중 자동 완성, books/autocomplete.py)
+
+    결과가 사용자와 무관하므로 브라우저/프록시가 잠깐 캐시해도 됩니다.
+    """
+    query = request.GET.get('query', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', settings.BOOK_AUTOCOMPLETE_LIMIT)), 1), 50)
+    except ValueError:
+        limit = settings.BOOK_AUTOCOMPLETE_LIMIT
+    return JsonResponse({'books': autocomplete.complete(query, limit) if query else []})
+
 def book_detail(request, book_id):
-    book = get_object_or_404(Book, pk=book_id)
+    book = get_object_or_404(Book.objects.with_details(), pk=book_id)
     
     # --- 기존 리뷰 관련 로직 (변경 없음) ---
     all_reviews = ReadingEntry.objects.filter(book=book).select_related('user').order_by('-read_date')
@@ -116,6 +86,9 @@ def book_detail(request, book_id):
     
     # --- 통계 계산 로직 종료 ---
 
+    # update_similar_books 명령이 미리 계산해 둔 목록을 인덱스로 한 번에 읽습니다. (실시간 벡터 검색 없음)
+    similar_book_list = similar_books(book, limit=6)
+
     context = {
         'book': book,
         'is_in_library': is_in_library,
@@ -129,21 +102,55 @@ def book_detail(request, book_id):
         'gender_data': json.dumps(gender_data),
         'age_labels': json.dumps(age_labels),
         'age_data': json.dumps(age_data),
+        'similar_books': similar_book_list,
     }
     return render(request, 'books/book_detail.html', context)
 
 @login_required
 def my_library_view(request):
-    """내 서재와 위시리스트를 페이지네이션하여 보여줍니다."""
-    reading_entry_list = ReadingEntry.objects.filter(user=request.user).select_related('book').order_by('-read_date')
-    paginator_finished = Paginator(reading_entry_list, 6)
-    finished_books_page = paginator_finished.get_page(request.GET.get('page_finished'))
-    wishlist_item_list = Wishlist.objects.filter(user=request.user).select_related('book').order_by('-created_at')
-    paginator_wishlist = Paginator(wishlist_item_list, 5)
-    wishlist_items_page = paginator_wishlist.get_page(request.GET.get('page_wishlist'))
+    """내 서재와 위시리스트를 페이지네이션하여 보여줍니다. 목록이 길면 키셋(이전/다음) 페이지입니다."""
+    reading_entry_list = ReadingEntry.objects.filter(user=request.user).select_related('book').defer(*Book.heavy_fields('book__'))
+    finished_books_page = pagination.paginate(request, reading_entry_list, pagination.LIBRARY_ORDERING, 6, 'page_finished', 'cursor_finished')
+    wishlist_item_list = Wishlist.objects.filter(user=request.user).select_related('book').defer(*Book.heavy_fields('book__'))
+    wishlist_items_page = pagination.paginate(request, wishlist_item_list, pagination.WISHLIST_ORDERING, 5, 'page_wishlist', 'cursor_wishlist')
     context = {'finished_books_page': finished_books_page, 'wishlist_items_page': wishlist_items_page}
     return render(request, 'books/my_library.html', context)
 
+def _keyset_json(request, queryset, ordering, serialize):
+    """?cursor=로 이어 읽는 JSON 목록 응답 (limit은 최대 50)"""
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    page = pagination.KeysetPaginator(queryset, ordering, limit).get_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [serialize(item) for item in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+@login_required
+def my_library_api(request):
+    """내 서재(읽은 책) 목록을 최근 읽은 순으로 커서 페이지네이션하여 반환합니다."""
+    entries = ReadingEntry.objects.filter(user=request.user).select_related('book').only(
+        'id', 'rating', 'read_date', 'book__id', 'book__title', 'book__author', 'book__cover_image_url'
+    )
+    return _keyset_json(request, entries, pagination.LIBRARY_ORDERING, lambda entry: {
+        'id': entry.id, 'rating': entry.rating, 'read_date': entry.read_date.isoformat(),
+        'book': {'id': entry.book.id, 'title': entry.book.title, 'author': entry.book.author, 'cover_image_url': entry.book.cover_image_url},
+    })
+
+@login_required
+def wishlist_api(request):
+    """위시리스트를 최근 담은 순으로 커서 페이지네이션하여 반환합니다."""
+    items = Wishlist.objects.filter(user=request.user).select_related('book').only(
+        'id', 'created_at', 'book__id', 'book__title', 'book__author', 'book__cover_image_url'
+    )
+    return _keyset_json(request, items, pagination.WISHLIST_ORDERING, lambda item: {
+        'id': item.id, 'created_at': item.created_at.isoformat(),
+        'book': {'id': item.book.id, 'title': item.book.title, 'author': item.book.author, 'cover_image_url': item.book.cover_image_url},
+    })
+
 @login_required
 def add_review(request, book_id):
     """책을 서재에 추가하며 리뷰를 작성하는 페이지입니다."""
@@ -260,86 +267,19 @@ def delete_reading_entry(request, entry_id):
         messages.success(request, f"'{book_title}' 기록을 서재에서 삭제했습니다.")
     return redirect('books:my_library')
 
-# --- 추천 시스템 핵심 로직 (수정 완료) ---
-
-def _get_recommendations_for_user(user, k=30):
-    """사용자의 독서 기록, 피드백, 후보정 필터를 적용하여 책을 추천합니다."""
-    
-    # [수정] 함수가 호출될 때만 numpy를 import 합니다.
-    import numpy as np
-    
-    # [수정] 함수가 호출될 때 추천 시스템을 로드합니다.
-    load_recommendation_system()
-    
-    if not REC_MODEL or not REC_INDEX:
-        return [], "추천 시스템을 준비 중입니다."
-
-    user_entries = ReadingEntry.objects.filter(user=user).select_related('book').prefetch_related('book__genres')
-    
-    if not user_entries.exists():
-        recommendation_type = "선택하신 선호 장르의 인기 도서예요."
-        if hasattr(user, 'profile') and hasattr(user.profile, 'get_preferred_genres'):
-            preferred_genres = user.profile.get_preferred_genres()
-            if preferred_genres:
-                recommended_books = list(Book.objects.filter(genres__name__in=preferred_genres).distinct().order_by('?')[:k])
-                if recommended_books: return recommended_books, recommendation_type
-        return list(Book.objects.all().order_by('?')[:k]), "Cheereading의 인기 추천 도서예요."
-
-    recommendation_type = f"{user.username}님의 독서 기록을 바탕으로 추천하는 책이에요."
-    
-    weighted_vectors = []
-    total_weight = 0
-    for entry in user_entries.order_by('-read_date')[:20]:
-        if entry.book and entry.book.embedding_vector:
-            rating_multiplier = {5: 1.5, 4: 1.2, 3: 1.0, 2: 0.8, 1: 0.5}.get(entry.rating, 1.0)
-            book_vector = np.array(entry.book.embedding_vector, dtype=np.float32)
-            weighted_vectors.append(book_vector * rating_multiplier)
-            total_weight += rating_multiplier
-    if not weighted_vectors:
-        return list(Book.objects.all().order_by('?')[:k]), "독서 기록을 분석 중입니다. 우선 인기 도서를 추천해드려요."
-
-    user_vector = np.sum(weighted_vectors, axis=0) / total_weight
-    user_vector = user_vector.reshape(1, -1).astype('float32')
-    
-    distances, ids = REC_INDEX.search(user_vector, k * 5) # 후보군 5배로 넉넉하게 확보
-
-    # ▼▼▼ [핵심 1] 사용자 피드백 필터링 (Blocklist) ▼▼▼
-    read_book_ids = {entry.book_id for entry in user_entries}
-    not_interested_book_ids = set(UserFeedback.objects.filter(user=user, is_interested=False).values_list('book_id', flat=True))
-    excluded_ids = read_book_ids.union(not_interested_book_ids)
-    
-    recommended_ids = [int(book_id) for book_id in ids[0] if int(book_id) not in excluded_ids and int(book_id) != -1]
-    
-    initial_recommendations = list(Book.objects.filter(id__in=recommended_ids).prefetch_related('genres'))
-    initial_recommendations.sort(key=lambda x: recommended_ids.index(x.id))
-
-    # ▼▼▼ [핵심 2] 후보정 필터링 (Gatekeeper) ▼▼▼
-    has_read_children_books = user_entries.filter(book__genres__name__in=['아동', '어린이', '유아']).exists()
-    final_recommendations = []
-    for book in initial_recommendations:
-        if not has_read_children_books:
-            book_genres = {genre.name for genre in book.genres.all()}
-            if '아동' in book_genres or '어린이' in book_genres or '유아' in book_genres:
-                continue
-        final_recommendations.append(book)
-        if len(final_recommendations) >= k:
-            break
-            
-    return final_recommendations, recommendation_type
-
 @login_required
 def recommend_books(request):
     """추천된 도서 목록과 위시리스트를 함께 페이지에 렌더링합니다."""
     
     # 1. 기존 추천 로직은 그대로 유지합니다.
-    recommended_books, recommendation_type = _get_recommendations_for_user(request.user)
+    recommended_books, recommendation_type = get_recommendations_for_user(request.user)
     if not recommended_books:
         recommendation_type = "Cheereading의 인기 추천 도서예요."
-        recommended_books = list(Book.objects.all().order_by('?')[:10])
+        recommended_books = popular_books(10)
 
     # ▼▼▼ [핵심 추가] 사용자의 위시리스트를 불러오는 코드 ▼▼▼
     # 최근에 추가한 5개의 항목만 가져옵니다.
-    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('book').order_by('-created_at')[:5]
+    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('book').defer(*Book.heavy_fields('book__')).order_by('-created_at')[:5]
 
     # 2. context에 모든 데이터를 담아 전달합니다.
     context = {
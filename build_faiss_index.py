@@ -2,48 +2,31 @@
 
 import os
 import django
-import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer # 이 import가 있는지 확인
 
 # Django 환경 설정
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cheereading.settings")
 django.setup()
 
-from books.models import Book
+from django.conf import settings
+from books.index_store import build_index as build_ann_index, journal_head, load_embeddings_from_db, publish
 
 def build_index():
-    print("모든 책 데이터를 불러오는 중...")
-    books = list(Book.objects.all())
+    # 인덱스는 DB에 저장된 임베딩 벡터만으로 만들기 때문에 임베딩 모델을 로드할 필요가 없습니다.
+    print("저장된 임베딩 벡터를 불러오는 중...")
+    journal_position = journal_head()  # 이 시점까지의 저널은 DB 벡터에 이미 반영되어 있습니다.
+    book_ids, embeddings = load_embeddings_from_db()
 
-    if not books:
-        print("데이터베이스에 책이 없습니다. 스크립트를 종료합니다.")
-        return
-
-    print("임베딩 모델을 불러오는 중...")
-    # ▼▼▼ [수정] 모델 이름의 오타를 'multitask'로 수정합니다. ▼▼▼
-    model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-
-    print("책 데이터를 벡터로 변환하는 중... (시간이 걸릴 수 있습니다)")
-    # 저장된 임베딩 벡터를 재사용하는 것이 더 효율적입니다.
-    embeddings = np.array([book.embedding_vector for book in books if book.embedding_vector]).astype('float32')
-    book_ids = np.array([book.id for book in books if book.embedding_vector])
-    
-    if len(embeddings) == 0:
+    if len(book_ids) == 0:
         print("임베딩 벡터가 있는 책이 없습니다. 'generate_embeddings.py'를 먼저 실행해주세요.")
         return
 
-    # FAISS 인덱스 생성
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index = faiss.IndexIDMap(index)
-
-    print("FAISS 인덱스를 빌드하는 중...")
-    index.add_with_ids(embeddings, book_ids)
+    # 인덱스 종류는 settings.REC_INDEX_TYPE을 따릅니다. (IVF 계열은 샘플 벡터로 학습합니다)
+    print(f"FAISS 인덱스({settings.REC_INDEX_TYPE}, 축소 차원 {settings.REC_INDEX_REDUCE_DIM or '-'}, 양자화 {settings.REC_INDEX_QUANTIZER})를 빌드하는 중...")
+    index, params = build_ann_index(book_ids, embeddings)
 
-    # 인덱스 파일 저장
-    faiss.write_index(index, "book_index.faiss")
-    print(f"✅ 성공: {index.ntotal}개의 책에 대한 인덱스를 'book_index.faiss' 파일로 저장했습니다.")
+    # 새 버전으로 저장한 뒤 CURRENT를 교체합니다. 실행 중인 워커는 다음 요청 사이에 새 버전을 로드합니다.
+    version = publish(index, book_ids, embeddings, journal_position, extra_manifest=params)
+    print(f"✅ 성공: {index.ntotal}개의 책에 대한 인덱스를 '{settings.REC_INDEX_DIR}'에 버전 {version}으로 저장했습니다.")
 
 if __name__ == "__main__":
     build_index()
\ No newline at end of file
@@ -59,6 +59,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'books.middleware.RecommendationIndexReloadMiddleware', # 추천 인덱스 새 버전 자동 교체
+    'books.middleware.CatalogVersionMiddleware', # 공유 버전 번호를 요청마다 한 번만 읽기
 ]
 
 ROOT_URLCONF = 'cheereading.urls'
@@ -177,3 +179,116 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 
 SITE_ID = 1
+
+# ==============================================================================
+# 8. RECOMMENDATION (추천 시스템)
+# ==============================================================================
+
+# 웹 워커는 FAISS 인덱스만 로드합니다. 임베딩 모델은 오프라인 작업에서만 사용합니다.
+# 인덱스는 REC_INDEX_DIR 아래에 버전별 디렉터리로 저장되고, CURRENT 파일이 서빙할 버전을 가리킵니다.
+REC_INDEX_DIR = os.environ.get('REC_INDEX_DIR', os.path.join(BASE_DIR, 'rec_index'))
+EMBEDDING_MODEL_NAME = os.environ.get('EMBEDDING_MODEL_NAME', 'jhgan/ko-sroberta-multitask')
+# 같은 이름의 모델을 다시 학습/교체했을 때 올리면 모든 책이 다시 인코딩됩니다.
+EMBEDDING_MODEL_VERSION = os.environ.get('EMBEDDING_MODEL_VERSION', '1')
+# DB(book_embedding 테이블)에 저장할 임베딩 자료형. float16은 용량이 절반이지만 읽을 때 float32로 변환합니다.
+EMBEDDING_STORAGE_DTYPE = os.environ.get('EMBEDDING_STORAGE_DTYPE', 'float32')
+# 인덱스와 벡터 행렬을 읽기 전용 mmap으로 열어 모든 워커가 한 복사본을 공유합니다.
+REC_INDEX_MMAP = os.environ.get('REC_INDEX_MMAP', 'True') == 'True'
+# gunicorn --preload(gunicorn.conf.py의 preload_app)와 함께 쓰면 마스터에서 미리 로드한 인덱스를
+# 워커들이 fork 시 copy-on-write로 물려받습니다.
+REC_INDEX_PRELOAD = os.environ.get('REC_INDEX_PRELOAD', 'False') == 'True'
+# 워커가 새 인덱스 버전을 확인하는 최소 간격(초)
+REC_INDEX_RELOAD_INTERVAL = float(os.environ.get('REC_INDEX_RELOAD_INTERVAL', '5'))
+# 인덱스 종류: flat(정확), ivfflat, hnsw, ivfpq (근사 검색). 'python manage.py benchmark_rec_index'로 비교하세요.
+REC_INDEX_TYPE = os.environ.get('REC_INDEX_TYPE', 'flat')
+REC_INDEX_NLIST = int(os.environ.get('REC_INDEX_NLIST', '0'))  # IVF 클러스터 수 (0이면 4*sqrt(책 수))
+REC_INDEX_NPROBE = int(os.environ.get('REC_INDEX_NPROBE', '16'))  # IVF 검색 시 살펴볼 클러스터 수
+REC_INDEX_HNSW_M = int(os.environ.get('REC_INDEX_HNSW_M', '32'))
+REC_INDEX_EF_CONSTRUCTION = int(os.environ.get('REC_INDEX_EF_CONSTRUCTION', '80'))
+REC_INDEX_EF_SEARCH = int(os.environ.get('REC_INDEX_EF_SEARCH', '64'))
+REC_INDEX_PQ_M = int(os.environ.get('REC_INDEX_PQ_M', '16'))  # IVF-PQ 서브벡터 수 (차원의 약수)
+REC_INDEX_TRAIN_SAMPLE = int(os.environ.get('REC_INDEX_TRAIN_SAMPLE', '50000'))  # IVF 학습에 쓸 벡터 수
+# 차원 축소: 0이면 사용하지 않고, 예를 들어 128/256이면 빌드 시 카탈로그로 PCA(또는 OPQ)를 학습해 인덱스 앞에 붙입니다.
+REC_INDEX_REDUCE_DIM = int(os.environ.get('REC_INDEX_REDUCE_DIM', '0'))
+REC_INDEX_REDUCE_METHOD = os.environ.get('REC_INDEX_REDUCE_METHOD', 'pca')  # pca 또는 opq
+# 인덱스 안의 벡터 양자화: none, sq8(1/4 크기), fp16(1/2 크기). flat/ivfflat/hnsw에만 적용됩니다.
+REC_INDEX_QUANTIZER = os.environ.get('REC_INDEX_QUANTIZER', 'none')
+# precompute_recommendations로 미리 계산한 추천을 사용할 최대 시간. 지나면 실시간으로 계산합니다.
+REC_PRECOMPUTED_MAX_AGE_HOURS = float(os.environ.get('REC_PRECOMPUTED_MAX_AGE_HOURS', '24'))
+# 사용자별 추천 결과 캐시 유지 시간(초). 독서 기록/피드백/선호 장르가 바뀌거나 인덱스 버전이 바뀌면 즉시 무효화됩니다.
+REC_CACHE_TTL = int(os.environ.get('REC_CACHE_TTL', '600'))
+REC_CACHE_ALIAS = os.environ.get('REC_CACHE_ALIAS', 'default')
+# 추천 캐시 적중/미스 카운터(rec_cache_stats). 조회마다 캐시 쓰기가 두 번 늘어나므로 측정할 때만 켜세요.
+REC_CACHE_STATS = os.environ.get('REC_CACHE_STATS', 'False') == 'True'
+# 인기 도서 순위표 (python manage.py update_popularity를 cron 등으로 주기 실행)
+REC_POPULARITY_HALF_LIFE_DAYS = float(os.environ.get('REC_POPULARITY_HALF_LIFE_DAYS', '30'))  # 기록의 가중치가 절반이 되는 기간
+REC_POPULARITY_TOP_N = int(os.environ.get('REC_POPULARITY_TOP_N', '500'))  # 전체/장르별로 저장할 순위 수
+REC_POPULARITY_SAMPLE_POOL = int(os.environ.get('REC_POPULARITY_SAMPLE_POOL', '100'))  # 폴백 추천을 뽑을 상위 순위 범위
+# 아이템-아이템 협업 필터링 (python manage.py update_item_cf로 계산). 0이면 FAISS 점수만 사용합니다.
+REC_CF_WEIGHT = float(os.environ.get('REC_CF_WEIGHT', '0.3'))
+REC_CF_TOP_K = int(os.environ.get('REC_CF_TOP_K', '50'))  # 책당 저장할 유사 책 수
+REC_CF_POOL_FACTOR = int(os.environ.get('REC_CF_POOL_FACTOR', '2'))  # CF와 섞을 FAISS 후보 수 = k × 이 값
+# 동시에 들어온 추천 검색을 모아 한 번에 검색합니다. threaded 워커(gunicorn --threads)나 ASGI에서만 켜세요.
+REC_SEARCH_BATCHING = os.environ.get('REC_SEARCH_BATCHING', 'False') == 'True'
+REC_SEARCH_BATCH_SIZE = int(os.environ.get('REC_SEARCH_BATCH_SIZE', '32'))  # 한 번에 묶을 최대 질의 수
+REC_SEARCH_MAX_WAIT_MS = float(os.environ.get('REC_SEARCH_MAX_WAIT_MS', '2'))  # 첫 질의가 배치를 기다리는 최대 시간
+# 다중 관심사 프로필: 최근 읽은 책을 최대 N개의 관심사로 나눠 한 번에 검색합니다. (1이면 평균 취향 벡터 하나)
+REC_INTEREST_CLUSTERS = int(os.environ.get('REC_INTEREST_CLUSTERS', '1'))
+REC_INTEREST_MIN_BOOKS = int(os.environ.get('REC_INTEREST_MIN_BOOKS', '3'))  # 관심사 하나에 필요한 최소 책 수
+REC_INTEREST_FUSION = os.environ.get('REC_INTEREST_FUSION', 'round_robin')  # round_robin 또는 score
+
+# ==============================================================================
+# 9. CACHE (캐시)
+# ==============================================================================
+
+# 개발은 프로세스 메모리(locmem), 서버(DATABASE_URL이 있는 Render 환경)는 기본으로 워커끼리 공유되는 DB 캐시를 사용합니다.
+# locmem은 워커마다 따로라서 한 워커의 추천 캐시 무효화가 다른 워커에 보이지 않으므로,
+# gunicorn 워커가 2개 이상이면 시작하지 않습니다. (gunicorn.conf.py)
+# 'db' 캐시 테이블은 build.sh가 'python manage.py createcachetable'로 만듭니다.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'db' if 'DATABASE_URL' in os.environ else 'locmem')
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'django_cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cheereading',
+        }
+    }
+
+# ==============================================================================
+# 10. SEARCH (책 검색)
+# ==============================================================================
+
+# 플랜 만들기 책 검색(자동 완성)에 워커 메모리의 한글 bigram/초성 색인(books/korean_index.py)을 사용합니다.
+# False이면 DB 전문 검색(books/text_search.py)을 사용합니다.
+BOOK_SEARCH_IN_MEMORY = os.environ.get('BOOK_SEARCH_IN_MEMORY', 'True') == 'True'
+# 다른 워커의 책 추가/수정(카탈로그 버전)을 확인하는 간격(초)
+BOOK_SEARCH_RELOAD_INTERVAL = float(os.environ.get('BOOK_SEARCH_RELOAD_INTERVAL', '30'))
+# 검색어별 결과 캐시(books/search_cache.py) 유지 시간(초): 결과가 있는 검색어 / 결과가 없는 검색어
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', '600'))
+SEARCH_CACHE_NEGATIVE_TTL = int(os.environ.get('SEARCH_CACHE_NEGATIVE_TTL', '60'))
+# 입력 중 자동 완성(books/autocomplete.py): 결과 수, 브라우저/프록시 캐시 시간(초), 워커별 LRU에 보관할 검색어 수
+BOOK_AUTOCOMPLETE_LIMIT = int(os.environ.get('BOOK_AUTOCOMPLETE_LIMIT', '10'))
+BOOK_AUTOCOMPLETE_MAX_AGE = int(os.environ.get('BOOK_AUTOCOMPLETE_MAX_AGE', '60'))
+BOOK_AUTOCOMPLETE_LRU_SIZE = int(os.environ.get('BOOK_AUTOCOMPLETE_LRU_SIZE', '2048'))
+
+
+# ==============================================================================
+# 11. PAGINATION (목록 페이지네이션)
+# ==============================================================================
+
+# 서재/위시리스트 목록이 이 개수 이하면 페이지 번호, 넘으면 키셋(이전/다음) 페이지네이션을 사용합니다. (books/pagination.py)
+PAGINATION_PAGE_NUMBER_MAX_ITEMS = int(os.environ.get('PAGINATION_PAGE_NUMBER_MAX_ITEMS', '120'))
@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cheereading.settings')
 
 application = get_wsgi_application()
+
+# 마스터 프로세스에서 추천 인덱스를 미리 로드합니다. (gunicorn preload_app과 함께 사용)
+from django.conf import settings
+
+if settings.REC_INDEX_PRELOAD:
+    from django.db import connections
+    from books.recommendation import load_index
+    load_index()
+    # 로드 중 저널/장르 역색인을 읽느라 연 DB 연결을 fork 전에 닫습니다.
+    # (conn_max_age로 열어 둔 소켓을 모든 워커가 물려받아 함께 쓰지 않도록, 워커는 첫 쿼리에서 새로 연결합니다)
+    connections.close_all()
@@ -1,73 +1,63 @@
+import argparse
 import os
 import django
-import numpy as np
-from sentence_transformers import SentenceTransformer
-import ast # 문자열로 저장된 키워드를 리스트로 변환하기 위해 추가
 
 # --- Django 환경 설정 ---
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cheereading.settings')
 django.setup()
 # -------------------------
 
+from django.conf import settings
 from books.models import Book
-
-def run():
-    print("Loading sentence-transformer model (jhgan/ko-sroberta-multitask)...")
-    model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-    print("Model loaded.")
-
-    # [수정] 벡터가 없거나, 새로 추가된 책을 모두 포함하도록 로직 변경 가능
-    # 여기서는 기존과 같이 벡터가 없는 책만 처리하도록 유지
-    books_to_update = Book.objects.filter(embedding_vector__isnull=True)
-    total_count = books_to_update.count()
-    if total_count == 0:
-        print("✅ All books already have embedding vectors.")
+from books.embedding import generate_embeddings, stamp_source_hashes
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, '.embedding_checkpoint.json')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='책 임베딩을 배치로 생성하여 book_embedding 테이블에 저장합니다.')
+    parser.add_argument('--all', action='store_true', help='입력 텍스트가 바뀌지 않은 책까지 모두 다시 인코딩합니다.')
+    parser.add_argument('--stamp', action='store_true', help='인코딩하지 않고, 해시가 없는 기존 벡터에 현재 텍스트 해시와 모델 정보만 기록합니다.')
+    parser.add_argument('--chunk-size', type=int, default=512, help='DB에서 한 번에 읽고 저장할 책 수')
+    parser.add_argument('--batch-size', type=int, default=64, help='모델 encode()의 배치 크기')
+    parser.add_argument('--workers', type=int, default=0, help='인코딩 프로세스 수 (0이면 현재 프로세스에서 인코딩)')
+    parser.add_argument('--threads', type=int, default=None, help='프로세스당 torch 스레드 수 (기본: CPU 수 / workers)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='중단 후 이어서 처리하기 위한 체크포인트 파일')
+    parser.add_argument('--restart', action='store_true', help='체크포인트를 무시하고 처음부터 시작합니다.')
+    return parser.parse_args()
+
+def run(args):
+    if args.stamp:
+        stamped = stamp_source_hashes(Book.objects.all(), chunk_size=args.chunk_size)
+        print(f"✅ Stamped {stamped} existing embeddings with {settings.EMBEDDING_MODEL_NAME} (version {settings.EMBEDDING_MODEL_VERSION}).")
         return
-        
-    print(f"Found {total_count} books to process. Starting generation...")
-
-    for i, book in enumerate(books_to_update):
-        # ▼▼▼ [핵심 수정] 임베딩을 위한 텍스트 조합 ▼▼▼
-
-        # 1. 장르 정보 가져오기 (M2M 필드)
-        # book.genres.all()을 통해 연결된 모든 장르 객체를 가져와서, 각 장르의 이름을 리스트로 만듭니다.
-        genre_names = [genre.name for genre in book.genres.all()]
-        genre_text = " ".join(genre_names) # 예: "IT 전문서적 컴퓨터 공학"
 
-        # 2. 키워드 정보 가져오기 (JSON/TextField)
-        # 데이터베이스에 "[{'word': '파이썬', 'weight': 10.0}, ...]" 형태로 저장된 키워드를 처리합니다.
-        keyword_text = ""
-        if book.keywords:
-            try:
-                # 문자열 형태의 데이터를 실제 파이썬 리스트로 안전하게 변환
-                keywords_list = ast.literal_eval(book.keywords) if isinstance(book.keywords, str) else book.keywords
-                # 리스트에서 'word' 값만 추출하여 합칩니다.
-                if isinstance(keywords_list, list):
-                    keyword_text = " ".join([item.get('word', '') for item in keywords_list])
-            except (ValueError, SyntaxError):
-                # 데이터 형식이 잘못된 경우를 대비한 예외 처리
-                keyword_text = ""
-
-        # 3. 모든 정보를 조합하여 최종 텍스트 생성
-        # "제목. 줄거리. 장르들. 키워드들." 형태로 텍스트를 구성하여 AI에 전달합니다.
-        text_to_embed = f"{book.title}. {book.summary or ''}. {genre_text}. {keyword_text}"
-        
-        # ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲ ▲▲▲
-
-        vector = model.encode(text_to_embed)
-        
-        book.embedding_vector = vector.tolist()
-        book.save(update_fields=['embedding_vector'])
-        
-        print(f"  ({i+1}/{total_count}) Generated vector for: {book.title}")
-
-    print("\n✨ Embedding vector generation complete!")
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    # [수정] 기본은 벡터가 없거나 입력 텍스트/모델이 바뀐 책만, --all이면 전체 카탈로그를 다시 인코딩합니다.
+    print(f"Checking {Book.objects.count()} books with {settings.EMBEDDING_MODEL_NAME} (version {settings.EMBEDDING_MODEL_VERSION})...")
+    # "제목. 줄거리. 장르들. 키워드들." 형태의 텍스트를 청크 단위로 인코딩해 한 번에 저장합니다.
+    done = generate_embeddings(
+        Book.objects.all(),
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        threads=args.threads,
+        checkpoint_path=args.checkpoint,
+        scope='all' if args.all else 'changed',
+        only_changed=not args.all,
+    )
+
+    if done == 0:
+        print("✅ All books already have up-to-date embedding vectors.")
+    else:
+        print("\n✨ Embedding vector generation complete!")
 
 if __name__ == '__main__':
     try:
         import sentence_transformers
     except ImportError:
         print("[ERROR] 'sentence-transformers' is not installed.")
-        print("Please run: pip install sentence-transformers")
+        print("Please run: pip install -r requirements-embedding.txt")
     else:
-        run()
\ No newline at end of file
+        run(parse_args())
@@ -0,0 +1,22 @@
+# gunicorn.conf.py
+# gunicorn은 실행 디렉터리의 이 파일을 자동으로 읽습니다.
+import os
+
+# REC_INDEX_PRELOAD=True이면 마스터 프로세스에서 앱(과 추천 인덱스)을 먼저 로드한 뒤 워커를 fork 합니다.
+# 인덱스를 로드만 하고 검색은 하지 않으므로 fork 이전에 FAISS(OpenMP) 스레드가 생기지 않습니다.
+preload_app = os.environ.get('REC_INDEX_PRELOAD', 'False') == 'True'
+
+
+def on_starting(server):
+    # 워커별 메모리 캐시(locmem)로는 한 워커의 추천 캐시 무효화가 다른 워커에 보이지 않습니다.
+    if server.cfg.workers <= 1:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cheereading.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES[settings.REC_CACHE_ALIAS]['BACKEND']
+    if backend.endswith('LocMemCache'):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers with a per-process LocMemCache: set CACHE_BACKEND=db or file "
+            "so cache invalidation is shared between workers."
+        )
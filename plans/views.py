@@ -8,15 +8,22 @@ from django.urls import reverse
 from .models import Plan, PlanBook, UserPlan, UserPlanProgress
 from .forms import PlanCreateForm, PlanForm
 from books.models import Book, ReadingEntry
-from django.db.models import Q
+from books import korean_index, search_cache, text_search
+from django.conf import settings
 import json
 from django.views.decorators.http import require_POST
 from .models import Plan, PlanBook, PlanBook, UserPlan, UserPlanProgress, PlanFeedback # PlanFeedback 추가
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count, F, FloatField
+from django.db.models import Count, F, FloatField, Prefetch
 from django.db.models.functions import Cast
 
 
+def plan_books_prefetch():
+    """플랜의 책 목록을 큰 텍스트 컬럼 없이(Book 기본 매니저) 한 번에 읽어 오는 Prefetch입니다.
+    외래 키 prefetch는 기본 매니저를 거치지 않으므로 queryset을 직접 지정합니다."""
+    return Prefetch('plan_books__book', queryset=Book.objects.all())
+
+
 @login_required
 def plan_list(request):
     all_public_plans = Plan.objects.all().order_by('-created_at')
@@ -25,11 +32,11 @@ def plan_list(request):
     aggregated_feedback = {} # 통계 변수 초기화
 
     if selected_plan_id:
-        selected_plan = all_public_plans.filter(id=selected_plan_id).first()
+        selected_plan = all_public_plans.prefetch_related(plan_books_prefetch()).filter(id=selected_plan_id).first()
         if selected_plan: # selected_plan이 실제로 존재할 때만 계산
             aggregated_feedback = calculate_feedback_stats(selected_plan) # 헬퍼 함수 호출
     elif all_public_plans.exists():
-        selected_plan = all_public_plans.first()
+        selected_plan = all_public_plans.prefetch_related(plan_books_prefetch()).first()
         aggregated_feedback = calculate_feedback_stats(selected_plan) # 헬퍼 함수 호출
 
     context = {
@@ -41,7 +48,7 @@ def plan_list(request):
 
 @login_required
 def plan_detail(request, plan_id):
-    plan = get_object_or_404(Plan.objects.prefetch_related('plan_books__book', 'participants'), id=plan_id)
+    plan = get_object_or_404(Plan.objects.prefetch_related(plan_books_prefetch(), 'participants'), id=plan_id)
     aggregated_feedback = calculate_feedback_stats(plan)
 
     context = {
@@ -127,7 +134,7 @@ def my_plans(request):
 
     # --- 탭별 플랜 목록 가져오기 ---
     participating_user_plans = UserPlan.objects.filter(user=user, status='participating').select_related('plan').exclude(plan__creator=user)
-    created_plans = Plan.objects.filter(creator=user).prefetch_related('plan_books__book')
+    created_plans = Plan.objects.filter(creator=user).prefetch_related(plan_books_prefetch())
     completed_plans = UserPlan.objects.filter(user=user, status='completed').select_related('plan')
 
     # --- 변수 초기화 ---
@@ -139,7 +146,7 @@ def my_plans(request):
     aggregated_feedback = {}  # (추가) 집계된 피드백을 담을 딕셔너리
 
     if selected_plan_id:
-        selected_plan = get_object_or_404(Plan.objects.prefetch_related('plan_books__book'), id=selected_plan_id)
+        selected_plan = get_object_or_404(Plan.objects.prefetch_related(plan_books_prefetch()), id=selected_plan_id)
         books_for_display = list(selected_plan.plan_books.all())
 
         # --- 탭에 따른 로직 분기 ---
@@ -262,9 +269,12 @@ def book_search_api(request):
     query = request.GET.get('query', '')
     books_data = []
     if query:
-        books = Book.objects.filter(
-            Q(title__icontains=query) | Q(author__icontains=query)
-        ).distinct()[:50]
+        books_qs = Book.objects.only('id', 'title', 'author')
+        if settings.BOOK_SEARCH_IN_MEMORY:
+            # 워커 메모리의 bigram/초성 색인으로 ID를 찾고 (예: 'ㅎㄹㅍㅌ'), 책 정보만 DB에서 가져옵니다.
+            books = text_search.fetch_in_order(korean_index.search_ids(query, 50), books_qs)
+        else:
+            books = text_search.fetch_in_order(search_cache.search_book_ids(query, 50), books_qs)
         for book in books:
             books_data.append({'id': book.id, 'title': book.title, 'author': book.author})
     return JsonResponse({'books': books_data})
@@ -31,6 +31,10 @@ class Profile(models.Model):
     def __str__(self):
         return f'{self.user.username} Profile'
 
+    def get_preferred_genres(self):
+        """선호 장르 이름 목록을 반환합니다. (콜드 스타트 추천에서 사용)"""
+        return [name for name in (self.preferred_genres or []) if isinstance(name, str) and name.strip()]
+
 # User가 생성된 직후(post_save) Profile을 자동으로 생성하는 함수
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
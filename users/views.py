@@ -7,7 +7,6 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.cache import never_cache
-from django.core.paginator import Paginator
 from django.utils import timezone
 from django.db.models.functions import TruncMonth
 from django.db.models import Count, Avg
@@ -16,6 +15,7 @@ from collections import Counter
 from .forms import CustomUserCreationForm, ProfileUpdateForm, NicknameUpdateForm
 from .models import Profile, UserBadge, Badge
 from books.models import Genre, ReadingEntry, Wishlist
+from books import pagination
 from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.mail import EmailMessage
@@ -172,7 +172,7 @@ def profile(request):
     """사용자 프로필 페이지 뷰입니다. 모든 통계 데이터를 계산하고 전달합니다."""
     user = request.user
     profile_obj, _ = Profile.objects.get_or_create(user=user)
-    all_reading_entries = ReadingEntry.objects.filter(user=user).order_by('-read_date').select_related('book').prefetch_related('book__genres')
+    all_reading_entries = ReadingEntry.objects.filter(user=user).order_by('-read_date').select_related('book').defer('book__description', 'book__summary').prefetch_related('book__genres')
 
     # 사용자가 설정한 표시 통계 가져오기 (이전 버전 코드 유지)
     preferred_stats = profile_obj.preferred_stats or ['genre', 'monthly', 'rating']
@@ -185,12 +185,10 @@ def profile(request):
     # ▼▼▼ [수정] _get_genre_bias_stats 함수를 호출하여 동적 텍스트 생성 ▼▼▼
     genre_bias_stats, genre_bias_analysis_text = _get_genre_bias_stats(user)
 
-    # 페이지네이션
-    paginator_library = Paginator(all_reading_entries, 6)
-    reading_entries_page = paginator_library.get_page(request.GET.get('page_library'))
-    wishlist_items = Wishlist.objects.filter(user=user).select_related('book').order_by('-created_at')
-    paginator_wishlist = Paginator(wishlist_items, 5)
-    wishlist_page = paginator_wishlist.get_page(request.GET.get('page_wishlist'))
+    # 페이지네이션 (목록이 길면 키셋 페이지, books/pagination.py)
+    reading_entries_page = pagination.paginate(request, all_reading_entries, pagination.LIBRARY_ORDERING, 6, 'page_library', 'cursor_library')
+    wishlist_items = Wishlist.objects.filter(user=user).select_related('book')
+    wishlist_page = pagination.paginate(request, wishlist_items, pagination.WISHLIST_ORDERING, 5, 'page_wishlist', 'cursor_wishlist')
 
     # 뱃지 데이터
     displayed_badges = profile_obj.displayed_badges.all()